@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "EpicEvents.settings")
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+# imported once Django is set up
+from apps.common.asgi import ASGIHandler  # noqa: E402
+from apps.common.stream import EventStreamRouter  # noqa: E402
+
+django_application = ASGIHandler()
+application = EventStreamRouter(django_application)
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     # Third-party apps
     "rest_framework",
     "rest_framework_simplejwt",
+    "rest_framework_simplejwt.token_blacklist",
     "django_filters",
     "jazzmin",
     # Django apps
@@ -46,9 +47,13 @@ INSTALLED_APPS = [
     "apps.contracts",
     "apps.events",
     "apps.users",
+    "apps.dashboard",
 ]
 
 MIDDLEWARE = [
+    "apps.common.metrics.MetricsMiddleware",
+    "apps.common.timing.ServerTimingMiddleware",
+    "apps.common.replicas.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -80,19 +85,47 @@ WSGI_APPLICATION = "EpicEvents.wsgi.application"
 
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "apps.common.renderers.TimedJSONRenderer",
+        "apps.common.renderers.ORJSONRenderer",
+        "apps.common.renderers.MessagePackRenderer",
     ],
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS": "apps.common.negotiation.CRMContentNegotiation",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.TeamJWTAuthentication",
     ],
+    "DEFAULT_PAGINATION_CLASS": "apps.common.pagination.CRMCursorPagination",
+    "PAGE_SIZE": 50,
     "DATE_FORMAT": "%d-%m-%Y",
     "DATETIME_FORMAT": "%d-%m-%Y %H:%M",
+    # Proxies in front of the server setting X-Forwarded-For : client addresses
+    # of the login throttle, REMOTE_ADDR when 0 (the header can be forged)
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
 }
 
+# Shorter search terms are not looked up in the prefix search indexes
+SEARCH_MIN_PREFIX_LENGTH = env.int("SEARCH_MIN_PREFIX_LENGTH", default=3)
+
+# Addresses or networks allowed to read /metrics, e.g. 127.0.0.1,10.0.0.0/8
+# (the address connecting to the server : the proxy's, behind a proxy)
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+
+# Share of requests timed per phase (Server-Timing header and log), 0 to 1
+SERVER_TIMING_SAMPLE_RATE = env.float("SERVER_TIMING_SAMPLE_RATE", default=0.0)
+
+# Short-lived access tokens, renewed with the refresh token (POST login/refresh/)
+# without a password hash; each refresh token is used once (rotation, blacklist)
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(days=30),
+    "ACCESS_TOKEN_LIFETIME": timedelta(
+        minutes=env.int("ACCESS_TOKEN_MINUTES", default=15)
+    ),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=env.int("REFRESH_TOKEN_DAYS", default=30)),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# Login attempts per client address, e.g. "20/min", None to disable
+LOGIN_THROTTLE_RATE = env("LOGIN_THROTTLE_RATE", default="20/min")
+
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
@@ -107,16 +140,92 @@ DATABASES = {
     },
 }
 
+# Seconds the change feeds wait before reporting a change, longer than most
+# transactions, so that rows committed late are not skipped
+CHANGE_FEED_DELAY = env.int("CHANGE_FEED_DELAY", default=5)
+
+# Days the deletions are kept for the change feeds (prune_tombstones command) :
+# a client whose last sync is older must sync again in full
+TOMBSTONE_RETENTION_DAYS = env.int("TOMBSTONE_RETENTION_DAYS", default=30)
+
+# Change stream (/crm/stream/, ASGI only) : "local" to the process, or "postgresql"
+# (LISTEN/NOTIFY) to reach the subscribers of every worker process
+EVENT_STREAM_BACKEND = env("EVENT_STREAM_BACKEND", default="local")
+# Seconds between keep-alive comments, events queued per connection at most
+EVENT_STREAM_KEEPALIVE = env.int("EVENT_STREAM_KEEPALIVE", default=15)
+EVENT_STREAM_QUEUE_SIZE = env.int("EVENT_STREAM_QUEUE_SIZE", default=100)
+
+# Read replicas, e.g. DATABASE_REPLICA_HOSTS=10.0.0.2,10.0.0.3 (same database and
+# credentials as the primary), read by the safe-method API requests
+DATABASE_ROUTERS = ["apps.common.replicas.ReplicaRouter"]
+REPLICA_DATABASES = []
+for index, host in enumerate(env.list("DATABASE_REPLICA_HOSTS", default=[])):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(f"replica_{index}")
+
+# Seconds a replica may lag behind the primary, checked every
+# REPLICA_LAG_CHECK_INTERVAL seconds; when every replica lags or is unreachable,
+# reads go to the primary if REPLICA_FALLBACK, to the replicas anyway otherwise
+REPLICA_MAX_LAG = env.float("REPLICA_MAX_LAG", default=5.0)
+REPLICA_LAG_CHECK_INTERVAL = env.float("REPLICA_LAG_CHECK_INTERVAL", default=1.0)
+REPLICA_FALLBACK = env.bool("REPLICA_FALLBACK", default=True)
+
+# Seconds a user's reads stay on the primary after their last write
+REPLICA_STICKY_SECONDS = env.int("REPLICA_STICKY_SECONDS", default=10)
+
+# Cache, e.g. CACHE_URL=redis://127.0.0.1:6379/1 or filecache:///var/tmp/epicevents
+
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Seconds list responses stay cached, 0 to disable the list cache : disabled by
+# default with a per-process backend, which other workers' writes never invalidate
+LOCAL_CACHE_BACKENDS = [
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+]
+LIST_CACHE_TIMEOUT = env.int(
+    "LIST_CACHE_TIMEOUT",
+    default=0 if CACHES["default"]["BACKEND"] in LOCAL_CACHE_BACKENDS else 60,
+)
+
 if "test" in sys.argv:
-    DATABASES["default"] = {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": "test_database",
+    # tests read from the replica with override_settings(REPLICA_DATABASES=["replica"])
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": "test_database",
+        },
+        "replica": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": "test_replica",
+        },
     }
+    REPLICA_DATABASES = []
+    LIST_CACHE_TIMEOUT = 0
+    LOGIN_THROTTLE_RATE = None
 
 # Custom user model
 
 AUTH_USER_MODEL = "users.User"
 
+# Password hashing : Django's PBKDF2 in a pool of PASSWORD_HASH_THREADS threads per
+# process, so that login bursts cannot take every core, with PASSWORD_HASH_QUEUE
+# logins waiting at most (more logins get a 429, other hashes wait)
+
+PASSWORD_HASHERS = [
+    "apps.users.hashers.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASH_THREADS = env.int("PASSWORD_HASH_THREADS", default=1)
+PASSWORD_HASH_QUEUE = env.int("PASSWORD_HASH_QUEUE", default=8)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -174,6 +283,10 @@ LOGGING = {
             "filename": "errors.log",
             "formatter": "format",
         },
+        "console": {
+            "level": "INFO",
+            "class": "logging.StreamHandler",
+        },
     },
     "loggers": {
         "django": {
@@ -181,6 +294,11 @@ LOGGING = {
             "level": "ERROR",
             "propagate": True,
         },
+        "apps.common.timing": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
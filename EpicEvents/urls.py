@@ -1,12 +1,16 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from apps.common.metrics import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("crm/clients/", include("apps.clients.urls")),
     path("crm/contracts/", include("apps.contracts.urls")),
     path("crm/events/", include("apps.events.urls")),
+    path("crm/dashboard/", include("apps.dashboard.urls")),
     path("", include("apps.users.urls")),
+    path("metrics", metrics, name="metrics"),
 ]
 
 admin.site.site_header = "EpicEvents Admin"
@@ -0,0 +1,31 @@
+# Generated by Django 4.1 on 2026-10-18 19:05
+
+from django.db import migrations
+
+from apps.common.search import AddPrefixSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0002_client_client_created_idx"),
+    ]
+
+    operations = [
+        AddPrefixSearchIndex(
+            model_name="client",
+            field_name="first_name",
+            name="client_first_name_prefix",
+        ),
+        AddPrefixSearchIndex(
+            model_name="client", field_name="last_name", name="client_last_name_prefix"
+        ),
+        AddPrefixSearchIndex(
+            model_name="client", field_name="email", name="client_email_prefix"
+        ),
+        AddPrefixSearchIndex(
+            model_name="client",
+            field_name="company_name",
+            name="client_company_name_prefix",
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0003_prefix_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["sales_contact", "date_created", "id"],
+                name="client_sales_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                condition=models.Q(("status", False)),
+                fields=["date_created", "id"],
+                name="client_prospect_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1 on 2026-10-18 21:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0005_client_client_updated_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="client",
+            name="client_sales_created_idx",
+        ),
+    ]
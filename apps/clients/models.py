@@ -1,5 +1,27 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
+
+from apps.common.scopes import DELETE, VIEW, ScopedQuerySet
+from apps.users.models import MANAGEMENT, SALES, SUPPORT
+
+
+class ClientQuerySet(ScopedQuerySet):
+    def visible_to(self, user, action=VIEW):
+        """Managers : VIEW all clients
+        Sales team : VIEW and CHANGE prospects and their own clients, DELETE prospects
+        Support team : VIEW clients of their own events
+        """
+        if user.team.name == MANAGEMENT and action == VIEW:
+            return self.all()
+        elif user.team.name == SALES:
+            if action == DELETE:
+                return self.filter(status=False)
+            return self.filter(Q(status=False) | Q(sales_contact=user))
+        elif user.team.name == SUPPORT and action == VIEW:
+            # one assignment row per (support contact, client) : no DISTINCT
+            return self.filter(support_assignments__support_contact=user)
+        return self.none()
 
 
 class Client(models.Model):
@@ -20,6 +42,19 @@ class Client(models.Model):
     )
     status = models.BooleanField(default=False, verbose_name="Converted")
 
+    objects = ClientQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date_created", "id"], name="client_created_idx"),
+            models.Index(fields=["date_updated", "id"], name="client_updated_idx"),
+            models.Index(
+                fields=["date_created", "id"],
+                condition=Q(status=False),
+                name="client_prospect_idx",
+            ),
+        ]
+
     def __str__(self):
         if self.status is False:
             stat = "PROSPECT"
@@ -1,7 +1,7 @@
 from rest_framework import permissions
 
+from apps.common.scopes import has_access
 from apps.users.models import SALES, SUPPORT
-from .models import Client
 
 
 class ClientPermissions(permissions.BasePermission):
@@ -17,13 +17,4 @@ class ClientPermissions(permissions.BasePermission):
         return request.user.team.name == SALES
 
     def has_object_permission(self, request, view, obj):
-        if request.method == "DELETE":
-            return request.user.team.name == SALES and obj.status is False
-        elif (
-            request.user.team.name == SUPPORT
-            and request.method in permissions.SAFE_METHODS
-        ):
-            return obj in Client.objects.filter(
-                contract__event__support_contact=request.user
-            )
-        return request.user == obj.sales_contact or obj.status is False
+        return has_access(request, obj)
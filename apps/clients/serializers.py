@@ -1,9 +1,17 @@
 from rest_framework import serializers
 
+from apps.common.batch import BatchSerializerMixin
+from apps.common.sparse import SparseFieldsSerializerMixin
+from apps.common.timing import TimedSerializerMixin
 from .models import Client
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(
+    BatchSerializerMixin,
+    SparseFieldsSerializerMixin,
+    TimedSerializerMixin,
+    serializers.ModelSerializer,
+):
     class Meta:
         model = Client
         fields = "__all__"
@@ -1,9 +1,16 @@
+import json
+
 from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
 
+from apps.common.scopes import CHANGE, DELETE, VIEW
 from apps.common.tests.setup import CommandTestCase, CustomCRMTestCase
 from apps.users.models import User
+from EpicEvents.asgi import application
 from .models import Client
 
 CLIENT_COMMAND = "create_clients"
@@ -52,6 +59,31 @@ class ClientCommandTests(CommandTestCase):
         self.assertEqual(out, "Creating 8 client(s)...\n")
         self.assertEqual(Client.objects.all().count(), clients_before + 8)
 
+    def test_create_clients_seed(self):
+        """Same seed, same clients."""
+        self.create_sample_data()
+        fields = ["first_name", "last_name", "email", "status", "sales_contact_id"]
+        self.call_command(CLIENT_COMMAND, "-n 20", "--seed=1")
+        first = list(Client.objects.order_by("-id").values_list(*fields)[:20])
+        self.call_command(CLIENT_COMMAND, "-n 20", "--seed=1")
+        second = list(Client.objects.order_by("-id").values_list(*fields)[:20])
+        self.assertEqual(first, second)
+        self.call_command(CLIENT_COMMAND, "-n 20", "--seed=2")
+        other = list(Client.objects.order_by("-id").values_list(*fields)[:20])
+        self.assertNotEqual(first, other)
+
+    def test_create_clients_workers(self):
+        """Clients generated by a process pool are the same as in a single process."""
+        self.create_sample_data()
+        fields = ["first_name", "last_name", "email", "status", "sales_contact_id"]
+        self.call_command(CLIENT_COMMAND, "-n 20", "--seed=1", "--batch-size=3")
+        first = list(Client.objects.order_by("-id").values_list(*fields)[:20])
+        self.call_command(
+            CLIENT_COMMAND, "-n 20", "--seed=1", "--batch-size=3", "--workers=2"
+        )
+        second = list(Client.objects.order_by("-id").values_list(*fields)[:20])
+        self.assertEqual(first, second)
+
 
 class ClientListTests(CustomCRMTestCase):
     client_list_url = reverse("clients:list")
@@ -69,7 +101,7 @@ class ClientListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.client_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), len(Client.objects.all()))
+        self.assertEqual(len(response.data["results"]), len(Client.objects.all()))
 
     def test_manager_create_client(self):
         """Managers must create clients via admin site."""
@@ -87,7 +119,7 @@ class ClientListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.client_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data["results"]:
             if item["status"] is True:
                 self.assertEqual(item["sales_contact"], user.id)
             else:
@@ -138,7 +170,7 @@ class ClientListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.client_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data["results"]:
             client = Client.objects.get(id=item["id"])
             self.assertIn(
                 client, Client.objects.filter(contract__event__support_contact=user.id)
@@ -284,9 +316,235 @@ class ClientDetailTests(CustomCRMTestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class ClientExportTests(CustomCRMTestCase):
+    client_export_url = reverse("clients:export")
+
+    def test_sales_export_csv(self):
+        """Sales export their client scope as CSV, one row per client."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        response = test_client.get(f"{self.client_export_url}?format=csv")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        header = lines[0].split(",")
+        self.assertEqual(header[0], "id")
+        self.assertIn("sales_contact", header)
+        ids = [int(line.split(",")[0]) for line in lines[1:]]
+        self.assertEqual(
+            ids,
+            list(
+                Client.objects.visible_to(user)
+                .order_by("pk")
+                .values_list("id", flat=True)
+            ),
+        )
+
+    def test_manager_export_ndjson_filtered(self):
+        """NDJSON export is selected by Accept header and keeps list filters."""
+        user = User.objects.get(username="test_manager")
+        test_client = self.get_token_auth_client(user)
+        response = test_client.get(
+            f"{self.client_export_url}?status=false",
+            HTTP_ACCEPT="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(len(rows), Client.objects.filter(status=False).count())
+        for row in rows:
+            self.assertFalse(row["status"])
+
+    async def test_export_asgi(self):
+        """Under ASGI the rows are read in the request's thread while the
+        response is sent.
+        """
+        user = await User.objects.aget(username="test_manager")
+        token = f"Bearer {AccessToken.for_user(user)}"
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": self.client_export_url,
+            "query_string": b"format=csv",
+            "headers": [(b"host", b"testserver"), (b"authorization", token.encode())],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            messages.append(message)
+
+        await application(scope, receive, send)
+        self.assertEqual(messages[0]["status"], status.HTTP_200_OK)
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        lines = body.decode().splitlines()
+        self.assertEqual(len(lines) - 1, await Client.objects.acount())
+
+    def test_support_export_post(self):
+        """Export endpoints are read-only."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        response = test_client.post(self.client_export_url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class ClientBatchTests(CustomCRMTestCase):
+    batch_url = reverse("clients:batch")
+
+    def test_sales_batch_create(self):
+        """One result per item, in order : converted clients are assigned
+        to the user, invalid items are reported without blocking the others.
+        """
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        data = [
+            {"first_name": "A", "last_name": "A", "email": "a@email.com"},
+            {
+                "first_name": "B",
+                "last_name": "B",
+                "email": "b@email.com",
+                "status": True,
+            },
+            {"first_name": "C", "email": "not an email"},
+        ]
+        response = test_client.post(self.batch_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.json()
+        self.assertEqual([item["status"] for item in results], [201, 201, 400])
+        self.assertIsNone(results[0]["data"]["sales_contact"])
+        self.assertEqual(results[1]["data"]["sales_contact"], user.id)
+        self.assertIn("last_name", results[2]["errors"])
+        self.assertTrue(Client.objects.filter(email="b@email.com").exists())
+
+    def test_sales_batch_update(self):
+        """Converted clients cannot go back to prospects, clients out of scope
+        or missing are reported per item.
+        """
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        data = [
+            {
+                "id": 3,
+                "first_name": "Lou",
+                "last_name": "Bas",
+                "email": "lou@email.com",
+                "status": True,
+            },
+            {
+                "id": 2,
+                "first_name": "Jean",
+                "last_name": "Dupont",
+                "email": "compta-dupont@email.com",
+                "status": False,
+            },
+            {"id": 5, "first_name": "X", "last_name": "X", "email": "x@email.com"},
+            {"id": 999, "first_name": "X", "last_name": "X", "email": "x@email.com"},
+        ]
+        response = test_client.put(self.batch_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.json()
+        self.assertEqual([item["status"] for item in results], [202, 400, 403, 404])
+        self.assertEqual(
+            results[1]["errors"],
+            {"detail": "Cannot change status of converted client."},
+        )
+        client = Client.objects.get(pk=3)
+        self.assertEqual(client.email, "lou@email.com")
+        self.assertEqual(client.sales_contact, user)
+        self.assertTrue(Client.objects.get(pk=2).status)
+
+    def test_batch_queries_per_item(self):
+        """The number of queries does not depend on the number of items."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+
+        def batch(number):
+            return [
+                {
+                    "first_name": "A",
+                    "last_name": "A",
+                    "email": f"{i}@email.com",
+                    "status": True,
+                    "sales_contact": user.id,
+                }
+                for i in range(number)
+            ]
+
+        with CaptureQueriesContext(connection) as small:
+            test_client.post(self.batch_url, batch(1), format="json")
+        with CaptureQueriesContext(connection) as large:
+            response = test_client.post(self.batch_url, batch(50), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(small), len(large))
+
+    def test_batch_invalid_body(self):
+        """Batches are non-empty lists of objects."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        for data in [{"first_name": "A"}, [], ["A"]]:
+            response = test_client.post(self.batch_url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_support_batch_create(self):
+        """Support users cannot create clients."""
+        user = User.objects.get(username="test_support")
+        test_client = self.get_token_auth_client(user)
+        data = [{"first_name": "A", "last_name": "A", "email": "a@email.com"}]
+        response = test_client.post(self.batch_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class ClientModelTests(CustomCRMTestCase):
     def test_str_client(self):
         client = Client.objects.get(id=1)
         self.assertEqual(str(client), "Client #1 : Miller, James (CONVERTED)")
         client = Client.objects.get(id=3)
         self.assertEqual(str(client), "Client #3 : Smith, John (PROSPECT)")
+
+
+class ClientScopeTests(CustomCRMTestCase):
+    def test_manager_scope(self):
+        """Managers view all clients, cannot change or delete."""
+        user = User.objects.get(username="test_manager")
+        self.assertEqual(
+            Client.objects.visible_to(user).count(), Client.objects.all().count()
+        )
+        self.assertFalse(Client.objects.visible_to(user, CHANGE).exists())
+        self.assertFalse(Client.objects.visible_to(user, DELETE).exists())
+
+    def test_sales_scope(self):
+        """Sales view and change prospects and own clients, delete prospects."""
+        user = User.objects.get(username="test_sales")
+        for client in Client.objects.visible_to(user, VIEW):
+            self.assertTrue(client.status is False or client.sales_contact == user)
+        self.assertEqual(
+            set(Client.objects.visible_to(user, CHANGE)),
+            set(Client.objects.visible_to(user, VIEW)),
+        )
+        for client in Client.objects.visible_to(user, DELETE):
+            self.assertFalse(client.status)
+
+    def test_support_scope(self):
+        """Support view clients of their own events, without duplicates."""
+        user = User.objects.get(username="test_support")
+        expected = Client.objects.filter(
+            contract__event__support_contact=user
+        ).distinct()
+        self.assertEqual(
+            sorted(Client.objects.visible_to(user).values_list("id", flat=True)),
+            sorted(expected.values_list("id", flat=True)),
+        )
+        self.assertFalse(Client.objects.visible_to(user, CHANGE).exists())
+
+    def test_with_access_annotation(self):
+        """Object access is resolved in the same query as the object lookup."""
+        user = User.objects.select_related("team").get(username="test_support")
+        with self.assertNumQueries(1):
+            clients = list(Client.objects.with_access(user, VIEW))
+        visible = set(Client.objects.visible_to(user).values_list("id", flat=True))
+        for client in clients:
+            self.assertEqual(client.has_access, client.id in visible)
@@ -5,5 +5,10 @@ from . import views
 app_name = "clients"
 urlpatterns = [
     path("", views.ClientList.as_view(), name="list"),
+    path("export/", views.ClientExport.as_view(), name="export"),
+    path("changes/", views.ClientChanges.as_view(), name="changes"),
+    path("batch/", views.ClientBatch.as_view(), name="batch"),
     path("<int:pk>/", views.ClientDetail.as_view(), name="detail"),
+    path("async/", views.ClientAsyncList.as_view(), name="async_list"),
+    path("async/<int:pk>/", views.ClientAsyncDetail.as_view(), name="async_detail"),
 ]
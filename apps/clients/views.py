@@ -1,59 +1,113 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status
 from rest_framework.exceptions import ValidationError
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.async_views import AsyncDetailView, AsyncListView
+from apps.common.batch import BatchView
+from apps.common.cache import CachedListMixin
+from apps.common.changes import ChangeFeedMixin
+from apps.common.conditional import ConditionalDetailMixin, ConditionalListMixin
+from apps.common.export import ExportMixin
 from apps.common.permissions import IsManager
-from apps.users.models import SALES, SUPPORT
+from apps.common.scopes import action_for
+from apps.common.search import PrefixSearchFilter
+from apps.common.sparse import SparseFieldsMixin
+from apps.common.timing import TimedViewMixin
+from apps.common.values import ValuesListMixin
 from .models import Client
 from .permissions import ClientPermissions
 from .serializers import ClientSerializer
 
 
-class ClientList(generics.ListCreateAPIView):
+def apply_client_rules(user, validated_data, client=None):
+    """Converted clients cannot go back to prospects,
+    clients converted by a sales user are assigned to them.
+    """
+    if client is not None and client.status is True:
+        if validated_data.get("status") is False:
+            raise ValidationError(
+                {"detail": "Cannot change status of converted client."}
+            )
+    if validated_data.get("status") is True:
+        validated_data["sales_contact"] = user
+
+
+class ClientList(
+    TimedViewMixin,
+    SparseFieldsMixin,
+    CachedListMixin,
+    ValuesListMixin,
+    ConditionalListMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = ClientSerializer
     permission_classes = [IsAuthenticated, IsManager | ClientPermissions]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
+    filter_backends = [PrefixSearchFilter, DjangoFilterBackend]
     search_fields = ["^first_name", "^last_name", "^email", "^company_name"]
     filterset_fields = ["status"]
 
     def get_queryset(self):
-        if self.request.user.team.name == SUPPORT:
-            return Client.objects.filter(
-                contract__event__support_contact=self.request.user
-            ).distinct()
-        elif self.request.user.team.name == SALES:
-            prospects = Client.objects.filter(status=False)
-            own_clients = Client.objects.filter(sales_contact=self.request.user)
-            return prospects | own_clients
-        return Client.objects.all()
+        return Client.objects.visible_to(self.request.user)
 
     def post(self, request, *args, **kwargs):
         serializer = ClientSerializer(data=request.data)
         if serializer.is_valid(raise_exception=True):
-            if serializer.validated_data["status"] is True:
-                serializer.validated_data["sales_contact"] = request.user
+            apply_client_rules(request.user, serializer.validated_data)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ClientDetail(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Client.objects.all()
+class ClientExport(ExportMixin, ClientList):
+    export_name = "clients"
+
+
+class ClientChanges(ChangeFeedMixin, ClientList):
+    pass
+
+
+class ClientBatch(TimedViewMixin, BatchView):
+    permission_classes = [IsAuthenticated, IsManager | ClientPermissions]
+    serializer_class = ClientSerializer
+
+    def get_queryset(self):
+        action = action_for(self.request.method)
+        return Client.objects.with_access(self.request.user, action)
+
+    def create_rules(self, validated_data):
+        apply_client_rules(self.request.user, validated_data)
+
+    def update_rules(self, instance, validated_data):
+        apply_client_rules(self.request.user, validated_data, instance)
+
+
+class ClientDetail(
+    TimedViewMixin,
+    SparseFieldsMixin,
+    ConditionalDetailMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     http_method_names = ["get", "put", "delete", "options"]
     permission_classes = [IsAuthenticated, IsManager | ClientPermissions]
     serializer_class = ClientSerializer
 
+    def get_queryset(self):
+        action = action_for(self.request.method)
+        return Client.objects.with_access(self.request.user, action)
+
     def update(self, request, *args, **kwargs):
         client = self.get_object()
         serializer = ClientSerializer(data=request.data, instance=client)
         if serializer.is_valid(raise_exception=True):
-            if client.status is True and serializer.validated_data["status"] is False:
-                raise ValidationError(
-                    {"detail": "Cannot change status of converted client."}
-                )
-            elif serializer.validated_data["status"] is True:
-                serializer.validated_data["sales_contact"] = request.user
+            apply_client_rules(request.user, serializer.validated_data, client)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ClientAsyncList(AsyncListView):
+    view_class = ClientList
+
+
+class ClientAsyncDetail(AsyncDetailView):
+    view_class = ClientDetail
@@ -0,0 +1,50 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers import asgi
+
+# Parts of a streaming response read per call to the request's thread
+STREAM_PARTS = 500
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """Django's ASGI handler, reading streaming responses in the request's
+    sync thread, STREAM_PARTS parts at a time (as Django 4.2 does) : their
+    iterators may run queries, e.g. QuerySet.iterator() in the exports, while
+    the event loop only sends the chunks.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append(
+                (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+        parts = iter(response)
+        read = sync_to_async(
+            lambda: b"".join(islice(parts, STREAM_PARTS)), thread_sensitive=True
+        )
+        body = await read()
+        while body:
+            for chunk, _ in self.chunk_bytes(body):
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            body = await read()
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,109 @@
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+
+
+async def authenticate(request):
+    """Async counterpart of Request._authenticate, with the authenticators
+    implementing aauthenticate. Sets the user, auth and authenticator, so that
+    request.user never runs the sync authentication afterwards.
+    """
+    request._not_authenticated()
+    for authenticator in request.authenticators:
+        if not hasattr(authenticator, "aauthenticate"):
+            continue
+        try:
+            user_auth = await authenticator.aauthenticate(request)
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+        if user_auth is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth
+            return
+
+
+def to_http_response(response):
+    """Render a DRF response in the event loop : Django renders responses having
+    a render method in a worker thread, plain HttpResponses are sent as they are.
+    """
+    if not hasattr(response, "render"):
+        return response
+    response.render()
+    http_response = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        http_response[header] = value
+    return http_response
+
+
+class AsyncAPIView(View):
+    """Read-only async counterpart of a DRF generic view (view_class), served
+    natively on the ASGI stack : the request runs in the event loop instead of
+    a worker thread. The ORM calls go through Django's async API, which in
+    Django 4.1 wraps the sync ORM with sync_to_async : each query still runs
+    in a thread from the executor, held while the query runs.
+
+    The sync view provides the configuration : queryset, filters, pagination,
+    serializer, permissions, negotiation and exception handling. None of these
+    query the database once the user is authenticated (team loaded with the
+    user) and the objects are fetched with their has_access annotation, so
+    they run in the event loop as they are.
+    """
+
+    view_class = None
+    http_method_names = ["get", "options"]
+
+    @property
+    def allowed_methods(self):
+        return self._allowed_methods()
+
+    async def get(self, request, *args, **kwargs):
+        view = self.view_class()
+        view.setup(request, *args, **kwargs)
+        request = view.initialize_request(request, *args, **kwargs)
+        view.request = request
+        view.headers = view.default_response_headers
+        try:
+            await authenticate(request)
+            view.initial(request, *args, **kwargs)
+            response = await self.respond(view, request)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+        response = view.finalize_response(request, response, *args, **kwargs)
+        return to_http_response(response)
+
+    async def respond(self, view, request):
+        raise NotImplementedError
+
+
+class AsyncListView(AsyncAPIView):
+    """List endpoint : page fetched in a worker thread, ETag of the page
+    (ConditionalListMixin). The list response cache is not used.
+    """
+
+    async def respond(self, view, request):
+        queryset = view.get_list_queryset()
+        paginator = view.paginator
+        if paginator is None:
+            rows = [obj async for obj in queryset.aiterator()]
+            return view.get_list_response(request, rows, paginated=False)
+        rows = await paginator.apaginate_queryset(queryset, request, view=view)
+        return view.get_list_response(request, rows)
+
+
+class AsyncDetailView(AsyncAPIView):
+    """Detail endpoint : object fetched with aget, ETag and Last-Modified
+    (ConditionalDetailMixin).
+    """
+
+    async def respond(self, view, request):
+        queryset = view.filter_queryset(view.get_queryset())
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{view.lookup_field: view.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, ValueError, TypeError):
+            raise Http404
+        view.check_object_permissions(request, obj)
+        return view.get_detail_response(request, obj)
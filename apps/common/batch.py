@@ -0,0 +1,231 @@
+from contextlib import nullcontext
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from rest_framework import generics, serializers, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+BATCH_MAX_SIZE = 1000
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Related instances prefetched by BatchView (context["prefetched"]) are
+    used without a query, other values are looked up as usual.
+    """
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get("prefetched", {}).get(self.field_name)
+        if prefetched is not None and not isinstance(data, bool):
+            try:
+                return prefetched[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class BatchSerializerMixin:
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
+
+class BatchView(generics.GenericAPIView):
+    """Create (POST) or update (PUT, items with their id) a list of objects.
+
+    Items are validated by the many=True serializer, one by one, with the
+    related instances fetched in one query per field and unique fields checked
+    in one query. Then the subclass business rules are applied
+    (create_rules / update_rules) and the valid items are written in a single
+    transaction with bulk_create / bulk_update, followed by post_save signals.
+    The response has one result per item, in order : status and data or errors.
+    """
+
+    http_method_names = ["post", "put", "options"]
+    pagination_class = None
+    max_batch_size = BATCH_MAX_SIZE
+
+    def create_rules(self, validated_data):
+        """Business rules of the create endpoint, may raise ValidationError."""
+
+    def update_rules(self, instance, validated_data):
+        """Business rules of the update endpoint, may raise ValidationError."""
+
+    def signals_context(self):
+        """Context of the post_save signals sent for the batch."""
+        return nullcontext()
+
+    def post(self, request, *args, **kwargs):
+        return self.run_batch(request, status.HTTP_201_CREATED)
+
+    def put(self, request, *args, **kwargs):
+        return self.run_batch(request, status.HTTP_202_ACCEPTED)
+
+    def run_batch(self, request, success_status):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"detail": "Expected a non-empty list of items."})
+        if len(items) > self.max_batch_size:
+            raise ValidationError(
+                {"detail": f"Batches are limited to {self.max_batch_size} items."}
+            )
+        if not all(isinstance(item, dict) for item in items):
+            raise ValidationError({"detail": "Expected a list of objects."})
+
+        serializer = self.get_serializer(data=items, many=True)
+        child = serializer.child
+        unique = self.pop_unique_validators(child)
+        self.prefetch_related(serializer, items)
+        updating = request.method == "PUT"
+        instances = self.get_instances(items) if updating else {}
+
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            instance = None
+            if updating:
+                instance = instances.get(self.get_item_pk(item))
+                if instance is None:
+                    results[index] = self.error(status.HTTP_404_NOT_FOUND, "Not found.")
+                    continue
+                try:
+                    self.check_object_permissions(request, instance)
+                except PermissionDenied as exc:
+                    results[index] = self.error(exc.status_code, exc.detail)
+                    continue
+            child.instance = instance
+            try:
+                data = child.run_validation(item)
+                if updating:
+                    self.update_rules(instance, data)
+                else:
+                    self.create_rules(data)
+            except ValidationError as exc:
+                results[index] = {
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": exc.detail,
+                }
+                continue
+            valid[index] = (instance, data)
+        child.instance = None
+
+        for index, errors in self.check_unique(unique, valid).items():
+            del valid[index]
+            results[index] = {"status": status.HTTP_400_BAD_REQUEST, "errors": errors}
+
+        objs = self.write(valid, updating)
+        for index, obj in zip(valid, objs):
+            results[index] = {
+                "status": success_status,
+                "data": child.to_representation(obj),
+            }
+        if len(valid) != len(items):
+            success_status = status.HTTP_207_MULTI_STATUS
+        return Response(results, status=success_status)
+
+    @staticmethod
+    def error(status_code, detail):
+        return {"status": status_code, "errors": {"detail": str(detail)}}
+
+    @staticmethod
+    def get_item_pk(item):
+        try:
+            return int(item.get("id"))
+        except (TypeError, ValueError):
+            return None
+
+    def get_instances(self, items):
+        """Objects to update in the user scope, one query."""
+        pks = {self.get_item_pk(item) for item in items} - {None}
+        return self.get_queryset().in_bulk(pks)
+
+    @staticmethod
+    def prefetch_related(serializer, items):
+        """Fetch the related instances of all items, one query per field."""
+        prefetched = {}
+        for name, field in serializer.child.fields.items():
+            if field.read_only or not isinstance(
+                field, PrefetchedPrimaryKeyRelatedField
+            ):
+                continue
+            pks = set()
+            for item in items:
+                try:
+                    pks.add(int(item[name]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            prefetched[name] = field.get_queryset().in_bulk(pks)
+        serializer.context["prefetched"] = prefetched
+
+    @staticmethod
+    def pop_unique_validators(child):
+        """Remove the UniqueValidators (one query per item), returns them per field."""
+        unique = {}
+        for name, field in child.fields.items():
+            validators = [v for v in field.validators if isinstance(v, UniqueValidator)]
+            if validators:
+                field.validators = [v for v in field.validators if v not in validators]
+                unique[name] = (field.source_attrs[-1], validators[0])
+        return unique
+
+    @staticmethod
+    def check_unique(unique, valid):
+        """Unique fields, within the batch and against the database, one query
+        per field. Returns the errors per item index.
+        """
+        errors = {}
+        for name, (source, validator) in unique.items():
+            values = {}
+            for index, (instance, data) in valid.items():
+                if name in data:
+                    value = getattr(data[name], "pk", data[name])
+                    values.setdefault(value, []).append(index)
+            taken = dict(
+                validator.queryset.filter(**{f"{source}__in": values}).values_list(
+                    source, "pk"
+                )
+            )
+            for value, indexes in values.items():
+                owner = taken.get(value)
+                for index in indexes:
+                    instance = valid[index][0]
+                    if len(indexes) > 1 or (
+                        owner is not None and (instance is None or owner != instance.pk)
+                    ):
+                        errors[index] = {name: [validator.message]}
+        return errors
+
+    def write(self, valid, updating):
+        """Bulk write the valid items in one transaction, then send post_save."""
+        if not valid:
+            return []
+        model = self.get_serializer_class().Meta.model
+        if updating:
+            objs = []
+            fields = {"date_updated"}
+            now = timezone.now()
+            for instance, data in valid.values():
+                for attr, value in data.items():
+                    setattr(instance, attr, value)
+                instance.date_updated = now
+                fields.update(data)
+                objs.append(instance)
+        else:
+            objs = [model(**data) for instance, data in valid.values()]
+
+        with transaction.atomic():
+            if updating:
+                model.objects.bulk_update(objs, sorted(fields))
+            else:
+                model.objects.bulk_create(objs)
+            with self.signals_context():
+                for obj in objs:
+                    post_save.send(
+                        sender=model,
+                        instance=obj,
+                        created=not updating,
+                        update_fields=None,
+                        raw=False,
+                        using=obj._state.db,
+                    )
+        return objs
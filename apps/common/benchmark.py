@@ -0,0 +1,51 @@
+import statistics
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+
+@contextmanager
+def benchmark_database(keepdb=False, verbosity=0):
+    """Run the block against throwaway test databases, never the configured ones,
+    without the login throttle (logins are replayed from one address).
+    """
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity, interactive=False, keepdb=keepdb)
+    try:
+        with override_settings(LOGIN_THROTTLE_RATE=None):
+            yield
+    finally:
+        teardown_databases(old_config, verbosity, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def timed(func, *args, **kwargs):
+    """Call func, returns its result and the elapsed time in milliseconds."""
+    start = perf_counter()
+    result = func(*args, **kwargs)
+    return result, (perf_counter() - start) * 1000
+
+
+def summarize(samples):
+    """Latency percentiles (ms) of a list of samples."""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        index = min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))
+        return round(ordered[index], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": round(ordered[-1], 3),
+    }
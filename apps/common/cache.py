@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.utils.crypto import md5
+from rest_framework.response import Response
+
+from .conditional import not_modified, set_validators
+from .scopes import scope_key
+
+# Models read by the list endpoints : scopes, searches and filters span them all
+CRM_MODELS = ["clients.client", "contracts.contract", "events.event", "users.user"]
+
+
+def version_key(label):
+    return f"crm:version:{label}"
+
+
+def get_versions(labels):
+    """Current version of each model. Missing versions (never set or evicted)
+    start from a unique value, so they never match older cache keys.
+    """
+    keys = [version_key(label) for label in labels]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns())
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(label):
+    """Invalidate the cached lists depending on the model, once the
+    transaction is committed : a list computed before the commit is never
+    cached under the new version.
+    """
+
+    def bump():
+        try:
+            cache.incr(version_key(label))
+        except ValueError:
+            cache.add(version_key(label), time.time_ns())
+
+    transaction.on_commit(bump)
+
+
+class CachedListMixin:
+    """Cache list responses (data and ETag) with Django's cache framework,
+    for settings.LIST_CACHE_TIMEOUT seconds (0 disables the cache).
+
+    The key combines the view, the read database, the user scope (manager,
+    sales or support user), the url, sorted query parameters, renderer and the
+    versions of the cache_models, bumped on save and delete by
+    apps.common.signals. Rows changed without signals (bulk_create, update)
+    show up after the timeout. Lists read from a replica are cached at most
+    settings.REPLICA_MAX_LAG seconds, and never served to users whose reads
+    are pinned to the primary (read-your-writes).
+    """
+
+    cache_models = CRM_MODELS
+
+    def get_cache_key(self, request, alias):
+        params = sorted(
+            (key, request.query_params.getlist(key)) for key in request.query_params
+        )
+        # the page links are absolute urls
+        url = request.build_absolute_uri(request.path)
+        # the cached ETag depends on the renderer
+        renderer = request.accepted_renderer.media_type
+        digest = md5(
+            f"{url}|{params}|{renderer}".encode(), usedforsecurity=False
+        ).hexdigest()
+        versions = ".".join(str(version) for version in get_versions(self.cache_models))
+        return (
+            f"crm:list:{request.resolver_match.view_name}:{alias}:"
+            f"{scope_key(request.user)}:{digest}:{versions}"
+        )
+
+    def list(self, request, *args, **kwargs):
+        timeout = settings.LIST_CACHE_TIMEOUT
+        if not timeout:
+            return super().list(request, *args, **kwargs)
+
+        alias = router.db_for_read(self.get_queryset().model)
+        key = self.get_cache_key(request, alias)
+        cached = cache.get(key)
+        if cached is not None:
+            data, etag = cached
+            response = not_modified(request, etag) or Response(data)
+            return set_validators(response, etag)
+
+        response = super().list(request, *args, **kwargs)
+        if alias != DEFAULT_DB_ALIAS:
+            # a lagging replica may miss the write that bumped the versions
+            timeout = min(timeout, settings.REPLICA_MAX_LAG)
+        if response.status_code == 200:
+            cache.set(key, (response.data, response["ETag"]), timeout)
+        return response
@@ -0,0 +1,237 @@
+import base64
+import binascii
+import json
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import Tombstone
+from .pagination import CRMCursorPagination
+from .replicas import read_from_primary
+
+# Models with a change feed, whose deletions are recorded as tombstones
+FEED_MODELS = ["clients.client", "contracts.contract", "events.event"]
+
+# Per context : contract id -> [events of the contract being deleted, scope
+# hints of the contract once read]
+_event_contracts = ContextVar("event_contracts", default=None)
+
+
+class ResyncRequired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Deletions this old are no longer kept, sync again in full."
+    default_code = "resync_required"
+
+
+def deleting_event(sender, instance, **kwargs):
+    """pre_delete of an event. A deletion sends every pre_delete before the
+    first post_delete : the contracts of all the events it deletes (e.g. the
+    events of a client) are then read in one query.
+    """
+    contracts = _event_contracts.get()
+    if contracts is None:
+        contracts = {}
+        _event_contracts.set(contracts)
+    contracts.setdefault(instance.contract_id, [0, None])[0] += 1
+
+
+def contract_hints(instance, using):
+    """Client and sales contact ids of the deleted event's contract."""
+    contracts = _event_contracts.get() or {}
+    if instance.contract_id not in contracts:
+        deleting_event(type(instance), instance)
+        contracts = _event_contracts.get()
+    entry = contracts[instance.contract_id]
+    if entry[1] is None:
+        # events are deleted before their contract, which is still there
+        unread = [pk for pk, (_, hints) in contracts.items() if hints is None]
+        rows = (
+            apps.get_model("contracts", "Contract")
+            .objects.using(using)
+            .filter(pk__in=unread)
+            .values("id", "client_id", "sales_contact_id")
+        )
+        read = {row.pop("id"): row for row in rows}
+        for pk in unread:
+            contracts[pk][1] = read.get(pk, {})
+    entry[0] -= 1
+    if not entry[0]:
+        del contracts[instance.contract_id]
+    return entry[1]
+
+
+def scope_hints(instance, using):
+    """Ids telling who could see the deleted client, contract or event."""
+    label = instance._meta.label_lower
+    if label == "clients.client":
+        return {
+            "client_id": instance.pk,
+            "sales_contact_id": instance.sales_contact_id,
+            "prospect": not instance.status,
+        }
+    if label == "contracts.contract":
+        return {
+            "client_id": instance.client_id,
+            "contract_id": instance.pk,
+            "sales_contact_id": instance.sales_contact_id,
+        }
+    return {
+        "contract_id": instance.contract_id,
+        "support_contact_id": instance.support_contact_id,
+        **contract_hints(instance, using),
+    }
+
+
+def record_deletion(sender, instance, using, **kwargs):
+    """post_delete : record a tombstone of the row for the change feeds."""
+    Tombstone.objects.using(using).create(
+        model=sender._meta.label_lower,
+        object_id=instance.pk,
+        **scope_hints(instance, using),
+    )
+
+
+def after(queryset, column, position):
+    """Rows following the (column, id) position, ordered on (column, id) :
+    rows sharing a column value are neither skipped nor repeated.
+    """
+    queryset = queryset.order_by(column, "id")
+    if position is None:
+        return queryset
+    value, pk = position
+    return queryset.filter(
+        Q(**{f"{column}__gt": value}) | Q(**{column: value, "id__gt": pk})
+    )
+
+
+def row_position(row):
+    """(date_updated, id) of a model instance or a .values() row."""
+    if isinstance(row, dict):
+        return row["date_updated"], row["id"]
+    return row.date_updated, row.pk
+
+
+def encode_cursor(rows_position, deleted_position):
+    data = [
+        position and [position[0].isoformat(), position[1]]
+        for position in [rows_position, deleted_position]
+    ]
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        rows_position, deleted_position = [
+            position and (datetime.fromisoformat(position[0]), int(position[1]))
+            for position in data
+        ]
+    except (binascii.Error, ValueError, TypeError, IndexError):
+        raise ValidationError({"detail": "Invalid cursor."})
+    return rows_position, deleted_position
+
+
+class ChangeFeedMixin:
+    """Delta sync of a list endpoint, in the user scope :
+    - ?updated_since=<ISO 8601 datetime> : rows updated at or after it
+      (url encoded, e.g. 2022-10-09T08:00:00Z), rows deleted since then
+    - ?cursor=<cursor of the previous response> : changes since the previous sync
+    - neither : every row, then the changes since the first request.
+    Rows are ordered on the indexed (date_updated, id), deletions on the
+    tombstones' (date_deleted, id) : a sync reads the changes only.
+
+    Responses hold up to ?page_size= rows and deleted ids, the next page url
+    while there are more (null once up to date) and the cursor to store for the
+    next sync. Changes of the last settings.CHANGE_FEED_DELAY seconds are left
+    for the next sync, so that rows written by transactions still running
+    are not skipped. Changes are read from the primary : a replica lagging
+    by more than the delay would have them skipped for good. Rows updated
+    without save (QuerySet.update) and rows leaving the scope otherwise than
+    by deletion are not reported. Tombstones are kept for
+    settings.TOMBSTONE_RETENTION_DAYS days (prune_tombstones command) : an
+    older cursor or updated_since gets a 410 response, the client must sync
+    again in full.
+
+    To be mixed in a list view : reuses its queryset scope, serializer and
+    .values() fast path.
+    """
+
+    http_method_names = ["get", "options"]
+    filter_backends = []
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        read_from_primary()
+        horizon = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_DELAY)
+        rows_position, deleted_position = self.get_positions(request, horizon)
+        retention = timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+        if deleted_position and deleted_position[0] < timezone.now() - retention:
+            raise ResyncRequired()
+        size = CRMCursorPagination().get_page_size(request)
+        label = self.get_serializer_class().Meta.model._meta.label_lower
+
+        queryset = self.get_list_queryset().filter(date_updated__lte=horizon)
+        rows = list(after(queryset, "date_updated", rows_position)[: size + 1])
+        tombstones = Tombstone.objects.visible_to(request.user, label).filter(
+            date_deleted__lte=horizon
+        )
+        tombstones = list(
+            after(tombstones, "date_deleted", deleted_position).values_list(
+                "date_deleted", "id", "object_id"
+            )[: size + 1]
+        )
+
+        more_deleted = len(tombstones) > size
+        more = len(rows) > size or more_deleted
+        rows, tombstones = rows[:size], tombstones[:size]
+        if rows:
+            rows_position = row_position(rows[-1])
+        if tombstones:
+            deleted_position = tombstones[-1][:2]
+        if not more_deleted:
+            # every deletion up to the horizon is read : the cursor moves on
+            # without deletions in the scope too, and does not expire
+            deleted_position = max(deleted_position or (horizon, 0), (horizon, 0))
+        cursor = encode_cursor(rows_position, deleted_position)
+        next_url = None
+        if more:
+            url = remove_query_param(request.build_absolute_uri(), "updated_since")
+            next_url = replace_query_param(url, "cursor", cursor)
+        return Response(
+            {
+                "next": next_url,
+                "cursor": cursor,
+                "results": self.serialize_rows(rows),
+                "deleted": [tombstone[2] for tombstone in tombstones],
+            }
+        )
+
+    @staticmethod
+    def get_positions(request, horizon):
+        """Positions of the rows and the tombstones the sync starts after."""
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            return decode_cursor(cursor)
+        updated_since = request.query_params.get("updated_since")
+        if not updated_since:
+            return None, (horizon, 0)
+        try:
+            value = parse_datetime(updated_since)
+        except ValueError:
+            value = None
+        if value is None:
+            raise ValidationError(
+                {"detail": "updated_since must be an ISO 8601 datetime."}
+            )
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return (value, 0), (value, 0)
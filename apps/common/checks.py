@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.database, Tags.caches)
+def check_replica_cache(app_configs, **kwargs):
+    """Read replicas need a cache shared by the worker processes : the
+    read-your-writes pin set by one worker must reach the others.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.REPLICA_DATABASES and backend in settings.LOCAL_CACHE_BACKENDS:
+        return [
+            Error(
+                "Read replicas require a shared cache.",
+                hint="Set CACHE_URL (e.g. redis://) when DATABASE_REPLICA_HOSTS is set.",
+                obj=backend,
+                id="common.E001",
+            )
+        ]
+    return []
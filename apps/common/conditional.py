@@ -0,0 +1,101 @@
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.crypto import md5
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """Weak ETag : the representation depends on the parts, not byte for byte."""
+    value = "|".join(str(part) for part in parts)
+    return f'W/"{md5(value.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def representation(request):
+    """ETag parts of the negotiated renderer : the same rows give one body per
+    media type (JSON, MessagePack...).
+    """
+    renderer = request.accepted_renderer
+    return [renderer.media_type, renderer.format]
+
+
+def not_modified(request, etag, last_modified=None):
+    """304 response if the request validators match, else None."""
+    if request.method not in ["GET", "HEAD"]:
+        return None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # the representation depends on the user and the negotiated renderer
+    patch_vary_headers(response, ["Authorization", "Accept"])
+    return response
+
+
+class ConditionalListMixin:
+    """ETag on list endpoints, from the pk and date_updated of the page rows,
+    the page links and the renderer, which determine the page content. The page is fetched as
+    usual (no COUNT nor aggregate over the whole scope), a matching
+    If-None-Match gets a 304 without serializing nor rendering it.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return self.get_list_response(request, list(queryset), paginated=False)
+        return self.get_list_response(request, page)
+
+    def get_list_response(self, request, rows, paginated=True):
+        """304 or serialized rows, with the ETag of the page."""
+        links = []
+        if paginated:
+            links = [self.paginator.get_next_link(), self.paginator.get_previous_link()]
+        etag = make_etag(
+            *representation(request),
+            *links,
+            *(self.get_row_version(obj) for obj in rows),
+        )
+        response = not_modified(request, etag)
+        if response is None:
+            data = self.serialize_rows(rows)
+            if paginated:
+                response = self.get_paginated_response(data)
+            else:
+                response = Response(data)
+        return set_validators(response, etag)
+
+    def get_list_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_row_version(self, obj):
+        return f"{obj.pk}:{obj.date_updated.isoformat()}"
+
+    def serialize_rows(self, rows):
+        return self.get_serializer(rows, many=True).data
+
+
+class ConditionalDetailMixin:
+    """ETag and Last-Modified on detail endpoints, from date_updated (and the
+    renderer for the ETag).
+    The object is fetched and its permissions checked first, then a matching
+    If-None-Match or If-Modified-Since gets a 304 without serialization.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_detail_response(request, self.get_object())
+
+    def get_detail_response(self, request, instance):
+        """304 or serialized instance, with its ETag and Last-Modified."""
+        etag = make_etag(
+            *representation(request), instance.pk, instance.date_updated.isoformat()
+        )
+        last_modified = timegm(instance.date_updated.utctimetuple())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_validators(response, etag, last_modified)
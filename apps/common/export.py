@@ -0,0 +1,38 @@
+from django.http import StreamingHttpResponse
+
+from .renderers import CSVRenderer, NDJSONRenderer
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class ExportMixin:
+    """Stream the filtered list as CSV or NDJSON (Accept header or ?format=csv|ndjson).
+    To be mixed in a list view : reuses its queryset scope, filters and serializer.
+    Rows are read in chunks and encoded one at a time, memory use stays constant.
+
+    The rows are read while the response is sent, after the middleware : from
+    the primary database, outside the Server-Timing phases. Under ASGI, in the
+    request's thread (apps.common.asgi.ASGIHandler).
+    """
+
+    http_method_names = ["get", "options"]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    pagination_class = None
+    export_name = "export"
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by("pk")
+        serializer = self.get_serializer()
+        objs = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        rows = (serializer.to_representation(obj) for obj in objs)
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f"{content_type}; charset={renderer.charset}"
+        response = StreamingHttpResponse(
+            renderer.stream(rows, list(serializer.fields)), content_type=content_type
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="{self.export_name}.{renderer.format}"'
+        return response
@@ -0,0 +1,171 @@
+import json
+import tracemalloc
+
+from django.core.management import BaseCommand, call_command
+from django.db import connection
+from django.forms.models import model_to_dict
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.clients.models import Client
+from apps.common.benchmark import benchmark_database, summarize, timed
+from apps.common.scopes import CHANGE
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import User
+
+BENCH_PASSWORD = "bench_password"
+ROLES = {"manager": 1, "sales": 2, "support": 3}
+ENDPOINTS = {"clients": Client, "contracts": Contract, "events": Event}
+FILTERS = {
+    "clients": {"status": "true"},
+    "contracts": {"status": "false", "payment_due__gte": "2022-06-01"},
+    "events": {"event_status": "false"},
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API endpoints per role on seeded test databases."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            dest="scales",
+            nargs="+",
+            default=[1, 10],
+            type=float,
+            help="Specify the dataset scales (create_data --scale), one run per scale.",
+        )
+        parser.add_argument(
+            "--repeat",
+            dest="repeat",
+            default=20,
+            type=int,
+            help="Specify the number of runs per endpoint and role.",
+        )
+        parser.add_argument(
+            "--seed",
+            dest="seed",
+            default=0,
+            type=int,
+            help="Specify the random seed for the datasets.",
+        )
+
+    def handle(self, *args, **options):
+        report = {"repeat": options["repeat"], "seed": options["seed"], "scales": []}
+        for scale in options["scales"]:
+            with benchmark_database():
+                if options["verbosity"] != 0:
+                    self.stderr.write(f"Seeding dataset, scale {scale}...")
+                call_command(
+                    "create_data", scale=scale, seed=options["seed"], verbosity=0
+                )
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+                report["database"] = connection.vendor
+                report["scales"].append(
+                    {
+                        "scale": scale,
+                        "rows": {
+                            name: model.objects.count()
+                            for name, model in ENDPOINTS.items()
+                        },
+                        "results": {
+                            role: self.run_role(team_id, options["repeat"])
+                            for role, team_id in ROLES.items()
+                        },
+                    }
+                )
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run_role(self, team_id, repeat):
+        """Log in as the first user of the team, then replay the calls."""
+        user = User.objects.filter(team_id=team_id).order_by("pk").first()
+        user.set_password(BENCH_PASSWORD)
+        user.save()
+        api_client = APIClient()
+        login = (
+            "post",
+            reverse("users:login"),
+            {"username": user.username, "password": BENCH_PASSWORD},
+        )
+        results = {"login": self.measure(api_client, *login, repeat=repeat)}
+        response = getattr(api_client, login[0])(*login[1:])
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        for name, call in self.get_calls(user).items():
+            results[name] = self.measure(api_client, *call, repeat=repeat)
+        return results
+
+    @staticmethod
+    def get_calls(user):
+        """Requests replayed for the user : lists, searches, filters, details of the
+        first visible objects, and updates (same data) of objects the user can change.
+        """
+        calls = {}
+        for name, model in ENDPOINTS.items():
+            list_url = reverse(f"{name}:list")
+            calls[f"{name}:list"] = ("get", list_url)
+            calls[f"{name}:filter"] = ("get", list_url, FILTERS[name])
+            obj = model.objects.visible_to(user).order_by("pk").first()
+            if obj is None:
+                continue
+            if model is Client:
+                client = obj
+            elif model is Contract:
+                client = obj.client
+            else:
+                client = obj.contract.client
+            calls[f"{name}:search"] = (
+                "get",
+                list_url,
+                {"search": client.last_name[:3]},
+            )
+            calls[f"{name}:detail"] = (
+                "get",
+                reverse(f"{name}:detail", kwargs={"pk": obj.pk}),
+            )
+
+            changeable = model.objects.visible_to(user, CHANGE).order_by("pk")
+            if model is Client:
+                changeable = changeable.filter(status=True)
+            elif model is Event:
+                changeable = changeable.filter(event_status=False)
+            obj = changeable.first()
+            if obj is not None:
+                calls[f"{name}:update"] = (
+                    "put",
+                    reverse(f"{name}:detail", kwargs={"pk": obj.pk}),
+                    model_to_dict(obj),
+                )
+        return calls
+
+    @staticmethod
+    def measure(api_client, method, url, data=None, repeat=1):
+        """Latency of repeated calls, then one more call traced for the number of
+        queries and the memory peak, so the tracing does not skew the latency.
+        """
+        send = getattr(api_client, method)
+        kwargs = {} if method == "get" else {"format": "json"}
+        samples = []
+        for _ in range(repeat):
+            response, duration = timed(send, url, data, **kwargs)
+            samples.append(duration)
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            response = send(url, data, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if not 200 <= response.status_code < 300:
+            rows = 0
+        elif isinstance(response.data, dict) and "results" in response.data:
+            rows = len(response.data["results"])
+        else:
+            rows = 1
+        return {
+            "status": response.status_code,
+            "rows": rows,
+            "queries": len(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "latency_ms": summarize(samples),
+        }
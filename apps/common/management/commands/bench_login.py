@@ -0,0 +1,77 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management import BaseCommand
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.common.benchmark import benchmark_database, summarize, timed
+from apps.users.models import User
+
+BENCH_PASSWORD = "bench_password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the authentication endpoints (login, refresh, verify) on a "
+        "test database, one request at a time : requests per second per core."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            dest="repeat",
+            default=20,
+            type=int,
+            help="Specify the number of requests per endpoint.",
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            user = User.objects.create_user(
+                username="bench_login", password=BENCH_PASSWORD, team_id=2
+            )
+            hasher = get_hasher()
+            report = {
+                "database": connection.vendor,
+                "repeat": options["repeat"],
+                "hasher": hasher.algorithm,
+                "iterations": hasher.iterations,
+                "hash_threads": settings.PASSWORD_HASH_THREADS,
+                "results": self.run(user, options["repeat"]),
+            }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def run(user, repeat):
+        """Time each endpoint, the refresh token of each response being the
+        next one to renew (rotation).
+        """
+        api_client = APIClient()
+        credentials = {"username": user.username, "password": BENCH_PASSWORD}
+        tokens = api_client.post(reverse("users:login"), credentials).data
+        calls = {
+            "login": lambda: api_client.post(reverse("users:login"), credentials),
+            "refresh": lambda: api_client.post(
+                reverse("users:refresh"), {"refresh": tokens["refresh"]}
+            ),
+            "verify": lambda: api_client.post(
+                reverse("users:verify"), {"token": tokens["access"]}
+            ),
+        }
+        results = {}
+        for name, call in calls.items():
+            samples = []
+            for _ in range(repeat):
+                response, duration = timed(call)
+                assert response.status_code == 200, response.content
+                tokens.update(response.data)
+                samples.append(duration)
+            latency = summarize(samples)
+            results[name] = {
+                "ms": latency,
+                "per_second_per_core": round(1000 / latency["mean"], 1),
+            }
+        return results
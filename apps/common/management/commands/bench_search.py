@@ -0,0 +1,142 @@
+import json
+import random
+from importlib import import_module
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from faker import Faker
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.clients.models import Client
+from apps.clients.views import ClientList
+from apps.common.benchmark import benchmark_database, summarize, timed
+from apps.common.pagination import CRMCursorPagination
+from apps.common.search import PrefixSearchFilter
+
+SEARCH_INDEXES_MIGRATION = "apps.clients.migrations.0003_prefix_search_indexes"
+SEARCH_TERMS = ["a", "jo", "mil", "smith", "sch", "lee", "zz"]
+SEARCH_BACKENDS = [SearchFilter, PrefixSearchFilter]
+BATCH_SIZE = 10000
+POOL_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Benchmark client prefix search on a seeded test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number",
+            "-n",
+            dest="number",
+            default=1000000,
+            type=int,
+            help="Specify the number of clients to seed.",
+        )
+        parser.add_argument(
+            "--repeat",
+            dest="repeat",
+            default=20,
+            type=int,
+            help="Specify the number of runs per search term.",
+        )
+        parser.add_argument(
+            "--seed",
+            dest="seed",
+            default=0,
+            type=int,
+            help="Specify the random seed for the dataset.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the seeded test database between runs.",
+        )
+        parser.add_argument(
+            "--without-indexes",
+            action="store_true",
+            help="Drop the prefix search indexes before running the searches.",
+        )
+
+    def handle(self, *args, **options):
+        if options["keepdb"] and options["without_indexes"]:
+            raise CommandError("--without-indexes cannot be used with --keepdb.")
+        with benchmark_database(keepdb=options["keepdb"]):
+            existing = Client.objects.count()
+            if existing < options["number"]:
+                if options["verbosity"] != 0:
+                    self.stderr.write(
+                        f"Seeding {options['number'] - existing} client(s)..."
+                    )
+                self.seed_clients(options["number"] - existing, options["seed"])
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            if options["without_indexes"]:
+                self.drop_search_indexes()
+            report = {
+                "database": connection.vendor,
+                "search_indexes": not options["without_indexes"],
+                "clients": options["number"],
+                "repeat": options["repeat"],
+                "results": self.run_searches(options["repeat"]),
+            }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def seed_clients(number, seed):
+        fake = Faker()
+        fake.seed_instance(seed)
+        rng = random.Random(seed)
+        first_names = [fake.first_name() for _ in range(POOL_SIZE)]
+        last_names = [fake.last_name() for _ in range(POOL_SIZE)]
+        companies = [fake.company() for _ in range(POOL_SIZE)]
+        for start in range(0, number, BATCH_SIZE):
+            batch = []
+            for i in range(start, min(start + BATCH_SIZE, number)):
+                first_name = rng.choice(first_names)
+                last_name = rng.choice(last_names)
+                batch.append(
+                    Client(
+                        first_name=first_name,
+                        last_name=last_name,
+                        email=f"{first_name}.{last_name}{i}@example.com".lower(),
+                        company_name=rng.choice(companies),
+                        status=rng.random() < 0.5,
+                    )
+                )
+            Client.objects.bulk_create(batch)
+
+    @staticmethod
+    def drop_search_indexes():
+        migration = import_module(SEARCH_INDEXES_MIGRATION).Migration
+        with connection.schema_editor() as schema_editor:
+            for operation in migration.operations:
+                schema_editor.execute(
+                    f"DROP INDEX IF EXISTS {schema_editor.quote_name(operation.name)}"
+                )
+
+    @staticmethod
+    def run_searches(repeat):
+        factory = APIRequestFactory()
+        page_size = CRMCursorPagination().get_page_size(Request(factory.get("/")))
+        ordering = CRMCursorPagination.ordering
+        results = {}
+        for backend in SEARCH_BACKENDS:
+            results[backend.__name__] = {}
+            for term in SEARCH_TERMS:
+                request = Request(factory.get("/", {"search": term}))
+                samples = []
+                for _ in range(repeat):
+                    queryset = backend().filter_queryset(
+                        request, Client.objects.all(), ClientList
+                    )
+                    page, duration = timed(
+                        list, queryset.order_by(*ordering)[:page_size]
+                    )
+                    samples.append(duration)
+                results[backend.__name__][term] = {
+                    "rows": len(page),
+                    "latency_ms": summarize(samples),
+                }
+        return results
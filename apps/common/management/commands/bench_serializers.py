@@ -0,0 +1,116 @@
+import json
+
+from django.core.management import BaseCommand, call_command
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from apps.clients.serializers import ClientSerializer
+from apps.common.benchmark import benchmark_database, summarize, timed
+from apps.common.pagination import CRMCursorPagination
+from apps.common.renderers import MessagePackRenderer, ORJSONRenderer
+from apps.common.sparse import ALWAYS_FETCHED
+from apps.common.values import ValuesSerializer
+from apps.contracts.serializers import ContractSerializer
+from apps.events.serializers import EventSerializer
+
+SERIALIZERS = {
+    "clients": ClientSerializer,
+    "contracts": ContractSerializer,
+    "events": EventSerializer,
+}
+RENDERERS = [JSONRenderer, ORJSONRenderer, MessagePackRenderer]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the list serialization paths (ModelSerializer and .values() "
+        "fast path) and the renderers on a seeded test database, in ms per 10k rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            dest="rows",
+            default=10000,
+            type=int,
+            help="Specify the number of rows serialized per run and model.",
+        )
+        parser.add_argument(
+            "--repeat",
+            dest="repeat",
+            default=10,
+            type=int,
+            help="Specify the number of runs per model and path.",
+        )
+        parser.add_argument(
+            "--seed",
+            dest="seed",
+            default=0,
+            type=int,
+            help="Specify the random seed for the dataset.",
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            if options["verbosity"] != 0:
+                self.stderr.write("Seeding dataset...")
+            # create_data makes 1 event, 2 contracts and 5 clients per 10 scale units
+            call_command(
+                "create_data",
+                scale=options["rows"] / 10,
+                seed=options["seed"],
+                verbosity=0,
+            )
+            report = {
+                "database": connection.vendor,
+                "repeat": options["repeat"],
+                "results": {
+                    name: self.run_model(serializer_class, options)
+                    for name, serializer_class in SERIALIZERS.items()
+                },
+            }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def run_model(serializer_class, options):
+        """Fetch and serialize the first rows of the list with both paths,
+        then render them with each renderer.
+        """
+        model = serializer_class.Meta.model
+        queryset = model.objects.order_by(*CRMCursorPagination.ordering)
+        queryset = queryset[: options["rows"]]
+        reader = ValuesSerializer(serializer_class())
+        columns = dict.fromkeys([*ALWAYS_FETCHED, *reader.columns])
+        paths = {
+            "serializer": lambda: serializer_class(list(queryset), many=True).data,
+            "values": lambda: reader.many(queryset.values(*columns)),
+        }
+        rows = queryset.count()
+        results = {"rows": rows}
+        outputs = {}
+        for path, serialize in paths.items():
+            samples = []
+            for _ in range(options["repeat"]):
+                outputs[path], duration = timed(serialize)
+                samples.append(duration * 10000 / max(rows, 1))
+            results[f"{path}_ms_per_10k_rows"] = summarize(samples)
+        results["speedup"] = round(
+            results["serializer_ms_per_10k_rows"]["mean"]
+            / results["values_ms_per_10k_rows"]["mean"],
+            2,
+        )
+        renderer = JSONRenderer()
+        results["identical"] = renderer.render(
+            outputs["serializer"]
+        ) == renderer.render(outputs["values"])
+        results["renderers"] = {}
+        for renderer_class in RENDERERS:
+            samples = []
+            for _ in range(options["repeat"]):
+                content, duration = timed(renderer_class().render, outputs["values"])
+                samples.append(duration * 10000 / max(rows, 1))
+            results["renderers"][renderer_class.media_type] = {
+                "ms_per_10k_rows": summarize(samples),
+                "bytes": len(content),
+            }
+        return results
@@ -1,11 +1,45 @@
 from django.core.management import BaseCommand, call_command
 
+SAMPLE_DATA = {
+    "create_users": 15,
+    "create_clients": 50,
+    "create_contracts": 20,
+    "create_events": 10,
+}
+
 
 class Command(BaseCommand):
     help = "Create dummy data."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            dest="scale",
+            default=1,
+            type=float,
+            help="Multiply the number of objects created.",
+        )
+        parser.add_argument(
+            "--seed",
+            dest="seed",
+            default=None,
+            type=int,
+            help="Specify the random seed, for reproducible data.",
+        )
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            default=1,
+            type=int,
+            help="Specify the number of processes generating the rows.",
+        )
+
     def handle(self, *args, **options):
-        call_command("create_users", number=15, verbosity=options["verbosity"])
-        call_command("create_clients", number=50, verbosity=options["verbosity"])
-        call_command("create_contracts", number=20, verbosity=options["verbosity"])
-        call_command("create_events", number=10, verbosity=options["verbosity"])
+        for command, number in SAMPLE_DATA.items():
+            call_command(
+                command,
+                number=max(1, round(number * options["scale"])),
+                seed=options["seed"],
+                workers=options["workers"],
+                verbosity=options["verbosity"],
+            )
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from apps.common.changes import FEED_MODELS
+from apps.common.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete the tombstones older than the change feeds' retention."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            dest="days",
+            default=settings.TOMBSTONE_RETENTION_DAYS,
+            type=int,
+            help="Specify the number of days kept (default: TOMBSTONE_RETENTION_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - timedelta(days=options["days"])
+        tombstones = Tombstone.objects.filter(
+            model__in=FEED_MODELS, date_deleted__lt=limit
+        )
+        deleted, _ = tombstones.delete()
+        self.stdout.write(f"{deleted} tombstones deleted.")
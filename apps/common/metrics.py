@@ -0,0 +1,155 @@
+import ipaddress
+import os
+from contextlib import contextmanager
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from apps.users.models import User
+from .timing import observing_queries
+
+LABELS = ["view", "method", "team"]
+
+REQUEST_LATENCY = Histogram("crm_request_duration_seconds", "Request latency.", LABELS)
+REQUEST_QUERIES = Counter("crm_request_queries", "SQL queries run.", LABELS)
+RESPONSE_BYTES = Counter("crm_response_bytes", "Response body bytes.", LABELS)
+AUTH_FAILURES = Counter(
+    "crm_auth_failures", "Requests rejected as unauthenticated (401).", LABELS
+)
+PERMISSION_DENIALS = Counter(
+    "crm_permission_denials", "Requests rejected as forbidden (403).", LABELS
+)
+
+
+class QueryCounter:
+    """Query observer counting the queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, duration):
+        self.count += 1
+
+    @contextmanager
+    def installed(self, databases=None):
+        """Count the queries run on every database connection in the block,
+        the connections of the current thread by default.
+        """
+        with observing_queries(self, databases):
+            yield self
+
+
+def get_team(user):
+    """Team label : no query, the API authentication already loads the team."""
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    if isinstance(user, User) and User.team.is_cached(user):
+        return user.team.name
+    return "unknown"
+
+
+def count_stream(content, labels):
+    """Streamed responses : bytes and queries counted as the content is sent."""
+    size = 0
+    counter = QueryCounter()
+    try:
+        with counter.installed():
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+    finally:
+        RESPONSE_BYTES.labels(*labels).inc(size)
+        REQUEST_QUERIES.labels(*labels).inc(counter.count)
+
+
+class MetricsMiddleware:
+    """Record latency, queries, response size, 401 and 403 responses per
+    url name, method and team. Prometheus client values are updated with
+    per-value locks, or written to per-process files when
+    PROMETHEUS_MULTIPROC_DIR is set. Runs in the sync or async request path.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with QueryCounter().installed() as counter:
+            start = perf_counter()
+            response = self.get_response(request)
+            duration = perf_counter() - start
+        return self.record(request, response, duration, counter.count)
+
+    async def __acall__(self, request):
+        # the async ORM runs in the request's sync thread, with its own connections
+        databases = await sync_to_async(connections.all)()
+        with QueryCounter().installed(databases) as counter:
+            start = perf_counter()
+            response = await self.get_response(request)
+            duration = perf_counter() - start
+        return self.record(request, response, duration, counter.count)
+
+    @staticmethod
+    def record(request, response, duration, queries):
+        match = request.resolver_match
+        labels = (
+            match.view_name if match else "unmatched",
+            request.method,
+            get_team(getattr(request, "user", None)),
+        )
+        REQUEST_LATENCY.labels(*labels).observe(duration)
+        REQUEST_QUERIES.labels(*labels).inc(queries)
+        if response.streaming:
+            response.streaming_content = count_stream(
+                response.streaming_content, labels
+            )
+        else:
+            RESPONSE_BYTES.labels(*labels).inc(len(response.content))
+        if response.status_code == 401:
+            AUTH_FAILURES.labels(*labels).inc()
+        elif response.status_code == 403:
+            PERMISSION_DENIALS.labels(*labels).inc()
+        return response
+
+
+def allowed(address):
+    """True if the address is in settings.METRICS_ALLOWED_IPS (addresses or networks)."""
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics(request):
+    """Prometheus text format, aggregated over all processes in multiprocess mode.
+    Served to the addresses of settings.METRICS_ALLOWED_IPS only.
+    """
+    if not allowed(request.META.get("REMOTE_ADDR", "")):
+        return HttpResponseForbidden()
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,45 @@
+# Generated by Django 4.1 on 2026-10-18 20:28
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=100)),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "date_deleted",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("client_id", models.BigIntegerField(null=True)),
+                ("contract_id", models.BigIntegerField(null=True)),
+                ("sales_contact_id", models.BigIntegerField(null=True)),
+                ("support_contact_id", models.BigIntegerField(null=True)),
+                ("prospect", models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["model", "date_deleted", "id"], name="tombstone_deleted_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import models
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.users.models import MANAGEMENT, SALES, SUPPORT
+
+
+class TombstoneQuerySet(models.QuerySet):
+    def visible_to(self, user, label):
+        """Deletions of the rows the user could VIEW (see the models' visible_to),
+        from the scope hints recorded with them :
+        Managers : all
+        Sales team : prospects and rows of their own clients, contracts or events
+        Support team : their own events, the contracts and clients of these events
+        """
+        tombstones = self.filter(model=label)
+        if user.team.name == MANAGEMENT:
+            return tombstones
+        elif user.team.name == SALES:
+            if label == "clients.client":
+                return tombstones.filter(Q(prospect=True) | Q(sales_contact_id=user.pk))
+            return tombstones.filter(sales_contact_id=user.pk)
+        elif user.team.name == SUPPORT:
+            if label == "events.event":
+                return tombstones.filter(support_contact_id=user.pk)
+            # deleting a contract or a client deletes its events
+            column = "contract_id" if label == "contracts.contract" else "client_id"
+            own_events = Tombstone.objects.filter(
+                model="events.event",
+                support_contact_id=user.pk,
+                **{column: OuterRef("object_id")},
+            )
+            return tombstones.filter(Exists(own_events))
+        return self.none()
+
+
+class Tombstone(models.Model):
+    """Deleted client, contract or event, reported by the change feeds.
+    The client, contract, sales and support contact ids of the row at deletion
+    time tell who could see it.
+    """
+
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    date_deleted = models.DateTimeField(default=timezone.now)
+    client_id = models.BigIntegerField(null=True)
+    contract_id = models.BigIntegerField(null=True)
+    sales_contact_id = models.BigIntegerField(null=True)
+    support_contact_id = models.BigIntegerField(null=True)
+    prospect = models.BooleanField(default=False)
+
+    objects = TombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["model", "date_deleted", "id"], name="tombstone_deleted_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Tombstone : {self.model} #{self.object_id}"
@@ -0,0 +1,24 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.utils.mediatypes import _MediaType, media_type_matches
+
+
+class CRMContentNegotiation(DefaultContentNegotiation):
+    """Renderers whose media type has parameters (application/json;
+    encoder=orjson) are only selected when the Accept header lists them with
+    their parameters : */* and application/json keep the first renderer
+    without parameters.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        accepts = self.get_accept_list(request)
+        requested, others = [], []
+        for renderer in renderers:
+            if not _MediaType(renderer.media_type).params:
+                others.append(renderer)
+            elif any(
+                _MediaType(accept).params
+                and media_type_matches(renderer.media_type, accept)
+                for accept in accepts
+            ):
+                requested.append(renderer)
+        return super().select_renderer(request, requested + others, format_suffix)
@@ -0,0 +1,19 @@
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class CRMCursorPagination(CursorPagination):
+    """Keyset pagination for the CRM list endpoints.
+    Pages are ordered on the indexed (date_created, id) columns and fetched
+    with a WHERE clause on the cursor position : no OFFSET scan and no COUNT query.
+
+    Async views fetch the page with apaginate_queryset : DRF's
+    paginate_queryset in a worker thread, as Django 4.1 runs the async ORM calls.
+    """
+
+    ordering = ("-date_created", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
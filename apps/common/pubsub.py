@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Most messages handled per dispatch : they share the same audience queries.
+BATCH_SIZE = 500
+
+
+class LocalBackend:
+    """Messages go to the subscribers of the publishing process only, once the
+    transaction is committed.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, message, using=DEFAULT_DB_ALIAS):
+        transaction.on_commit(lambda: self.broker.publish(message), using=using)
+
+    async def listen(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PostgresBackend:
+    """Messages go to the subscribers of every process through PostgreSQL
+    NOTIFY, sent on commit (one per message), and LISTEN on a connection of
+    each subscribing process, read in the event loop.
+    """
+
+    channel = "crm_changes"
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.connection = None
+
+    def publish(self, message, using=DEFAULT_DB_ALIAS):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)", [self.channel, json.dumps(message)]
+            )
+
+    async def listen(self):
+        if self.connection is not None:
+            return
+        self.connection = await sync_to_async(self.connect)()
+        asyncio.get_running_loop().add_reader(self.connection.fileno(), self.read)
+
+    def connect(self):
+        import psycopg2
+
+        params = connections[DEFAULT_DB_ALIAS].get_connection_params()
+        connection = psycopg2.connect(**params)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return connection
+
+    def read(self):
+        try:
+            self.connection.poll()
+        except Exception:
+            logger.exception("Change stream listener disconnected.")
+            self.close()
+            self.broker.lost()
+            return
+        while self.connection.notifies:
+            self.broker.publish(json.loads(self.connection.notifies.pop(0).payload))
+
+    def close(self):
+        if self.connection is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self.connection.fileno())
+        except RuntimeError:
+            pass
+        self.connection.close()
+        self.connection = None
+
+
+BACKENDS = {"local": LocalBackend, "postgresql": PostgresBackend}
+
+
+class Broker:
+    """In-process pub/sub for the subscribers of an event loop.
+    publish() is thread safe, costs nothing while the process has no
+    subscribers and never waits : messages are queued to the event loop,
+    where dispatch(messages, subscribers) handles them in batches, the
+    subscribers being a collection made by subscribers() (add, discard and
+    iteration, e.g. a set). The backend (settings.EVENT_STREAM_BACKEND) carries the messages from the
+    transactions to the brokers : of this process, or of every process.
+    """
+
+    def __init__(self, dispatch, subscribers=set):
+        self.dispatch = dispatch
+        self.subscribers = subscribers()
+        self.backend = None
+        self.loop = None
+        self.inbox = None
+        self.task = None
+
+    def get_backend(self):
+        if self.backend is None:
+            self.backend = BACKENDS[settings.EVENT_STREAM_BACKEND](self)
+        return self.backend
+
+    def send(self, message, using=DEFAULT_DB_ALIAS):
+        """Publish the message through the backend, from the writing code."""
+        self.get_backend().publish(message, using)
+
+    def publish(self, message):
+        """Queue the message for the subscribers of this process."""
+        loop = self.loop
+        if loop is None or not self.subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self.inbox.put_nowait, message)
+        except RuntimeError:
+            # the loop is closed
+            pass
+
+    async def subscribe(self, subscriber):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.stop()
+            self.loop = loop
+            self.inbox = asyncio.Queue()
+            self.task = loop.create_task(self.run())
+        self.subscribers.add(subscriber)
+        await self.get_backend().listen()
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def lost(self):
+        """Messages may have been lost : every subscriber must resync."""
+        for subscriber in list(self.subscribers):
+            subscriber.resync()
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+        self.loop = self.inbox = self.task = None
+
+    async def run(self):
+        while True:
+            messages = [await self.inbox.get()]
+            while not self.inbox.empty() and len(messages) < BATCH_SIZE:
+                messages.append(self.inbox.get_nowait())
+            if not self.subscribers:
+                continue
+            try:
+                await self.dispatch(messages, self.subscribers)
+            except Exception:
+                logger.exception("Change stream dispatch failed.")
+                self.lost()
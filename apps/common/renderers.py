@@ -0,0 +1,107 @@
+import csv
+import datetime
+import json
+
+import msgpack
+import orjson
+from rest_framework import fields
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .timing import TimedRendererMixin
+
+
+def encode_default(obj):
+    """Values the orjson and MessagePack encoders do not support natively :
+    dates and times as the serializer fields output them (DATE_FORMAT,
+    DATETIME_FORMAT), the other types as DRF's JSONEncoder.
+    """
+    if isinstance(obj, datetime.datetime):
+        return fields.DateTimeField().to_representation(obj)
+    if isinstance(obj, datetime.date):
+        return fields.DateField().to_representation(obj)
+    if isinstance(obj, datetime.time):
+        return fields.TimeField().to_representation(obj)
+    return JSONEncoder().default(obj)
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer : write() returns the line instead of storing it."""
+
+    @staticmethod
+    def write(value):
+        return value
+
+
+class TimedJSONRenderer(TimedRendererMixin, JSONRenderer):
+    """JSON renderer reporting its time to the Server-Timing middleware."""
+
+
+class ORJSONRenderer(TimedRendererMixin, BaseRenderer):
+    """Compact JSON encoded by orjson, several times faster than the json
+    module on large lists. Opt-in : Accept: application/json; encoder=orjson.
+    """
+
+    media_type = "application/json; encoder=orjson"
+    format = "json"
+    charset = None
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return orjson.dumps(data, default=encode_default, option=self.options)
+
+
+class MessagePackRenderer(TimedRendererMixin, BaseRenderer):
+    """MessagePack, a compact binary equivalent of JSON (Accept: application/msgpack)."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default)
+
+
+class CSVRenderer(BaseRenderer):
+    """Comma-separated values, one row per object."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0].keys()) if rows else []
+        return "".join(self.stream(rows, fields)).encode(self.charset)
+
+    @staticmethod
+    def stream(rows, fields):
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([row[field] for field in fields])
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON, one object per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return "".join(self.stream(rows)).encode("utf-8")
+
+    @staticmethod
+    def stream(rows, fields=None):
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + "\n"
@@ -0,0 +1,191 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+_routing = ContextVar("replica_routing", default=None)
+_unset = object()
+
+# Seconds since the last replayed transaction, 0 when the replica has replayed
+# everything it received (an idle primary does not make it lag).
+POSTGRESQL_LAG = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END
+"""
+
+# Per process : alias -> (time of the check, lag in seconds or None if unreachable)
+_lags = {}
+
+
+def pin_key(user_id):
+    return f"crm:pinned:{user_id}"
+
+
+def token_user_id(request):
+    """User id of the request's access token, without querying the database.
+    None if the request has no valid token.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except InvalidToken:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind the primary, 0 for backends without
+    replication status (SQLite).
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRESQL_LAG)
+        return float(cursor.fetchone()[0] or 0)
+
+
+def checked_lag(alias):
+    """Lag of the replica, checked at most every REPLICA_LAG_CHECK_INTERVAL
+    seconds per process. None if the replica is unreachable.
+    """
+    now = time.monotonic()
+    checked = _lags.get(alias)
+    if checked is None or now - checked[0] >= settings.REPLICA_LAG_CHECK_INTERVAL:
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError:
+            lag = None
+        checked = _lags[alias] = (now, lag)
+    return checked[1]
+
+
+def choose_replica():
+    """Random replica within REPLICA_MAX_LAG seconds of the primary. When none
+    is, the primary (None) with REPLICA_FALLBACK, otherwise any replica.
+    """
+    replicas = settings.REPLICA_DATABASES
+    available = []
+    for alias in replicas:
+        lag = checked_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+            available.append(alias)
+    if not available and settings.REPLICA_FALLBACK:
+        return None
+    return random.choice(available or replicas)
+
+
+class Routing:
+    """Read database of a request, chosen on its first query."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.alias = _unset
+
+    def read_alias(self):
+        if self.alias is _unset:
+            pinned = cache.get(pin_key(self.user_id))
+            self.alias = None if pinned else choose_replica()
+        return self.alias
+
+
+def read_from_primary():
+    """Send the next reads of the current request to the primary."""
+    routing = _routing.get()
+    if routing is not None:
+        routing.alias = None
+
+
+class ReplicaRouter:
+    """Send the reads of safe-method API requests to the replicas
+    (settings.REPLICA_DATABASES), see ReplicaMiddleware. Their writes go to
+    the primary, as do the next reads. Outside these requests, Django's
+    default routing applies.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        return routing.read_alias()
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        routing.alias = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    """Route the reads of safe-method requests authenticated by an access
+    token to the replicas, with read-your-writes : once a user's write request
+    succeeds, their reads stay on the primary for REPLICA_STICKY_SECONDS
+    (pinned in the cache, to be shared by the worker processes).
+    Session and anonymous requests use the primary. Does nothing without
+    replicas. Runs in the sync or async request path.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+        with self.routing(request) as user_id:
+            response = self.get_response(request)
+        return self.pin(request, response, user_id)
+
+    async def __acall__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return await self.get_response(request)
+        with self.routing(request) as user_id:
+            response = await self.get_response(request)
+        return self.pin(request, response, user_id)
+
+    @staticmethod
+    @contextmanager
+    def routing(request):
+        user_id = token_user_id(request)
+        safe = request.method in permissions.SAFE_METHODS
+        token = _routing.set(Routing(user_id) if safe and user_id else None)
+        try:
+            yield user_id
+        finally:
+            _routing.reset(token)
+
+    @staticmethod
+    def pin(request, response, user_id):
+        if (
+            user_id
+            and request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+        ):
+            cache.set(pin_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+        return response
@@ -0,0 +1,59 @@
+from django.db import models
+from django.db.models import Exists, OuterRef
+from rest_framework import permissions
+
+from apps.users.models import MANAGEMENT
+
+VIEW = "view"
+CHANGE = "change"
+DELETE = "delete"
+
+
+def action_for(method):
+    """Returns the scope action required by an HTTP method."""
+    if method in permissions.SAFE_METHODS:
+        return VIEW
+    elif method == "DELETE":
+        return DELETE
+    return CHANGE
+
+
+def scope_key(user):
+    """Identifies the rows visible to the user : managers share one scope,
+    sales and support scopes depend on the user.
+    """
+    if user.team.name == MANAGEMENT:
+        return "manager"
+    return f"{user.team.name.lower()}:{user.pk}"
+
+
+def has_access(request, obj):
+    """Check if obj is in the request user's scope for the request method.
+    Reads the has_access annotation set by ScopedQuerySet.with_access,
+    otherwise runs a single EXISTS query on the primary key.
+    """
+    access = getattr(obj, "has_access", None)
+    if access is not None:
+        return access
+    return (
+        type(obj)
+        .objects.visible_to(request.user, action_for(request.method))
+        .filter(pk=obj.pk)
+        .exists()
+    )
+
+
+class ScopedQuerySet(models.QuerySet):
+    """Base queryset for role scoped CRM models.
+    Subclasses implement visible_to(user, action) with the team rules.
+    """
+
+    def visible_to(self, user, action=VIEW):
+        raise NotImplementedError
+
+    def with_access(self, user, action=VIEW):
+        """Annotate each row with has_access, so that object permissions
+        are resolved in the same query as the object lookup.
+        """
+        scope = self.model.objects.visible_to(user, action).filter(pk=OuterRef("pk"))
+        return self.annotate(has_access=Exists(scope))
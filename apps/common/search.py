@@ -0,0 +1,137 @@
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.db import models
+from django.db.migrations.operations.base import Operation
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Coalesce
+from rest_framework.filters import SearchFilter
+
+
+class PrefixSearchFilter(SearchFilter):
+    """Search backend matching the prefix search indexes.
+    Fields of the model itself are combined with OR, which the database serves
+    with one index scan per field. Fields across relations are each looked up
+    in their own subquery, starting from the index of the related table, and
+    combined with UNION instead of an OR spanning the joined tables.
+
+    Terms shorter than settings.SEARCH_MIN_PREFIX_LENGTH match a large share of
+    the rows : scanning the table in the list order finds a page sooner than
+    the indexes. They are matched on the columns wrapped in COALESCE, same
+    results without the prefix indexes, in one OR across the joined tables.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        local_lookups = []
+        related_lookups = []
+        for search_field in search_fields:
+            orm_lookup = self.construct_search(str(search_field))
+            if LOOKUP_SEP in str(search_field):
+                related_lookups.append(orm_lookup)
+            else:
+                local_lookups.append(orm_lookup)
+
+        manager = queryset.model._default_manager
+        for search_term in search_terms:
+            if len(search_term) < settings.SEARCH_MIN_PREFIX_LENGTH:
+                queryset = self.filter_unindexed(queryset, search_fields, search_term)
+                continue
+            local = [models.Q(**{lookup: search_term}) for lookup in local_lookups]
+            if not related_lookups:
+                queryset = queryset.filter(reduce(operator.or_, local))
+                continue
+            branches = [
+                manager.filter(**{lookup: search_term}).values("pk")
+                for lookup in related_lookups
+            ]
+            if local:
+                branches.append(
+                    manager.filter(reduce(operator.or_, local)).values("pk")
+                )
+            queryset = queryset.filter(pk__in=branches[0].union(*branches[1:]))
+        return queryset
+
+    def filter_unindexed(self, queryset, search_fields, search_term):
+        conditions = []
+        for index, search_field in enumerate(search_fields):
+            field, lookup = self.construct_search(str(search_field)).rsplit(
+                LOOKUP_SEP, 1
+            )
+            alias = f"_search_{index}"
+            queryset = queryset.alias(**{alias: Coalesce(field, models.Value(""))})
+            conditions.append(models.Q(**{f"{alias}__{lookup}": search_term}))
+        queryset = queryset.filter(reduce(operator.or_, conditions))
+        if self.must_call_distinct(queryset, search_fields):
+            queryset = queryset.distinct()
+        return queryset
+
+
+class AddPrefixSearchIndex(Operation):
+    """Create an index serving case-insensitive prefix search (istartswith) on a field.
+    PostgreSQL : expression index on UPPER(field) with text_pattern_ops,
+                 the form used by Django for istartswith lookups.
+    SQLite : index on the field with NOCASE collation, used by the LIKE optimisation.
+    Other databases are left unchanged. The index is not part of the model state.
+    """
+
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, field_name, name):
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+
+    def deconstruct(self):
+        kwargs = {
+            "model_name": self.model_name,
+            "field_name": self.field_name,
+            "name": self.name,
+        }
+        return self.__class__.__name__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        quote = schema_editor.quote_name
+        table = quote(model._meta.db_table)
+        column = quote(model._meta.get_field(self.field_name).column)
+        vendor = schema_editor.connection.vendor
+        if vendor == "postgresql":
+            expression = f"UPPER({column}::text) text_pattern_ops"
+        elif vendor == "sqlite":
+            expression = f"{column} COLLATE NOCASE"
+        else:
+            return
+        schema_editor.execute(
+            f"CREATE INDEX {quote(self.name)} ON {table} ({expression})"
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor in ["postgresql", "sqlite"]:
+            schema_editor.execute(
+                f"DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}"
+            )
+
+    def describe(self):
+        return (
+            f"Create prefix search index {self.name} "
+            f"on {self.model_name}.{self.field_name}"
+        )
+
+    @property
+    def migration_name_fragment(self):
+        return self.name.lower()
@@ -0,0 +1,147 @@
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+
+import django
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+from faker import Faker
+
+BATCH_SIZE = 5000
+
+_worker = {}
+
+
+def seeded_faker(label, seed, batch):
+    """Faker instance whose output only depends on the command, seed and batch number.
+    Weighted name frequencies are turned off, they account for most of the generation time.
+    """
+    fake = Faker(use_weighting=False)
+    fake.seed_instance(f"{label}:{seed}:{batch}")
+    return fake
+
+
+def init_worker(module, label, seed, context):
+    """Process pool initializer : load the command generating the rows."""
+    if not apps.ready:
+        django.setup()
+    _worker["generate"] = import_module(module).Command.generate
+    _worker["label"] = label
+    _worker["seed"] = seed
+    _worker["context"] = context
+
+
+def generate_batch(batch, start, count):
+    """Generate one batch in a pool worker, same rows as in the main process."""
+    fake = seeded_faker(_worker["label"], _worker["seed"], batch)
+    return _worker["generate"](fake, start, count, _worker["context"])
+
+
+class SeedCommand(BaseCommand):
+    """Base command for creating sample data.
+    Rows are generated in fixed size batches, each with its own seeded Faker
+    instance, and inserted with bulk_create : the same seed gives the same data.
+    With --workers, batches are generated in a process pool and inserted by
+    the main process, in order.
+
+    Subclasses set model, label and default_number, and implement generate().
+    """
+
+    model = None
+    label = None
+    default_number = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number",
+            "-n",
+            dest="number",
+            default=self.default_number,
+            type=int,
+            help=f"Specify the number of {self.label}s to create.",
+        )
+        parser.add_argument(
+            "--seed",
+            dest="seed",
+            default=None,
+            type=int,
+            help="Specify the random seed, for reproducible data.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            default=BATCH_SIZE,
+            type=int,
+            help="Specify the number of rows generated and inserted per batch.",
+        )
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            default=1,
+            type=int,
+            help="Specify the number of processes generating the rows.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--workers and --batch-size must be positive.")
+        number = self.get_number(options)
+        if options["verbosity"] != 0:
+            self.stdout.write(f"Creating {number} {self.label}(s)...")
+        seed = options["seed"]
+        if seed is None:
+            seed = random.randrange(2**32)
+        context = self.get_context(number, seed, options)
+        batches = [
+            (batch, start, min(options["batch_size"], number - start))
+            for batch, start in enumerate(range(0, number, options["batch_size"]))
+        ]
+        if options["workers"] > 1 and len(batches) > 1:
+            results = self.generate_parallel(batches, seed, context, options["workers"])
+        else:
+            results = (
+                self.generate(
+                    seeded_faker(self.label, seed, batch), start, count, context
+                )
+                for batch, start, count in batches
+            )
+        for rows in results:
+            self.write(rows)
+        self.finish(options)
+
+    def generate_parallel(self, batches, seed, context, workers):
+        """Yields the generated batches in order, keeping at most two batches
+        per worker in flight while the previous ones are being inserted.
+        """
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(type(self).__module__, self.label, seed, context),
+        ) as executor:
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(generate_batch, *batch))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def get_number(self, options):
+        """Returns the number of rows to create."""
+        return options["number"]
+
+    def get_context(self, number, seed, options):
+        """Returns the data shared by all batches (related ids, password hash...)."""
+        return {}
+
+    @staticmethod
+    def generate(fake, start, count, context):
+        """Returns a list of count rows (field values dicts), starting at row start."""
+        raise NotImplementedError
+
+    def finish(self, options):
+        """Called once all rows are inserted, e.g. to refresh derived tables."""
+
+    def write(self, rows):
+        self.model.objects.bulk_create([self.model(**row) for row in rows])
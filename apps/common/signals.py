@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+
+from .cache import CRM_MODELS, bump_version
+from .changes import FEED_MODELS, deleting_event, record_deletion
+from .models import Tombstone
+from .stream import SCOPE_FIELDS, loaded_scope, publish_deletion, publish_save
+
+
+def invalidate_lists(sender, **kwargs):
+    """Cached lists reading the saved or deleted model are outdated."""
+    bump_version(sender._meta.label_lower)
+
+
+for label in CRM_MODELS:
+    model = apps.get_model(label)
+    post_save.connect(invalidate_lists, sender=model, dispatch_uid=f"save_{label}")
+    post_delete.connect(invalidate_lists, sender=model, dispatch_uid=f"delete_{label}")
+
+for label in FEED_MODELS:
+    post_delete.connect(
+        record_deletion, sender=apps.get_model(label), dispatch_uid=f"tombstone_{label}"
+    )
+pre_delete.connect(
+    deleting_event,
+    sender=apps.get_model("events.event"),
+    dispatch_uid="tombstone_hints",
+)
+
+for model in SCOPE_FIELDS:
+    label = model._meta.label_lower
+    post_init.connect(loaded_scope, sender=model, dispatch_uid=f"stream_{label}")
+    post_save.connect(publish_save, sender=model, dispatch_uid=f"stream_{label}")
+post_save.connect(publish_deletion, sender=Tombstone, dispatch_uid="stream_tombstone")
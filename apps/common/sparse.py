@@ -0,0 +1,70 @@
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+
+# Columns the list and detail views rely on : primary key, cursor ordering, ETag.
+ALWAYS_FETCHED = ["id", "date_created", "date_updated"]
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def select_fields(request, serializer_class):
+    """Serializer field names kept by ?fields= and ?exclude= (comma separated),
+    in the serializer order. None if the request selects nothing or is a write.
+    """
+    if request.method not in permissions.SAFE_METHODS:
+        return None
+    fields = request.query_params.get("fields")
+    exclude = request.query_params.get("exclude")
+    if not fields and not exclude:
+        return None
+    available = list(serializer_class().fields)
+    selected = parse_names(fields) if fields else available
+    excluded = parse_names(exclude) if exclude else []
+    unknown = [name for name in [*selected, *excluded] if name not in available]
+    if unknown:
+        raise ValidationError(
+            {"detail": f"Unknown field(s): {', '.join(dict.fromkeys(unknown))}."}
+        )
+    return [name for name in available if name in selected and name not in excluded]
+
+
+class SparseFieldsSerializerMixin:
+    """Only serialize the fields selected by the view (context["fields"])."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get("fields")
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
+
+
+class SparseFieldsMixin:
+    """Sparse fieldsets on read requests : ?fields=id,name keeps the listed
+    fields, ?exclude=notes drops them. The other columns are deferred with
+    only() and never fetched, except the ones the views rely on : primary key,
+    cursor ordering and ETag (date_created, date_updated).
+    """
+
+    def get_selected_fields(self):
+        if not hasattr(self, "_selected_fields"):
+            self._selected_fields = select_fields(
+                self.request, self.get_serializer_class()
+            )
+        return self._selected_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_selected_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        selected = self.get_selected_fields()
+        if selected is None:
+            return queryset
+        fields = self.get_serializer_class()().fields
+        columns = {fields[name].source for name in selected}
+        return queryset.only(*ALWAYS_FETCHED, *sorted(columns))
@@ -0,0 +1,432 @@
+import asyncio
+import io
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from rest_framework.exceptions import APIException
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract
+from apps.events.models import Event, SupportAssignment
+from apps.users.authentication import TeamJWTAuthentication
+from apps.users.models import MANAGEMENT, SALES, SUPPORT
+from .models import Tombstone
+from .pubsub import Broker
+
+STREAM_PATH = "/crm/stream/"
+EXPIRED = b"event: expired\ndata: {}\n\n"
+
+# Fields deciding who sees a row, besides its relations (see the models' visible_to)
+SCOPE_FIELDS = {
+    Client: ("sales_contact_id", "status"),
+    Contract: ("sales_contact_id",),
+    Event: ("support_contact_id", "contract_id"),
+}
+# Instance attribute : scope field values as loaded from the database
+LOADED = "_stream_scope"
+
+
+class Audience:
+    """Users seeing a row : managers, sales and support contacts by id,
+    every sales user for prospects.
+    """
+
+    def __init__(self, sales=(), support=(), all_sales=False):
+        self.sales = {pk for pk in sales if pk is not None}
+        self.support = {pk for pk in support if pk is not None}
+        self.all_sales = all_sales
+
+
+class Subscribers:
+    """Subscribers of the process indexed by team and user id : finding the
+    ones of an audience costs the size of the audience, not the number of
+    connections.
+    """
+
+    def __init__(self):
+        self.all = set()
+        # team name -> user id -> the user's subscribers
+        self.teams = {}
+
+    def add(self, subscriber):
+        self.all.add(subscriber)
+        users = self.teams.setdefault(subscriber.team, {})
+        users.setdefault(subscriber.user_id, set()).add(subscriber)
+
+    def discard(self, subscriber):
+        self.all.discard(subscriber)
+        users = self.teams.get(subscriber.team, {})
+        connections = users.get(subscriber.user_id, set())
+        connections.discard(subscriber)
+        if not connections:
+            users.pop(subscriber.user_id, None)
+
+    def __iter__(self):
+        return iter(self.all)
+
+    def __len__(self):
+        return len(self.all)
+
+    def team(self, name, user_ids=None):
+        """Subscribers of the team, of these users only if given."""
+        users = self.teams.get(name, {})
+        if user_ids is None:
+            user_ids = users.keys()
+        return {subscriber for pk in user_ids for subscriber in users.get(pk, ())}
+
+    def seeing(self, audience):
+        return (
+            self.team(MANAGEMENT)
+            | self.team(SALES, None if audience.all_sales else audience.sales)
+            | self.team(SUPPORT, audience.support)
+        )
+
+
+def previous_audience(label, scope, contract_sales):
+    """Audience of a row from its scope field values, None if unknown.
+    contract_sales : sales contact id of the events' previous contracts.
+    """
+    if scope is None:
+        return None
+    if label == "clients.client":
+        return Audience([scope["sales_contact_id"]], all_sales=not scope["status"])
+    if label == "contracts.contract":
+        return Audience([scope["sales_contact_id"]])
+    return Audience(
+        [contract_sales.get(scope["contract_id"])],
+        support=[scope["support_contact_id"]],
+    )
+
+
+def loaded_scope(sender, instance, **kwargs):
+    values = instance.__dict__
+    fields = SCOPE_FIELDS[sender]
+    if all(field in values for field in fields):
+        values[LOADED] = {field: values[field] for field in fields}
+
+
+def publish_save(sender, instance, using, **kwargs):
+    """post_save : publish the change, with the scope values the row had."""
+    values = instance.__dict__
+    broker.send(
+        {
+            "model": sender._meta.label_lower,
+            "id": instance.pk,
+            "action": "save",
+            "previous": values.get(LOADED),
+        },
+        using,
+    )
+    fields = SCOPE_FIELDS[sender]
+    if all(field in values for field in fields):
+        # values as stored, e.g. a status string assigned before the save
+        values[LOADED] = {
+            field: sender._meta.get_field(field).to_python(values[field])
+            for field in fields
+        }
+
+
+def publish_deletion(sender, instance, created, using, **kwargs):
+    """Tombstone post_save : publish the deletion, with its scope hints."""
+    if not created:
+        return
+    broker.send(
+        {
+            "model": instance.model,
+            "id": instance.object_id,
+            "action": "delete",
+            "sales": [instance.sales_contact_id],
+            "support": [instance.support_contact_id],
+            "prospect": instance.prospect,
+        },
+        using,
+    )
+
+
+# Current audience of saved rows : id, sales contact, status, support contact
+SAVED_AUDIENCE = {
+    "clients.client": lambda ids: Client.objects.filter(pk__in=ids).values_list(
+        "id", "sales_contact_id", "status", "support_assignments__support_contact_id"
+    ),
+    "contracts.contract": lambda ids: Contract.objects.filter(pk__in=ids).values_list(
+        "id", "sales_contact_id", "status", "event__support_contact_id"
+    ),
+    "events.event": lambda ids: Event.objects.filter(pk__in=ids).values_list(
+        "id", "contract__sales_contact_id", "event_status", "support_contact_id"
+    ),
+}
+# Support contacts of deleted clients and contracts : through their deleted events
+DELETED_SUPPORT = {"clients.client": "client_id", "contracts.contract": "contract_id"}
+
+
+def resolve(messages):
+    """Current and previous audience of each message, with one query per
+    model for the saved rows, one for the events' previous contracts, one for
+    the support assignments of their clients, one per model for the deleted
+    clients and contracts.
+
+    A support contact leaving an event no longer sees its contract, nor its
+    client without another event of the client : "remove" messages of the
+    contract and the client follow the event's.
+    """
+    saved, deleted, previous_contracts = {}, {}, set()
+    for message in messages:
+        if message["action"] == "save":
+            saved.setdefault(message["model"], set()).add(message["id"])
+            if message["model"] == "events.event" and message["previous"]:
+                previous_contracts.add(message["previous"]["contract_id"])
+        elif message["model"] in DELETED_SUPPORT:
+            deleted.setdefault(message["model"], set()).add(message["id"])
+
+    audiences = {}
+    for label, ids in saved.items():
+        for pk, sales_contact, status, support_contact in SAVED_AUDIENCE[label](ids):
+            # one row per event of a client
+            audience = audiences.setdefault((label, pk), Audience())
+            audience.sales.add(sales_contact)
+            audience.support.add(support_contact)
+            audience.all_sales = label == "clients.client" and not status
+    for label, ids in deleted.items():
+        column = DELETED_SUPPORT[label]
+        supports = Tombstone.objects.filter(
+            model="events.event", **{f"{column}__in": ids}
+        ).values_list(column, "support_contact_id")
+        for pk, support_contact in supports:
+            audiences.setdefault((label, pk), Audience()).support.add(support_contact)
+
+    # previous contract id -> (sales contact, client, current support contact)
+    contracts = {}
+    if previous_contracts:
+        contracts = {
+            pk: rest
+            for pk, *rest in Contract.objects.filter(
+                pk__in=previous_contracts
+            ).values_list(
+                "id", "sales_contact_id", "client_id", "event__support_contact_id"
+            )
+        }
+    contract_sales = {pk: contract[0] for pk, contract in contracts.items()}
+    # (previous contract, previous support contact) of the events leaving them
+    left = set()
+    for message in messages:
+        if message["model"] == "events.event" and message["action"] == "save":
+            scope = message["previous"] or {}
+            support_contact = scope.get("support_contact_id")
+            contract = contracts.get(scope.get("contract_id"))
+            if support_contact is not None and contract is not None:
+                if contract[2] != support_contact:
+                    left.add((scope["contract_id"], support_contact))
+    assigned = set()
+    if left:
+        assigned = set(
+            SupportAssignment.objects.filter(
+                client_id__in={contracts[pk][1] for pk, _ in left},
+                support_contact_id__in={support for _, support in left},
+            ).values_list("client_id", "support_contact_id")
+        )
+
+    resolved = []
+    for message in messages:
+        key = (message["model"], message["id"])
+        if message["action"] == "save":
+            audience = audiences.get(key, Audience())
+            previous = previous_audience(
+                message["model"], message["previous"], contract_sales
+            )
+        else:
+            audience = Audience(
+                message["sales"],
+                [*message["support"], *audiences.get(key, Audience()).support],
+                all_sales=message["prospect"],
+            )
+            previous = None
+        audience.sales.discard(None)
+        audience.support.discard(None)
+        resolved.append((message, audience, previous))
+        if key[0] == "events.event" and message["action"] == "save":
+            scope = message["previous"] or {}
+            pair = (scope.get("contract_id"), scope.get("support_contact_id"))
+            if pair in left:
+                resolved.extend(left_rows(pair, contracts[pair[0]][1], assigned))
+    return resolved
+
+
+def left_rows(pair, client_id, assigned):
+    """ "remove" messages of the contract, and the client if no other event of
+    the client is assigned to the support contact.
+    """
+    contract_id, support_contact = pair
+    rows = [("contracts.contract", contract_id)]
+    if (client_id, support_contact) not in assigned:
+        rows.append(("clients.client", client_id))
+    return [
+        (
+            {"model": label, "id": pk, "action": "remove"},
+            Audience(),
+            Audience(support=[support_contact]),
+        )
+        for label, pk in rows
+    ]
+
+
+def resolve_in_thread(messages):
+    """resolve() in a sync thread, which no request cycle closes the
+    connection of : an unusable or outdated connection is closed before and
+    after, as around a request.
+    """
+    close_old_connections()
+    try:
+        return resolve(messages)
+    finally:
+        close_old_connections()
+
+
+def event_data(message, action):
+    data = json.dumps(
+        {"model": message["model"], "id": message["id"], "action": action}
+    )
+    return f"event: change\ndata: {data}\n\n".encode()
+
+
+async def dispatch(messages, subscribers):
+    """Send each change to the subscribers seeing the row, and "remove" to the
+    ones who saw it before the save only (reassigned, converted).
+    """
+    resolved = await sync_to_async(resolve_in_thread)(messages)
+    for message, audience, previous in resolved:
+        seeing = subscribers.seeing(audience)
+        if message["action"] != "remove":
+            data = event_data(message, message["action"])
+            for subscriber in seeing:
+                subscriber.push(data)
+        if previous is not None:
+            removed = event_data(message, "remove")
+            for subscriber in subscribers.seeing(previous) - seeing:
+                subscriber.push(removed)
+
+
+broker = Broker(dispatch, Subscribers)
+
+
+class Subscriber:
+    """Stream connection : queue of the events to send, up to
+    settings.EVENT_STREAM_QUEUE_SIZE. A client not reading them in time gets
+    a single "resync" event instead.
+    """
+
+    def __init__(self, user):
+        self.user_id = user.pk
+        self.team = user.team.name
+        self.queue = asyncio.Queue(settings.EVENT_STREAM_QUEUE_SIZE)
+
+    def push(self, data):
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(b"event: resync\ndata: {}\n\n")
+
+    def close(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+async def send_json(send, status, data):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": json.dumps(data).encode()})
+
+
+async def wait_disconnect(receive, subscriber):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    subscriber.close()
+
+
+async def event_stream(scope, receive, send):
+    """Server-Sent Events of the clients, contracts and events saved or deleted
+    in the user scope (JWT access token in the Authorization header) :
+    'change' events with the model, id and action (save, delete, or remove
+    for rows leaving the scope), 'resync' when changes were dropped, then to
+    be read from the change feeds. Comments keep the connection alive every
+    settings.EVENT_STREAM_KEEPALIVE seconds. The stream ends with an 'expired'
+    event when the access token expires, to be reopened with a new one.
+
+    An idle connection holds a queue and two waiting coroutines : no thread,
+    no database connection nor query.
+    """
+    if scope["method"] != "GET":
+        return await send_json(
+            send, 405, {"detail": f'Method "{scope["method"]}" not allowed.'}
+        )
+    request = ASGIRequest(scope, io.BytesIO())
+    try:
+        user_auth = await TeamJWTAuthentication().aauthenticate(request)
+    except APIException as exc:
+        return await send_json(send, exc.status_code, exc.detail)
+    if user_auth is None:
+        return await send_json(
+            send, 401, {"detail": "Authentication credentials were not provided."}
+        )
+
+    user, token = user_auth
+    subscriber = Subscriber(user)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+    await broker.subscribe(subscriber)
+    watcher = asyncio.create_task(wait_disconnect(receive, subscriber))
+    try:
+        data = b": connected\n\n"
+        while data is not None:
+            await send({"type": "http.response.body", "body": data, "more_body": True})
+            remaining = token["exp"] - time.time()
+            if remaining <= 0:
+                await send({"type": "http.response.body", "body": EXPIRED})
+                break
+            try:
+                data = await asyncio.wait_for(
+                    subscriber.queue.get(),
+                    min(settings.EVENT_STREAM_KEEPALIVE, remaining),
+                )
+            except asyncio.TimeoutError:
+                data = b": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscriber)
+        watcher.cancel()
+
+
+class EventStreamRouter:
+    """ASGI application serving the event stream at STREAM_PATH, everything
+    else with the Django application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == STREAM_PATH:
+            return await event_stream(scope, receive, send)
+        return await self.application(scope, receive, send)
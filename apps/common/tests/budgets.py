@@ -0,0 +1,123 @@
+"""Query budgets : maximum number of SQL queries per endpoint, role and method.
+
+Checked by test_query_budgets on the fixtures and on a larger dataset.
+Every endpoint and method of the API must have a budget for each role,
+denied requests included. Raise a budget only for a fixed number of extra
+queries, never for a query per row.
+"""
+
+QUERY_BUDGETS = {
+    # (url name, role, method): max queries
+    ("users:login", "manager", "POST"): 2,
+    ("users:login", "sales", "POST"): 2,
+    ("users:login", "support", "POST"): 2,
+    ("users:refresh", "manager", "POST"): 6,
+    ("users:refresh", "sales", "POST"): 6,
+    ("users:refresh", "support", "POST"): 6,
+    ("users:verify", "manager", "POST"): 1,
+    ("users:verify", "sales", "POST"): 1,
+    ("users:verify", "support", "POST"): 1,
+    ("users:update_password", "manager", "PUT"): 2,
+    ("users:update_password", "sales", "PUT"): 2,
+    ("users:update_password", "support", "PUT"): 2,
+    # clients
+    ("clients:list", "manager", "GET"): 2,
+    ("clients:list", "manager", "POST"): 1,
+    ("clients:list", "sales", "GET"): 2,
+    ("clients:list", "sales", "POST"): 2,
+    ("clients:list", "support", "GET"): 2,
+    ("clients:list", "support", "POST"): 1,
+    ("clients:export", "manager", "GET"): 2,
+    ("clients:export", "sales", "GET"): 2,
+    ("clients:export", "support", "GET"): 2,
+    ("clients:changes", "manager", "GET"): 3,
+    ("clients:changes", "sales", "GET"): 3,
+    ("clients:changes", "support", "GET"): 3,
+    ("clients:batch", "manager", "POST"): 1,
+    ("clients:batch", "manager", "PUT"): 1,
+    ("clients:batch", "sales", "POST"): 4,
+    ("clients:batch", "sales", "PUT"): 6,
+    ("clients:batch", "support", "POST"): 1,
+    ("clients:batch", "support", "PUT"): 1,
+    ("clients:detail", "manager", "GET"): 2,
+    ("clients:detail", "manager", "PUT"): 1,
+    ("clients:detail", "manager", "DELETE"): 1,
+    ("clients:detail", "sales", "GET"): 2,
+    ("clients:detail", "sales", "PUT"): 4,
+    ("clients:detail", "sales", "DELETE"): 6,
+    ("clients:detail", "support", "GET"): 2,
+    ("clients:detail", "support", "PUT"): 1,
+    ("clients:detail", "support", "DELETE"): 1,
+    ("clients:async_list", "manager", "GET"): 2,
+    ("clients:async_list", "sales", "GET"): 2,
+    ("clients:async_list", "support", "GET"): 2,
+    ("clients:async_detail", "manager", "GET"): 2,
+    ("clients:async_detail", "sales", "GET"): 2,
+    ("clients:async_detail", "support", "GET"): 2,
+    # contracts
+    ("contracts:list", "manager", "GET"): 2,
+    ("contracts:list", "manager", "POST"): 1,
+    ("contracts:list", "sales", "GET"): 2,
+    ("contracts:list", "sales", "POST"): 5,
+    ("contracts:list", "support", "GET"): 2,
+    ("contracts:list", "support", "POST"): 1,
+    ("contracts:export", "manager", "GET"): 2,
+    ("contracts:export", "sales", "GET"): 2,
+    ("contracts:export", "support", "GET"): 2,
+    ("contracts:changes", "manager", "GET"): 3,
+    ("contracts:changes", "sales", "GET"): 3,
+    ("contracts:changes", "support", "GET"): 3,
+    ("contracts:batch", "manager", "POST"): 1,
+    ("contracts:batch", "manager", "PUT"): 1,
+    ("contracts:batch", "sales", "POST"): 7,
+    ("contracts:batch", "sales", "PUT"): 7,
+    ("contracts:batch", "support", "POST"): 1,
+    ("contracts:batch", "support", "PUT"): 1,
+    ("contracts:detail", "manager", "GET"): 2,
+    ("contracts:detail", "manager", "PUT"): 1,
+    ("contracts:detail", "sales", "GET"): 2,
+    ("contracts:detail", "sales", "PUT"): 6,
+    ("contracts:detail", "support", "GET"): 2,
+    ("contracts:detail", "support", "PUT"): 1,
+    ("contracts:async_list", "manager", "GET"): 2,
+    ("contracts:async_list", "sales", "GET"): 2,
+    ("contracts:async_list", "support", "GET"): 2,
+    ("contracts:async_detail", "manager", "GET"): 2,
+    ("contracts:async_detail", "sales", "GET"): 2,
+    ("contracts:async_detail", "support", "GET"): 2,
+    # events
+    ("events:list", "manager", "GET"): 2,
+    ("events:list", "manager", "POST"): 1,
+    ("events:list", "sales", "GET"): 2,
+    ("events:list", "sales", "POST"): 8,
+    ("events:list", "support", "GET"): 2,
+    ("events:list", "support", "POST"): 1,
+    ("events:export", "manager", "GET"): 2,
+    ("events:export", "sales", "GET"): 2,
+    ("events:export", "support", "GET"): 2,
+    ("events:changes", "manager", "GET"): 3,
+    ("events:changes", "sales", "GET"): 3,
+    ("events:changes", "support", "GET"): 3,
+    ("events:batch", "manager", "POST"): 1,
+    ("events:batch", "manager", "PUT"): 1,
+    ("events:batch", "sales", "POST"): 10,
+    ("events:batch", "sales", "PUT"): 8,
+    ("events:batch", "support", "POST"): 1,
+    ("events:batch", "support", "PUT"): 8,
+    ("events:detail", "manager", "GET"): 2,
+    ("events:detail", "manager", "PUT"): 1,
+    ("events:detail", "sales", "GET"): 2,
+    ("events:detail", "sales", "PUT"): 8,
+    ("events:detail", "support", "GET"): 2,
+    ("events:detail", "support", "PUT"): 8,
+    ("events:async_list", "manager", "GET"): 2,
+    ("events:async_list", "sales", "GET"): 2,
+    ("events:async_list", "support", "GET"): 2,
+    ("events:async_detail", "manager", "GET"): 2,
+    ("events:async_detail", "sales", "GET"): 2,
+    ("events:async_detail", "support", "GET"): 2,
+    # dashboard
+    ("dashboard:dashboard", "manager", "GET"): 5,
+    ("dashboard:dashboard", "sales", "GET"): 1,
+    ("dashboard:dashboard", "support", "GET"): 1,
+}
@@ -0,0 +1,138 @@
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.urls import resolve, reverse
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+from .test_metrics import sample
+from .test_timing import parse_server_timing
+
+ROLES = ["test_manager", "test_sales", "test_support"]
+ENDPOINTS = ["clients", "contracts", "events"]
+
+
+class AsyncViewTests(CustomCRMTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tokens = {
+            user.username: f"Bearer {AccessToken.for_user(user)}"
+            for user in User.objects.filter(username__in=ROLES)
+        }
+
+    def sync_get(self, username, url, data=None):
+        self.client.credentials(HTTP_AUTHORIZATION=self.tokens[username])
+        return self.client.get(url, data)
+
+    async def async_get(self, username, url, data=None, **extra):
+        return await self.async_client.get(
+            url, data, authorization=self.tokens[username], **extra
+        )
+
+    def test_list_same_as_sync(self):
+        """Same pages and cursors as the sync list, per role."""
+        for endpoint in ENDPOINTS:
+            for username in ROLES:
+                with self.subTest(endpoint=endpoint, username=username):
+                    params = {"page_size": 2}
+                    while True:
+                        expected = self.sync_get(
+                            username, reverse(f"{endpoint}:list"), params
+                        ).json()
+                        response = async_to_sync(self.async_get)(
+                            username, reverse(f"{endpoint}:async_list"), params
+                        )
+                        self.assertEqual(response.status_code, 200)
+                        data = response.json()
+                        self.assertEqual(data["results"], expected["results"])
+                        if data["next"] is None:
+                            self.assertIsNone(expected["next"])
+                            break
+                        cursor = parse_qs(urlsplit(data["next"]).query)["cursor"]
+                        self.assertEqual(
+                            parse_qs(urlsplit(expected["next"]).query)["cursor"], cursor
+                        )
+                        params["cursor"] = cursor[0]
+
+    async def test_list_filters_and_search(self):
+        """The filter backends of the sync view apply."""
+        url = reverse("clients:async_list")
+        response = await self.async_get("test_sales", url, {"status": "false"})
+        self.assertTrue(response.json()["results"])
+        self.assertFalse(any(item["status"] for item in response.json()["results"]))
+        response = await self.async_get("test_manager", url, {"search": "mill"})
+        self.assertEqual(
+            [item["last_name"] for item in response.json()["results"]], ["Miller"]
+        )
+
+    async def test_detail_permissions(self):
+        """Found, forbidden and missing objects, as in the sync view."""
+        for username, pk, expected in [
+            ("test_sales", 1, 200),
+            ("test_sales", 5, 403),
+            ("test_support", 3, 403),
+            ("test_manager", 999, 404),
+        ]:
+            with self.subTest(username=username, pk=pk):
+                url = reverse("contracts:async_detail", kwargs={"pk": pk})
+                response = await self.async_get(username, url)
+                self.assertEqual(response.status_code, expected)
+
+    async def test_detail_conditional(self):
+        """ETag and Last-Modified, 304 when the event has not changed."""
+        url = reverse("events:async_detail", kwargs={"pk": 1})
+        response = await self.async_get("test_support", url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Upcoming with support")
+        self.assertIn("Last-Modified", response)
+        response = await self.async_get(
+            "test_support", url, if_none_match=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_authentication(self):
+        """Missing or invalid tokens are rejected with 401."""
+        url = reverse("clients:async_list")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+        response = await self.async_client.get(url, authorization="Bearer invalid")
+        self.assertEqual(response.status_code, 401)
+
+    def test_async_stack(self):
+        """Middlewares and views run in the event loop, not in a worker thread."""
+        for middleware in settings.MIDDLEWARE:
+            with self.subTest(middleware=middleware):
+                self.assertTrue(import_string(middleware).async_capable)
+        for endpoint in ENDPOINTS:
+            for name, kwargs in [("async_list", {}), ("async_detail", {"pk": 1})]:
+                view = resolve(reverse(f"{endpoint}:{name}", kwargs=kwargs))
+                self.assertTrue(iscoroutinefunction(view.func))
+
+    async def test_concurrent_requests(self):
+        """Concurrent requests are served by the event loop."""
+        url = reverse("events:async_list")
+        responses = await asyncio.gather(
+            *(self.async_get("test_manager", url) for _ in range(20))
+        )
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertEqual(len({response.content for response in responses}), 1)
+
+    async def test_metrics_and_timing(self):
+        """Queries of async requests are counted by the metrics and timing
+        middlewares, as for sync requests.
+        """
+        url = reverse("clients:async_list")
+        labels = ("clients:async_list", "GET", "SALES")
+        queries = sample("crm_request_queries_total", *labels)
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=1):
+            with self.assertLogs("apps.common.timing", "INFO"):
+                response = await self.async_get("test_sales", url)
+        self.assertEqual(sample("crm_request_queries_total", *labels), queries + 2)
+        metrics = parse_server_timing(response["Server-Timing"])
+        self.assertEqual(metrics["db"][1], '"2 queries"')
+        self.assertIn("serialize", metrics)
@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.clients.models import Client
+from apps.events.models import Event
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+
+
+@override_settings(LIST_CACHE_TIMEOUT=60)
+class ListCacheTests(CustomCRMTestCase):
+    client_list_url = reverse("clients:list")
+    event_list_url = reverse("events:list")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def authenticate(self, user_id):
+        token = AccessToken.for_user(User.objects.get(pk=user_id))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return self.client
+
+    def test_cached_response(self):
+        """Same scope and params : served from the cache, auth query only."""
+        test_client = self.authenticate(1)
+        response = test_client.get(self.client_list_url, {"status": "true"})
+        with self.assertNumQueries(1):
+            cached = test_client.get(self.client_list_url, {"status": "true"})
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+        with self.assertNumQueries(1):
+            response = test_client.get(
+                self.client_list_url,
+                {"status": "true"},
+                HTTP_IF_NONE_MATCH=response["ETag"],
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_renderers(self):
+        """Each media type is cached with its own ETag."""
+        test_client = self.authenticate(1)
+        etag = test_client.get(self.client_list_url)["ETag"]
+        response = test_client.get(
+            self.client_list_url, HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_normalized_params(self):
+        """Query parameters order does not matter, their values do."""
+        test_client = self.authenticate(1)
+        test_client.get(f"{self.event_list_url}?event_status=false&page_size=2")
+        with self.assertNumQueries(1):
+            test_client.get(f"{self.event_list_url}?page_size=2&event_status=false")
+        with self.assertNumQueries(2):
+            test_client.get(f"{self.event_list_url}?page_size=3&event_status=false")
+
+    def test_scopes_never_shared(self):
+        """Manager, sales and support users each get their own rows."""
+        for user_id in [1, 2, 5, 3, 6]:
+            test_client = self.authenticate(user_id)
+            user = User.objects.select_related("team").get(pk=user_id)
+            for _ in range(2):
+                response = test_client.get(self.client_list_url)
+                self.assertEqual(
+                    sorted(item["id"] for item in response.data["results"]),
+                    sorted(
+                        Client.objects.visible_to(user).values_list("pk", flat=True)
+                    ),
+                )
+
+    def test_invalidation(self):
+        """Saved or deleted rows, of the listed model or a related one, once committed."""
+        test_client = self.authenticate(3)
+        response = test_client.get(self.client_list_url)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        # support is assigned to an event : one more client in their scope
+        with self.captureOnCommitCallbacks(execute=True):
+            event = Event.objects.get(pk=5)
+            event.support_contact_id = 3
+            event.save()
+        response = test_client.get(self.client_list_url)
+        self.assertEqual(len(response.data["results"]), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.get(pk=1).delete()
+        response = test_client.get(self.client_list_url)
+        self.assertEqual(len(response.data["results"]), 2)
@@ -0,0 +1,204 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import User
+from ..changes import ResyncRequired, decode_cursor, encode_cursor
+from ..models import Tombstone
+from .setup import CustomCRMTestCase
+
+ROLES = ["test_manager", "test_sales", "test_support"]
+ENDPOINTS = {"clients": Client, "contracts": Contract, "events": Event}
+
+
+@override_settings(CHANGE_FEED_DELAY=0)
+class ChangeFeedTests(CustomCRMTestCase):
+    def authenticate(self, username):
+        user = User.objects.get(username=username)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        return user
+
+    def sync(self, endpoint, params=None):
+        """Follow the next pages : row ids, deleted ids and the last cursor."""
+        response = self.client.get(reverse(f"{endpoint}:changes"), params)
+        self.assertEqual(response.status_code, 200)
+        pages = [response.json()]
+        while pages[-1]["next"]:
+            pages.append(self.client.get(pages[-1]["next"]).json())
+        ids = [item["id"] for page in pages for item in page["results"]]
+        deleted = [pk for page in pages for pk in page["deleted"]]
+        return ids, deleted, pages[-1]["cursor"]
+
+    def test_full_sync(self):
+        """Every row of the scope once, on (date_updated, id) ties too."""
+        Event.objects.update(date_updated=timezone.now())
+        for username in ROLES:
+            user = self.authenticate(username)
+            for endpoint, model in ENDPOINTS.items():
+                with self.subTest(user=username, endpoint=endpoint):
+                    expected = list(
+                        model.objects.visible_to(user)
+                        .order_by("date_updated", "id")
+                        .values_list("id", flat=True)
+                    )
+                    for page_size in [1, 2, 50]:
+                        ids, deleted, _ = self.sync(endpoint, {"page_size": page_size})
+                        self.assertEqual(ids, expected)
+                        self.assertEqual(deleted, [])
+
+    def test_incremental_sync(self):
+        """Only the rows saved and deleted since the cursor, in that order."""
+        self.authenticate("test_manager")
+        cursors = {endpoint: self.sync(endpoint)[2] for endpoint in ENDPOINTS}
+        self.assertEqual(
+            self.sync("clients", {"cursor": cursors["clients"]})[:2], ([], [])
+        )
+        Client.objects.get(pk=2).save()
+        Contract.objects.get(pk=4).save()
+        Client.objects.get(pk=1).delete()
+        changes = {
+            endpoint: self.sync(endpoint, {"cursor": cursor})[:2]
+            for endpoint, cursor in cursors.items()
+        }
+        self.assertEqual(
+            changes,
+            {
+                "clients": ([2], [1]),
+                "contracts": ([4], [3, 1]),
+                "events": ([], [2, 1]),
+            },
+        )
+
+    def test_updated_since(self):
+        """Rows updated at or after the watermark, rows deleted since then."""
+        self.authenticate("test_manager")
+        params = {"updated_since": "2022-03-07T08:56:11.857Z"}
+        with override_settings(TOMBSTONE_RETENTION_DAYS=36500):
+            self.assertEqual(self.sync("events", params)[:2], ([1, 5, 2], []))
+        since = timezone.now() - timedelta(seconds=1)
+        Event.objects.get(pk=3).save()
+        Event.objects.get(pk=5).delete()
+        params = {"updated_since": since.isoformat()}
+        self.assertEqual(self.sync("events", params)[:2], ([3], [5]))
+
+    def test_tombstone_scopes(self):
+        """Deletions are reported to the users who could see the rows."""
+        cursors = {}
+        for username in ROLES:
+            self.authenticate(username)
+            for endpoint in ENDPOINTS:
+                cursors[username, endpoint] = self.sync(endpoint)[2]
+
+        Client.objects.get(pk=1).delete()
+        Client.objects.get(pk=5).delete()
+        self.authenticate("test_sales")
+        response = self.client.delete(reverse("clients:detail", kwargs={"pk": 3}))
+        self.assertEqual(response.status_code, 204)
+
+        expected = {
+            "test_manager": {
+                "clients": [1, 5, 3],
+                "contracts": [1, 3, 5],
+                "events": [1, 2, 5],
+            },
+            "test_sales": {"clients": [1, 3], "contracts": [1, 3], "events": [1, 2]},
+            "test_support": {"clients": [1], "contracts": [1], "events": [1]},
+        }
+        for username in ROLES:
+            self.authenticate(username)
+            for endpoint in ENDPOINTS:
+                with self.subTest(user=username, endpoint=endpoint):
+                    params = {"cursor": cursors[username, endpoint]}
+                    deleted = self.sync(endpoint, params)[1]
+                    self.assertEqual(
+                        sorted(deleted), sorted(expected[username][endpoint])
+                    )
+        self.assertEqual(Tombstone.objects.count(), 9)
+
+    def test_cascade_hints(self):
+        """The contracts of the events a deletion cascades to are read at once."""
+        with CaptureQueriesContext(connection) as context:
+            Client.objects.get(pk=1).delete()
+        lookups = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(
+                'SELECT "contracts_contract"."id", "contracts_contract"."client_id"'
+            )
+        ]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(
+            set(
+                Tombstone.objects.filter(model="events.event").values_list(
+                    "object_id", "contract_id", "client_id", "sales_contact_id"
+                )
+            ),
+            {(1, 1, 1, 2), (2, 3, 1, 2)},
+        )
+
+    def test_retention(self):
+        """Cursors older than the tombstones call for a full sync, the cursor
+        moves on without deletions in the scope.
+        """
+        self.authenticate("test_sales")
+        cursor = self.sync("clients")[2]
+        recent = timezone.now() - timedelta(seconds=1)
+        self.assertGreater(decode_cursor(cursor)[1][0], recent)
+        Client.objects.get(pk=1).delete()
+        self.assertEqual(self.sync("clients", {"cursor": cursor})[:2], ([], [1]))
+
+        expired = timezone.now() - timedelta(days=31)
+        for params in [
+            {"cursor": encode_cursor(None, (expired, 0))},
+            {"updated_since": expired.isoformat()},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(reverse("clients:changes"), params)
+                self.assertEqual(response.status_code, 410)
+                self.assertEqual(
+                    response.json(), {"detail": ResyncRequired.default_detail}
+                )
+
+        Tombstone.objects.update(date_deleted=timezone.now() - timedelta(days=40))
+        call_command("prune_tombstones", "--days=60", stdout=StringIO())
+        self.assertEqual(Tombstone.objects.count(), 5)
+        out = StringIO()
+        call_command("prune_tombstones", stdout=out)
+        self.assertEqual(out.getvalue(), "5 tombstones deleted.\n")
+        self.assertFalse(Tombstone.objects.exists())
+
+    @override_settings(CHANGE_FEED_DELAY=60)
+    def test_delay(self):
+        """Recent changes wait for the next sync."""
+        self.authenticate("test_manager")
+        cursor = self.sync("contracts")[2]
+        Contract.objects.get(pk=2).save()
+        self.assertEqual(self.sync("contracts", {"cursor": cursor})[:2], ([], []))
+        with override_settings(CHANGE_FEED_DELAY=0):
+            self.assertEqual(self.sync("contracts", {"cursor": cursor})[:2], ([2], []))
+
+    def test_invalid_parameters(self):
+        self.authenticate("test_manager")
+        url = reverse("clients:changes")
+        invalid_since = "updated_since must be an ISO 8601 datetime."
+        for params, detail in [
+            ({"cursor": "invalid"}, "Invalid cursor."),
+            ({"updated_since": "yesterday"}, invalid_since),
+            ({"updated_since": "2022-13-45T00:00"}, invalid_since),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"detail": detail})
@@ -0,0 +1,55 @@
+import json
+from contextlib import nullcontext
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import User
+from ..management.commands import bench_api
+from .setup import CommandTestCase
+
+
+class CreateDataTests(CommandTestCase):
+    def test_create_data_scale(self):
+        """Create data command, default numbers multiplied by --scale."""
+        users_before = User.objects.count()
+        self.call_command("create_data", "--scale=2", "--seed=0")
+        self.assertEqual(User.objects.count(), users_before + 30)
+        self.assertEqual(Client.objects.count(), 100)
+        self.assertLessEqual(Contract.objects.count(), 40)
+        self.assertLessEqual(Event.objects.count(), 20)
+        self.assertEqual(
+            Event.objects.count(),
+            Event.objects.values("contract_id").distinct().count(),
+        )
+
+
+class BenchApiTests(CommandTestCase):
+    def test_bench_api(self):
+        """One run on the test database : every call succeeds."""
+        with mock.patch.object(bench_api, "benchmark_database", nullcontext):
+            out = self.call_command("bench_api", "--scale=1", "--repeat=1")
+        report = json.loads(out)
+        self.assertEqual(len(report["scales"]), 1)
+        results = report["scales"][0]["results"]
+        self.assertEqual(set(results), {"manager", "sales", "support"})
+        for role, calls in results.items():
+            for name, result in calls.items():
+                with self.subTest(role=role, call=name):
+                    self.assertIn(result["status"], [200, 202])
+                    if name == "login" or name.endswith((":detail", ":update")):
+                        self.assertEqual(result["rows"], 1)
+        self.assertEqual(
+            results["manager"]["clients:list"]["rows"],
+            min(Client.objects.count(), 50),
+        )
+
+    def test_error_rows(self):
+        """Failed calls report no rows."""
+        result = bench_api.Command.measure(APIClient(), "get", reverse("clients:list"))
+        self.assertEqual(result["status"], 401)
+        self.assertEqual(result["rows"], 0)
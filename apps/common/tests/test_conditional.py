@@ -0,0 +1,114 @@
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.clients.models import Client
+from apps.events.models import Event
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+
+
+class ConditionalListTests(CustomCRMTestCase):
+    event_list_url = reverse("events:list")
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.get(username="test_manager")
+        self.test_client = self.get_token_auth_client(user)
+
+    def test_not_modified(self):
+        """Same ETag : 304 without fetching more than the page, nor a body."""
+        response = self.test_client.get(self.event_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("Authorization", response["Vary"])
+
+        with self.assertNumQueries(2):
+            response = self.test_client.get(
+                self.event_list_url, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_renderers(self):
+        """Each media type has its own ETag, on lists and details."""
+        for url in [self.event_list_url, reverse("events:detail", kwargs={"pk": 1})]:
+            with self.subTest(url=url):
+                etag = self.test_client.get(url)["ETag"]
+                response = self.test_client.get(
+                    url, HTTP_ACCEPT="application/msgpack", HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response["Content-Type"], "application/msgpack")
+                self.assertNotEqual(response["ETag"], etag)
+
+    def test_modified(self):
+        """Updated, created or deleted rows, other pages : new ETag."""
+        etag = self.test_client.get(self.event_list_url)["ETag"]
+        event = Event.objects.get(pk=1)
+        event.attendees += 1
+        event.save()
+        response = self.test_client.get(self.event_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        Event.objects.get(pk=2).delete()
+        response = self.test_client.get(self.event_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response["ETag"]
+        response = self.test_client.get(
+            self.event_list_url, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class ConditionalDetailTests(CustomCRMTestCase):
+    client_detail_url = reverse("clients:detail", kwargs={"pk": 1})
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.get(username="test_sales")
+        self.test_client = self.get_token_auth_client(user)
+
+    def test_not_modified(self):
+        """If-None-Match or If-Modified-Since matching date_updated : 304."""
+        response = self.test_client.get(self.client_detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        client = Client.objects.get(pk=1)
+        self.assertEqual(
+            response["Last-Modified"], http_date(client.date_updated.timestamp())
+        )
+
+        response = self.test_client.get(
+            self.client_detail_url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.test_client.get(
+            self.client_detail_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_modified(self):
+        """Updated object : full response."""
+        etag = self.test_client.get(self.client_detail_url)["ETag"]
+        client = Client.objects.get(pk=1)
+        client.first_name = "Updated"
+        client.save()
+        response = self.test_client.get(self.client_detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["first_name"], "Updated")
+
+    def test_permissions_before_validators(self):
+        """Objects out of scope are denied, whatever the validators."""
+        etag = self.test_client.get(self.client_detail_url)["ETag"]
+        user = User.objects.get(username="test_support")
+        test_client = self.get_token_auth_client(user)
+        response = test_client.get(
+            reverse("clients:detail", kwargs={"pk": 5}), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
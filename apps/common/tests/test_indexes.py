@@ -0,0 +1,120 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+from unittest import skipUnless
+
+from django.db import connection
+
+from apps.clients.models import Client
+from apps.common.pagination import CRMCursorPagination
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+
+SEED_CLIENTS = 3000
+SEED_SALES = 20
+SEED_SUPPORT = 20
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite query plans")
+class QueryPlanTests(CustomCRMTestCase):
+    """Check the role scoped list queries are served by the model indexes,
+    on a seeded and analyzed database.
+    """
+
+    ordering = CRMCursorPagination.ordering
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(0)
+        sales = User.objects.bulk_create(
+            User(username=f"seed_sales_{i}", team_id=2) for i in range(SEED_SALES)
+        )
+        support = User.objects.bulk_create(
+            User(username=f"seed_support_{i}", team_id=3) for i in range(SEED_SUPPORT)
+        )
+        clients = Client.objects.bulk_create(
+            Client(
+                first_name="Seed",
+                last_name=str(i),
+                email=f"seed{i}@email.com",
+                status=i % 2 == 0,
+                sales_contact=rng.choice(sales) if i % 2 == 0 else None,
+            )
+            for i in range(SEED_CLIENTS)
+        )
+        contracts = Contract.objects.bulk_create(
+            Contract(
+                client=client,
+                sales_contact_id=client.sales_contact_id,
+                status=rng.random() < 0.7,
+                amount=rng.randint(100, 99999),
+                payment_due=date(2022, 1, 1) + timedelta(days=rng.randint(0, 729)),
+            )
+            for client in clients
+            if client.status
+        )
+        Event.objects.bulk_create(
+            Event(
+                contract=contract,
+                support_contact=rng.choice(support),
+                event_status=rng.random() < 0.5,
+                attendees=rng.randint(5, 500),
+                event_date=datetime(2022, 1, 1, tzinfo=timezone.utc)
+                + timedelta(days=rng.randint(0, 729)),
+            )
+            for contract in contracts
+            if contract.status
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.sales = User.objects.select_related("team").get(username="seed_sales_0")
+        self.support = User.objects.select_related("team").get(
+            username="seed_support_0"
+        )
+
+    def page_plan(self, queryset):
+        return queryset.order_by(*self.ordering)[:50].explain()
+
+    def test_client_indexes(self):
+        """The sales scope (prospects or own clients) is read in page order
+        on the date_created index until a page matches, without a sort : no
+        index serves both branches of the OR. Prospects (status filter, delete
+        scope) have their own partial index.
+        """
+        plan = self.page_plan(Client.objects.visible_to(self.sales))
+        self.assertIn("SCAN clients_client USING INDEX client_created_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        plan = self.page_plan(Client.objects.filter(status=False))
+        self.assertIn("client_prospect_idx", plan)
+
+    def test_contract_indexes(self):
+        plan = self.page_plan(Contract.objects.visible_to(self.sales))
+        self.assertIn("contract_sales_created_idx", plan)
+        plan = self.page_plan(
+            Contract.objects.filter(
+                status=False,
+                payment_due__gte=date(2022, 5, 1),
+                payment_due__lte=date(2022, 5, 15),
+            )
+        )
+        self.assertIn("contract_status_due_idx", plan)
+
+    def test_event_indexes(self):
+        plan = self.page_plan(Event.objects.visible_to(self.support))
+        self.assertIn("event_support_created_idx", plan)
+        plan = self.page_plan(
+            Event.objects.filter(
+                event_status=False,
+                event_date__gte=datetime(2022, 5, 1, tzinfo=timezone.utc),
+                event_date__lte=datetime(2022, 5, 15, tzinfo=timezone.utc),
+            )
+        )
+        self.assertIn("event_status_date_idx", plan)
+
+    def test_event_sales_join(self):
+        """Sales events : contracts found by sales_contact, events by contract."""
+        plan = self.page_plan(Event.objects.visible_to(self.sales))
+        self.assertIn("SEARCH contracts_contract USING", plan)
+        self.assertIn("SEARCH events_event USING", plan)
+        self.assertNotIn("SCAN", plan)
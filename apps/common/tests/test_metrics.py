@@ -0,0 +1,81 @@
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+
+
+def sample(name, view, method, team):
+    labels = {"view": view, "method": method, "team": team}
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(CustomCRMTestCase):
+    client_list_url = reverse("clients:list")
+
+    def test_request_metrics(self):
+        """Latency, queries and bytes labelled by url name, method and team."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        labels = ("clients:list", "GET", "SALES")
+        requests = sample("crm_request_duration_seconds_count", *labels)
+        queries = sample("crm_request_queries_total", *labels)
+        size = sample("crm_response_bytes_total", *labels)
+
+        response = test_client.get(self.client_list_url)
+        self.assertEqual(
+            sample("crm_request_duration_seconds_count", *labels), requests + 1
+        )
+        self.assertEqual(sample("crm_request_queries_total", *labels), queries + 2)
+        self.assertEqual(
+            sample("crm_response_bytes_total", *labels), size + len(response.content)
+        )
+
+    def test_streamed_response_metrics(self):
+        """Exports : bytes and queries counted once the content is consumed."""
+        user = User.objects.get(username="test_manager")
+        test_client = self.get_token_auth_client(user)
+        labels = ("clients:export", "GET", "MANAGEMENT")
+        queries = sample("crm_request_queries_total", *labels)
+        size = sample("crm_response_bytes_total", *labels)
+
+        response = test_client.get(reverse("clients:export"), {"format": "csv"})
+        content = b"".join(response.streaming_content)
+        self.assertEqual(sample("crm_request_queries_total", *labels), queries + 2)
+        self.assertEqual(
+            sample("crm_response_bytes_total", *labels), size + len(content)
+        )
+
+    def test_auth_failures_and_denials(self):
+        """401 and 403 responses are counted."""
+        failures = sample("crm_auth_failures_total", "clients:list", "GET", "anonymous")
+        response = self.client.get(self.client_list_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            sample("crm_auth_failures_total", "clients:list", "GET", "anonymous"),
+            failures + 1,
+        )
+
+        user = User.objects.get(username="test_support")
+        test_client = self.get_token_auth_client(user)
+        labels = ("clients:list", "POST", "SUPPORT")
+        denials = sample("crm_permission_denials_total", *labels)
+        response = test_client.post(self.client_list_url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(sample("crm_permission_denials_total", *labels), denials + 1)
+
+    def test_metrics_endpoint(self):
+        """Prometheus text format, for the allowed addresses only."""
+        self.client.get(self.client_list_url)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(b"crm_request_duration_seconds_bucket{", response.content)
+        self.assertIn(b"crm_auth_failures_total{", response.content)
+
+        response = self.client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.7")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        with self.settings(METRICS_ALLOWED_IPS=["203.0.113.0/24"]):
+            response = self.client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.7")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.clients.models import Client
+from apps.common.pagination import CRMCursorPagination
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+
+
+class CursorPaginationTests(CustomCRMTestCase):
+    client_list_url = reverse("clients:list")
+
+    def get_all_pages(self, test_client, url):
+        """Follow next links until the last page. Returns all items and queries run."""
+        items = []
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = test_client.get(url, format="json")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                items += response.data["results"]
+                url = response.data["next"]
+        return items, queries
+
+    def test_pages_cover_list_without_duplicates(self):
+        """Walking the cursor pages returns every client exactly once, newest first."""
+        user = User.objects.get(username="test_manager")
+        test_client = self.get_token_auth_client(user)
+        items, _ = self.get_all_pages(
+            test_client, f"{self.client_list_url}?page_size=2"
+        )
+        ids = [item["id"] for item in items]
+        expected = list(
+            Client.objects.order_by("-date_created", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_pages_keep_filters(self):
+        """Filters and search terms are carried over in the cursor links."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        items, _ = self.get_all_pages(
+            test_client, f"{self.client_list_url}?status=false&page_size=1"
+        )
+        self.assertEqual(len(items), Client.objects.filter(status=False).count())
+        for item in items:
+            self.assertFalse(item["status"])
+
+    def test_no_count_query(self):
+        """Cursor pages never count the whole table."""
+        user = User.objects.get(username="test_manager")
+        test_client = self.get_token_auth_client(user)
+        _, queries = self.get_all_pages(
+            test_client, f"{self.client_list_url}?page_size=1"
+        )
+        for query in queries.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"].upper())
+
+    def test_page_size_is_capped(self):
+        """Requested page size cannot exceed max_page_size."""
+        max_page_size = CRMCursorPagination.max_page_size
+        Client.objects.bulk_create(
+            Client(first_name="Bulk", last_name=str(i), email=f"bulk{i}@email.com")
+            for i in range(max_page_size + 1)
+        )
+        user = User.objects.get(username="test_manager")
+        test_client = self.get_token_auth_client(user)
+        response = test_client.get(
+            f"{self.client_list_url}?page_size={max_page_size * 2}", format="json"
+        )
+        self.assertEqual(len(response.data["results"]), max_page_size)
+        self.assertIsNotNone(response.data["next"])
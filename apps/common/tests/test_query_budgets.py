@@ -0,0 +1,183 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.db import connection, transaction
+from django.forms.models import model_to_dict
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.clients.models import Client
+from apps.common.scopes import action_for
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import User
+from .budgets import QUERY_BUDGETS
+from .setup import CustomCRMTestCase, TEST_PASSWORD
+
+ROLES = {"manager": "test_manager", "sales": "test_sales", "support": "test_support"}
+NAMESPACES = ["users", "clients", "contracts", "events", "dashboard"]
+MODELS = {"clients": Client, "contracts": Contract, "events": Event}
+CHANGEABLE = {Event: {"event_status": False}}
+GROWTH = 60
+# Endpoints called without the access token
+TOKEN_ENDPOINTS = ["users:login", "users:refresh", "users:verify"]
+
+
+class QueryBudgetTests(CustomCRMTestCase):
+    """Every endpoint, role and method against its query budget (budgets.py),
+    on the fixtures then on a larger dataset : the number of queries must stay
+    within budget and must not depend on the number of rows.
+    """
+
+    create_data = {
+        "clients": {
+            "first_name": "first_name",
+            "last_name": "last_name",
+            "email": "budget_client@email.com",
+            "status": False,
+        },
+        "contracts": {
+            "client": 1,
+            "amount": 1234.56,
+            "payment_due": "2022-10-09",
+            "status": False,
+        },
+        "events": {
+            "name": "Budget event",
+            "attendees": 50,
+            "event_date": "2022-10-09",
+        },
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.free_contract = self.create_contract()
+        self.users = {
+            role: User.objects.get(username=username)
+            for role, username in ROLES.items()
+        }
+        self.tokens = {
+            role: str(AccessToken.for_user(user)) for role, user in self.users.items()
+        }
+
+    def grow_dataset(self, number):
+        """Add rows visible to the test users : converted clients and prospects,
+        contracts (signed or not), events of the signed contracts.
+        """
+        clients = Client.objects.bulk_create(
+            Client(
+                first_name="Budget",
+                last_name=f"Client{i}",
+                email=f"budget{i}@email.com",
+                status=i % 3 != 0,
+                sales_contact=self.users["sales"] if i % 3 != 0 else None,
+            )
+            for i in range(number)
+        )
+        contracts = Contract.objects.bulk_create(
+            Contract(
+                client=client,
+                sales_contact_id=client.sales_contact_id,
+                status=i % 2 == 0,
+                amount=1000 + i,
+                payment_due=date(2022, 1, 1) + timedelta(days=i),
+            )
+            for i, client in enumerate(clients)
+            if client.status
+        )
+        Event.objects.bulk_create(
+            Event(
+                contract=contract,
+                name=f"Budget event {i}",
+                support_contact=self.users["support"],
+                event_status=i % 2 == 0,
+                attendees=10 + i,
+                event_date=datetime(2022, 1, 1, tzinfo=timezone.utc)
+                + timedelta(days=i),
+            )
+            for i, contract in enumerate(contracts)
+            if contract.status
+        )
+
+    def get_request(self, endpoint, user, method):
+        """Url and data of the request, on the first object the user can act on."""
+        namespace, name = endpoint.split(":")
+        model = MODELS.get(namespace)
+        if name in ["detail", "async_detail"] or (name == "batch" and method == "PUT"):
+            scoped = model.objects.visible_to(user, action_for(method))
+            if method == "PUT":
+                scoped = scoped.filter(**CHANGEABLE.get(model, {}))
+            obj = (
+                scoped.order_by("pk").first()
+                or model.objects.visible_to(user).order_by("pk").first()
+                or model.objects.order_by("pk").first()
+            )
+            if name == "batch":
+                return reverse(endpoint), [model_to_dict(obj)]
+            url = reverse(endpoint, kwargs={"pk": obj.pk})
+            return url, model_to_dict(obj) if method == "PUT" else None
+        if namespace == "dashboard":
+            return reverse(endpoint), None
+        if endpoint == "users:login":
+            return reverse(endpoint), {
+                "username": user.username,
+                "password": TEST_PASSWORD,
+            }
+        if endpoint == "users:refresh":
+            return reverse(endpoint), {"refresh": str(RefreshToken.for_user(user))}
+        if endpoint == "users:verify":
+            return reverse(endpoint), {"token": str(RefreshToken.for_user(user))}
+        if endpoint == "users:update_password":
+            data = {"old_password": TEST_PASSWORD, "password": "budget_password"}
+            return reverse(endpoint), {**data, "password2": data["password"]}
+        data = dict(self.create_data[namespace])
+        if namespace == "events":
+            data["contract"] = self.free_contract.pk
+        if name == "batch":
+            return reverse(endpoint), [data]
+        return reverse(endpoint), data if method == "POST" else None
+
+    def count_queries(self, endpoint, role, method):
+        """Number of queries of the request, rolled back afterwards."""
+        user = self.users[role]
+        url, data = self.get_request(endpoint, user, method)
+        if endpoint in TOKEN_ENDPOINTS:
+            self.client.credentials()
+        else:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens[role]}")
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(self.client, method.lower())(
+                    url, data, format="json"
+                )
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            transaction.set_rollback(True)
+        return response.status_code, len(queries)
+
+    def count_all(self):
+        return {key: self.count_queries(*key) for key in QUERY_BUDGETS}
+
+    def test_query_budgets(self):
+        """Queries within budget, the same number on both dataset sizes."""
+        small = self.count_all()
+        self.grow_dataset(GROWTH)
+        large = self.count_all()
+        for key, budget in QUERY_BUDGETS.items():
+            with self.subTest(endpoint=key):
+                self.assertLessEqual(small[key][1], budget)
+                self.assertEqual(small[key], large[key])
+
+    def test_every_endpoint_has_budget(self):
+        """All methods of the API urls are budgeted, for each role."""
+        resolver = get_resolver()
+        for namespace in NAMESPACES:
+            for pattern in resolver.namespace_dict[namespace][1].url_patterns:
+                view = pattern.callback.view_class()
+                for method in view.allowed_methods:
+                    if method == "OPTIONS":
+                        continue
+                    for role in ROLES:
+                        key = (f"{namespace}:{pattern.name}", role, method)
+                        with self.subTest(endpoint=key):
+                            self.assertIn(key, QUERY_BUDGETS)
@@ -0,0 +1,72 @@
+import datetime
+from decimal import Decimal
+
+import msgpack
+import orjson
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.users.models import User
+from ..renderers import MessagePackRenderer, ORJSONRenderer
+from .setup import CustomCRMTestCase
+
+ORJSON = "application/json; encoder=orjson"
+MSGPACK = "application/msgpack"
+
+
+class RendererTests(CustomCRMTestCase):
+    def setUp(self):
+        super().setUp()
+        self.get_token_auth_client(User.objects.get(username="test_manager"))
+
+    def test_default_json(self):
+        """No Accept header, */* and application/json get the stock JSON renderer."""
+        url = reverse("events:list")
+        for accept in [None, "*/*", "application/json"]:
+            with self.subTest(accept=accept):
+                extra = {"HTTP_ACCEPT": accept} if accept else {}
+                response = self.client.get(url, **extra)
+                self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_negotiated_renderers(self):
+        """Same data as the JSON response, chosen by the Accept header."""
+        for name in ["clients:list", "contracts:list", "events:list"]:
+            url = reverse(name)
+            expected = self.client.get(url).json()
+            for accept, loads in [(ORJSON, orjson.loads), (MSGPACK, msgpack.unpackb)]:
+                with self.subTest(url=url, accept=accept):
+                    response = self.client.get(url, HTTP_ACCEPT=accept)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response["Content-Type"], accept)
+                    self.assertEqual(loads(response.content), expected)
+                    self.assertIn("Accept", response["Vary"])
+
+    def test_format_parameter(self):
+        response = self.client.get(reverse("contracts:list"), {"format": "msgpack"})
+        self.assertEqual(response["Content-Type"], MSGPACK)
+        self.assertTrue(msgpack.unpackb(response.content)["results"])
+
+    def test_errors(self):
+        self.client.credentials()
+        response = self.client.get(reverse("clients:list"), HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("detail", msgpack.unpackb(response.content))
+
+    def test_encoded_types(self):
+        """Dates and times follow DATE_FORMAT and DATETIME_FORMAT."""
+        value = datetime.datetime(2022, 3, 6, 17, 30, tzinfo=datetime.timezone.utc)
+        data = {"datetime": value, "date": value.date(), "amount": Decimal("1.5")}
+        with timezone.override("UTC"):
+            for renderer, loads in [
+                (ORJSONRenderer(), orjson.loads),
+                (MessagePackRenderer(), msgpack.unpackb),
+            ]:
+                with self.subTest(renderer=renderer):
+                    self.assertEqual(
+                        loads(renderer.render(data)),
+                        {
+                            "datetime": "06-03-2022 17:30",
+                            "date": "06-03-2022",
+                            "amount": 1.5,
+                        },
+                    )
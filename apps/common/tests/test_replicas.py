@@ -0,0 +1,136 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import User
+from .. import checks, replicas
+from .setup import CustomCRMTestCase
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class ReplicaTests(CustomCRMTestCase):
+    """A second SQLite database stands in for the replica, behind the primary
+    by one update of contract 2.
+    """
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        super().setUp()
+        for model in [User, Client, Contract, Event]:
+            model.objects.using("replica").bulk_create(model.objects.order_by("pk"))
+        Contract.objects.filter(pk=2).update(amount=42)
+        self.replica_amount = Contract.objects.using("replica").get(pk=2).amount
+        replicas._lags.clear()
+        cache.clear()
+        self.url = reverse("contracts:detail", kwargs={"pk": 2})
+        self.authenticate("test_sales")
+
+    def authenticate(self, username):
+        user = User.objects.get(username=username)
+        self.token = f"Bearer {AccessToken.for_user(user)}"
+        self.client.credentials(HTTP_AUTHORIZATION=self.token)
+
+    def get_amount(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["amount"]
+
+    def test_reads_from_replica(self):
+        """API reads go to the replica, reads outside requests to the primary."""
+        self.assertEqual(self.get_amount(), self.replica_amount)
+        self.assertEqual(Contract.objects.get(pk=2).amount, 42)
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_read_your_writes(self):
+        """Reads stick to the primary after a write, for the writer only."""
+        data = {"client": 2, "amount": 99, "payment_due": "2022-10-09", "status": False}
+        response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.get_amount(), 99)
+        self.authenticate("test_manager")
+        self.assertEqual(self.get_amount(), self.replica_amount)
+        self.authenticate("test_sales")
+        cache.delete(replicas.pin_key(2))
+        self.assertEqual(self.get_amount(), self.replica_amount)
+
+    def test_failed_write(self):
+        """Rejected writes do not pin the user to the primary."""
+        response = self.client.put(self.url, {"amount": "x"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.get_amount(), self.replica_amount)
+
+    def test_lag_and_fallback(self):
+        """Lagging or unreachable replicas are skipped while REPLICA_FALLBACK."""
+        for side_effect in [[60.0], DatabaseError]:
+            for fallback, amount in [(True, 42), (False, self.replica_amount)]:
+                with self.subTest(side_effect=side_effect, fallback=fallback):
+                    replicas._lags.clear()
+                    with mock.patch.object(
+                        replicas, "replica_lag", side_effect=side_effect
+                    ), override_settings(REPLICA_FALLBACK=fallback):
+                        self.assertEqual(self.get_amount(), amount)
+        with mock.patch.object(replicas, "replica_lag", return_value=1.0):
+            replicas._lags.clear()
+            self.assertEqual(self.get_amount(), self.replica_amount)
+
+    @override_settings(LIST_CACHE_TIMEOUT=60)
+    def test_cached_lists(self):
+        """A list cached from the replica after the write, by a request that
+        was not pinned yet, is not served once the writer's reads are pinned.
+        """
+        data = {"client": 2, "amount": 99, "payment_due": "2022-10-09", "status": False}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, 202)
+
+        def list_amount():
+            response = self.client.get(reverse("contracts:list"))
+            rows = response.json()["results"]
+            return next(row["amount"] for row in rows if row["id"] == 2)
+
+        pinned = cache.get(replicas.pin_key(2))
+        cache.delete(replicas.pin_key(2))
+        self.assertEqual(list_amount(), self.replica_amount)
+        cache.set(replicas.pin_key(2), pinned)
+        self.assertEqual(list_amount(), 99)
+
+    def test_shared_cache_check(self):
+        errors = checks.check_replica_cache(None)
+        self.assertEqual([error.id for error in errors], ["common.E001"])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(checks.check_replica_cache(None), [])
+        with override_settings(REPLICA_DATABASES=[]):
+            self.assertEqual(checks.check_replica_cache(None), [])
+
+    @override_settings(CHANGE_FEED_DELAY=0, TOMBSTONE_RETENTION_DAYS=36500)
+    def test_change_feed(self):
+        """Change feeds read rows and deletions from the primary."""
+        contracts = Contract.objects.filter(sales_contact__username="test_sales")
+        deleted = contracts.exclude(pk=2).first().pk
+        Contract.objects.get(pk=deleted).delete()
+        response = self.client.get(
+            reverse("contracts:changes"), {"updated_since": "2000-01-01T00:00:00Z"}
+        )
+        self.assertEqual(response.status_code, 200)
+        feed = response.json()
+        amounts = {row["id"]: row["amount"] for row in feed["results"]}
+        self.assertEqual(amounts[2], 42)
+        self.assertNotIn(deleted, amounts)
+        self.assertEqual(feed["deleted"], [deleted])
+
+    async def test_async_detail(self):
+        response = await self.async_client.get(
+            reverse("contracts:async_detail", kwargs={"pk": 2}),
+            authorization=self.token,
+        )
+        self.assertEqual(response.json()["amount"], self.replica_amount)
@@ -0,0 +1,67 @@
+from unittest import skipUnless
+
+from django.db import connection
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.clients.models import Client
+from apps.clients.views import ClientList
+from apps.common.search import PrefixSearchFilter
+from apps.events.models import Event
+from apps.events.views import EventList
+from .setup import CustomCRMTestCase
+
+
+class PrefixSearchFilterTests(CustomCRMTestCase):
+    search_terms = ["j", "mil", "DUP", "company", "le", "mil jam", "x", "j mi", "m j"]
+
+    def assert_same_results(self, model, view):
+        for term in self.search_terms:
+            request = Request(APIRequestFactory().get("/", {"search": term}))
+            expected = SearchFilter().filter_queryset(
+                request, model.objects.all(), view
+            )
+            results = PrefixSearchFilter().filter_queryset(
+                request, model.objects.all(), view
+            )
+            self.assertEqual(
+                sorted(results.values_list("id", flat=True)),
+                sorted(expected.values_list("id", flat=True)),
+                msg=f"search={term}",
+            )
+
+    def test_client_search_results(self):
+        """Same results as the stock search backend on local fields."""
+        self.assert_same_results(Client, ClientList)
+
+    def test_event_search_results(self):
+        """Same results as the stock search backend across relations."""
+        self.assert_same_results(Event, EventList)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_search_uses_prefix_indexes(self):
+        """Each search branch is an index search."""
+        request = Request(APIRequestFactory().get("/", {"search": "mil"}))
+        queryset = PrefixSearchFilter().filter_queryset(
+            request, Event.objects.all(), EventList
+        )
+        plan = queryset.explain()
+        for index in [
+            "client_first_name_prefix",
+            "client_last_name_prefix",
+            "client_email_prefix",
+            "client_company_name_prefix",
+            "event_name_prefix",
+            "event_location_prefix",
+        ]:
+            self.assertIn(index, plan)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_short_terms_skip_prefix_indexes(self):
+        """Terms shorter than SEARCH_MIN_PREFIX_LENGTH are not index searches."""
+        request = Request(APIRequestFactory().get("/", {"search": "mi"}))
+        queryset = PrefixSearchFilter().filter_queryset(
+            request, Event.objects.all(), EventList
+        )
+        self.assertNotIn("_prefix", queryset.explain())
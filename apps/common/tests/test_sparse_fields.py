@@ -0,0 +1,105 @@
+import csv
+import io
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+
+
+class SparseFieldsTests(CustomCRMTestCase):
+    def setUp(self):
+        super().setUp()
+        manager = User.objects.get(username="test_manager")
+        self.token = f"Bearer {AccessToken.for_user(manager)}"
+        self.client.credentials(HTTP_AUTHORIZATION=self.token)
+
+    def get_with_queries(self, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data)
+        return response, " ".join(query["sql"] for query in queries)
+
+    def test_list_fields(self):
+        """Only the selected fields are serialized and fetched."""
+        response, sql = self.get_with_queries(
+            reverse("events:list"), {"fields": "id,name,event_date"}
+        )
+        self.assertEqual(response.status_code, 200)
+        for item in response.json()["results"]:
+            self.assertEqual(list(item), ["id", "name", "event_date"])
+        self.assertIn('"events_event"."name"', sql)
+        self.assertNotIn('"events_event"."notes"', sql)
+        self.assertNotIn('"events_event"."location"', sql)
+
+    def test_list_exclude(self):
+        """Excluded fields are neither serialized nor fetched."""
+        response, sql = self.get_with_queries(
+            reverse("events:list"), {"exclude": "notes, location"}
+        )
+        self.assertEqual(response.status_code, 200)
+        for item in response.json()["results"]:
+            self.assertNotIn("notes", item)
+            self.assertNotIn("location", item)
+            self.assertIn("contract", item)
+        self.assertNotIn('"events_event"."notes"', sql)
+
+    def test_pagination_and_etag(self):
+        """Cursor and ETag columns are fetched whatever the selection."""
+        url = reverse("contracts:list")
+        data = {"fields": "amount", "page_size": 2}
+        response = self.client.get(url, data)
+        self.assertEqual(
+            [list(item) for item in response.json()["results"]], [["amount"]] * 2
+        )
+        full = self.client.get(url, {"page_size": 2}).json()
+        self.assertEqual(
+            [item["amount"] for item in response.json()["results"]],
+            [item["amount"] for item in full["results"]],
+        )
+        next_page = self.client.get(response.json()["next"])
+        self.assertEqual(next_page.status_code, 200)
+        response = self.client.get(url, data, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail(self):
+        url = reverse("clients:detail", kwargs={"pk": 1})
+        response, sql = self.get_with_queries(url, {"fields": "email"})
+        self.assertEqual(response.json(), {"email": "email@email.com"})
+        self.assertNotIn('"clients_client"."company_name"', sql)
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse("clients:list"), {"fields": "id,password"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "Unknown field(s): password."})
+
+    def test_export(self):
+        """CSV columns follow the selection."""
+        response = self.client.get(
+            reverse("contracts:export"), {"format": "csv", "fields": "id,amount"}
+        )
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ["id", "amount"])
+        self.assertTrue(all(len(row) == 2 for row in rows))
+
+    async def test_async_list(self):
+        response = await self.async_client.get(
+            reverse("events:async_list"),
+            {"fields": "id,name"},
+            authorization=self.token,
+        )
+        self.assertEqual(response.status_code, 200)
+        for item in response.json()["results"]:
+            self.assertEqual(list(item), ["id", "name"])
+
+    def test_writes_ignore_selection(self):
+        """Write requests validate and return every field."""
+        self.get_token_auth_client(User.objects.get(username="test_sales"))
+        url = reverse("contracts:detail", kwargs={"pk": 2})
+        data = {"client": 2, "amount": 99, "payment_due": "2022-10-09", "status": False}
+        response = self.client.put(f"{url}?fields=id", data, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["amount"], 99)
@@ -0,0 +1,236 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import SALES, User
+from EpicEvents.asgi import application
+from ..stream import STREAM_PATH, Audience, Subscriber, Subscribers, broker
+from .setup import CustomCRMTestCase
+
+
+class Stream:
+    """Connection to the event stream, through the ASGI application."""
+
+    def __init__(self, token=None, method="GET"):
+        headers = []
+        if token is not None:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": STREAM_PATH,
+            "query_string": b"",
+            "headers": headers,
+        }
+        self.requests = asyncio.Queue()
+        self.messages = asyncio.Queue()
+        self.task = asyncio.create_task(
+            application(scope, self.requests.get, self.messages.put)
+        )
+
+    async def receive(self):
+        return await asyncio.wait_for(self.messages.get(), 5)
+
+    async def events(self, number):
+        """The next events, without the comment lines."""
+        events = []
+        while len(events) < number:
+            body = (await self.receive())["body"].decode()
+            if not body.startswith(":"):
+                lines = body.strip().splitlines()
+                fields = dict(line.split(": ", 1) for line in lines)
+                events.append((fields["event"], json.loads(fields["data"])))
+        return events
+
+    async def close(self):
+        await self.requests.put({"type": "http.disconnect"})
+        await asyncio.wait_for(self.task, 5)
+
+
+class EventStreamTests(CustomCRMTestCase):
+    def setUp(self):
+        super().setUp()
+        # the test transaction's connection is shared by the dispatch thread
+        patcher = mock.patch("apps.common.stream.close_old_connections")
+        self.close_old_connections = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tokens = {
+            user.username: str(AccessToken.for_user(user))
+            for user in User.objects.filter(id__in=[1, 2, 3])
+        }
+
+    def commit(self, change):
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+
+    async def open(self, username):
+        stream = Stream(self.tokens[username])
+        start = await stream.receive()
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        self.assertEqual((await stream.receive())["body"], b": connected\n\n")
+        return stream
+
+    async def test_scopes(self):
+        """Changes are sent to the users seeing the rows only."""
+        streams = {username: await self.open(username) for username in self.tokens}
+
+        def changes():
+            Event.objects.get(pk=5).save()
+            Client.objects.get(pk=4).save()
+            Contract.objects.get(pk=2).save()
+            # seen by every user : the last event of each stream
+            Event.objects.get(pk=1).save()
+
+        await sync_to_async(self.commit)(changes)
+        expected = {
+            "test_manager": [
+                ("events.event", 5),
+                ("clients.client", 4),
+                ("contracts.contract", 2),
+                ("events.event", 1),
+            ],
+            "test_sales": [
+                ("clients.client", 4),
+                ("contracts.contract", 2),
+                ("events.event", 1),
+            ],
+            "test_support": [("events.event", 1)],
+        }
+        for username, stream in streams.items():
+            with self.subTest(user=username):
+                events = await stream.events(len(expected[username]))
+                self.assertEqual(
+                    [(data["model"], data["id"]) for name, data in events],
+                    expected[username],
+                )
+                self.assertEqual({data["action"] for name, data in events}, {"save"})
+            await stream.close()
+        self.assertEqual(len(broker.subscribers), 0)
+
+    async def test_reassignment_and_deletion(self):
+        stream = await self.open("test_support")
+
+        def reassign():
+            event = Event.objects.get(pk=1)
+            event.support_contact_id = 6
+            event.save()
+            Event.objects.filter(pk=3).delete()
+
+        await sync_to_async(self.commit)(reassign)
+        self.assertEqual(
+            await stream.events(4),
+            [
+                ("change", {"model": "events.event", "id": 1, "action": "remove"}),
+                (
+                    "change",
+                    {"model": "contracts.contract", "id": 1, "action": "remove"},
+                ),
+                ("change", {"model": "clients.client", "id": 1, "action": "remove"}),
+                ("change", {"model": "events.event", "id": 3, "action": "delete"}),
+            ],
+        )
+        await stream.close()
+        # around each resolve of the dispatch thread
+        self.assertTrue(self.close_old_connections.called)
+        self.assertEqual(self.close_old_connections.call_count % 2, 0)
+
+    async def test_support_left_contract(self):
+        """A support contact keeps the client of their other events."""
+
+        def assign():
+            event = Event.objects.get(pk=2)
+            event.support_contact_id = 3
+            event.save()
+
+        await sync_to_async(assign)()
+        stream = await self.open("test_support")
+
+        def reassign():
+            event = Event.objects.get(pk=1)
+            event.support_contact_id = 6
+            event.save()
+            Event.objects.get(pk=2).save()
+
+        await sync_to_async(self.commit)(reassign)
+        self.assertEqual(
+            await stream.events(3),
+            [
+                ("change", {"model": "events.event", "id": 1, "action": "remove"}),
+                (
+                    "change",
+                    {"model": "contracts.contract", "id": 1, "action": "remove"},
+                ),
+                ("change", {"model": "events.event", "id": 2, "action": "save"}),
+            ],
+        )
+        await stream.close()
+
+    async def test_moved_event(self):
+        """The sales contact of an event's previous contract gets a "remove"."""
+        stream = await self.open("test_sales")
+
+        def move():
+            contract = Contract.objects.create(
+                client_id=5, sales_contact_id=5, amount=10, payment_due="2022-10-09"
+            )
+            event = Event.objects.get(pk=2)
+            event.contract = contract
+            event.save()
+
+        await sync_to_async(self.commit)(move)
+        self.assertEqual(
+            await stream.events(1),
+            [("change", {"model": "events.event", "id": 2, "action": "remove"})],
+        )
+        await stream.close()
+
+    async def test_rolled_back(self):
+        """Only committed changes are sent."""
+        stream = await self.open("test_manager")
+        await sync_to_async(lambda: Client.objects.get(pk=4).save())()
+        await sync_to_async(self.commit)(lambda: Client.objects.get(pk=3).save())
+        events = await stream.events(1)
+        self.assertEqual(events[0][1]["id"], 3)
+        await stream.close()
+
+    async def test_token_expiry(self):
+        """The stream ends when the access token expires."""
+        user = await User.objects.aget(username="test_sales")
+        token = AccessToken.for_user(user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        self.tokens["test_sales"] = str(token)
+        stream = await self.open("test_sales")
+        self.assertEqual(await stream.events(1), [("expired", {})])
+        await asyncio.wait_for(stream.task, 5)
+
+    def test_subscribers_index(self):
+        """The subscribers of an audience, by team and user id."""
+        subscribers = Subscribers()
+        users = {user.pk: Subscriber(user) for user in User.objects.all()}
+        for subscriber in users.values():
+            subscribers.add(subscriber)
+        for audience, expected in [
+            (Audience(), {1}),
+            (Audience(sales=[2], support=[3, 42]), {1, 2, 3}),
+            (Audience(support=[6], all_sales=True), {1, 2, 5, 6}),
+        ]:
+            seeing = subscribers.seeing(audience)
+            self.assertEqual({subscriber.user_id for subscriber in seeing}, expected)
+        subscribers.discard(users[2])
+        self.assertEqual(len(subscribers), len(users) - 1)
+        self.assertNotIn(2, subscribers.teams[SALES])
+
+    async def test_authentication(self):
+        for token, status in [(None, 401), ("invalid", 401)]:
+            stream = Stream(token)
+            self.assertEqual((await stream.receive())["status"], status)
+        stream = Stream(self.tokens["test_manager"], method="POST")
+        self.assertEqual((await stream.receive())["status"], 405)
@@ -0,0 +1,85 @@
+import json
+from contextlib import nullcontext
+
+from django.db import connection
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.common.timing import measure, observing_queries
+from apps.users.models import User
+from .setup import CustomCRMTestCase
+
+
+def parse_server_timing(header):
+    """name -> (duration, desc) from a Server-Timing header."""
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        params = dict(param.split("=", 1) for param in params)
+        metrics[name] = (float(params["dur"]), params.get("desc", ""))
+    return metrics
+
+
+class ServerTimingTests(CustomCRMTestCase):
+    client_list_url = reverse("clients:list")
+
+    def test_list_phases(self):
+        """Sampled list request : header and log line with the phases and queries."""
+        user = User.objects.get(username="test_manager")
+        test_client = self.get_token_auth_client(user)
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=1):
+            with self.assertLogs("apps.common.timing", "INFO") as logs:
+                response = test_client.get(self.client_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        metrics = parse_server_timing(response["Server-Timing"])
+        for phase in ["auth", "permissions", "filter", "paginate", "serialize"]:
+            self.assertIn(phase, metrics)
+        self.assertIn("render", metrics)
+        self.assertEqual(metrics["auth"][1], '"1 query"')
+        self.assertEqual(metrics["paginate"][1], '"1 query"')
+        self.assertEqual(metrics["db"][1], '"2 queries"')
+        phases = sum(
+            duration
+            for name, (duration, _) in metrics.items()
+            if name not in ["db", "total"]
+        )
+        self.assertLessEqual(phases, metrics["total"][0])
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line["path"], self.client_list_url)
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["phases"]["db"]["queries"], 2)
+
+    def test_detail_phases(self):
+        """Object lookup and object permissions are timed on detail requests."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=1):
+            with self.assertLogs("apps.common.timing", "INFO"):
+                response = test_client.get(reverse("clients:detail", kwargs={"pk": 1}))
+        metrics = parse_server_timing(response["Server-Timing"])
+        self.assertEqual(metrics["object"][1], '"1 query"')
+        self.assertIn("permissions", metrics)
+
+    def test_not_sampled(self):
+        """Sampling turned off : no header, phases are not recorded."""
+        user = User.objects.get(username="test_manager")
+        test_client = self.get_token_auth_client(user)
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=0):
+            response = test_client.get(self.client_list_url)
+        self.assertNotIn("Server-Timing", response)
+        self.assertIsInstance(measure("test"), nullcontext)
+
+    def test_shared_query_wrapper(self):
+        """Observers (Server-Timing, metrics) share one wrapper per connection."""
+        durations = {"timing": [], "metrics": []}
+        wrappers = list(connection.execute_wrappers)
+        with observing_queries(durations["timing"].append):
+            with observing_queries(durations["metrics"].append):
+                self.assertEqual(len(connection.execute_wrappers), len(wrappers) + 1)
+                User.objects.count()
+            User.objects.count()
+        self.assertEqual(connection.execute_wrappers, wrappers)
+        self.assertEqual(len(durations["timing"]), 2)
+        self.assertEqual(len(durations["metrics"]), 1)
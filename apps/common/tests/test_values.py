@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.clients.serializers import ClientSerializer
+from apps.contracts.models import Contract
+from apps.contracts.serializers import ContractSerializer
+from apps.events.models import Event
+from apps.events.serializers import EventSerializer
+from apps.users.models import User
+from ..values import (
+    DATE_DIRECTIVES,
+    TIME_DIRECTIVES,
+    ValuesListMixin,
+    ValuesSerializer,
+    compile_strftime,
+)
+from .setup import CustomCRMTestCase
+
+ROLES = ["test_manager", "test_sales", "test_support"]
+PARAMS = {
+    "clients": [{}, {"page_size": 2}, {"status": "true"}, {"fields": "id,email"}],
+    "contracts": [{}, {"page_size": 2}, {"amount__gte": 1000}, {"exclude": "client"}],
+    "events": [{}, {"page_size": 1}, {"exclude": "notes"}, {"fields": "event_date"}],
+}
+
+
+class ValuesListTests(CustomCRMTestCase):
+    def get_pages(self, url, params):
+        """Every page of the list, following the next links."""
+        responses = [self.client.get(url, params)]
+        while responses[-1].json()["next"]:
+            responses.append(self.client.get(responses[-1].json()["next"]))
+        return responses
+
+    def test_same_output(self):
+        """Byte for byte the same pages and ETags as the serializer path."""
+        for username in ROLES:
+            self.get_token_auth_client(User.objects.get(username=username))
+            for endpoint, params_list in PARAMS.items():
+                url = reverse(f"{endpoint}:list")
+                for params in params_list:
+                    with self.subTest(user=username, endpoint=endpoint, params=params):
+                        fast = self.get_pages(url, params)
+                        with mock.patch.object(ValuesListMixin, "fast_list", False):
+                            slow = self.get_pages(url, params)
+                        self.assertEqual(
+                            [r.content for r in fast], [r.content for r in slow]
+                        )
+                        self.assertEqual(
+                            [r["ETag"] for r in fast], [r["ETag"] for r in slow]
+                        )
+
+    def test_no_model_serialization(self):
+        """The list is built without ModelSerializer.to_representation."""
+        self.get_token_auth_client(User.objects.get(username="test_manager"))
+        with mock.patch.object(
+            ClientSerializer, "to_representation", side_effect=AssertionError
+        ):
+            response = self.client.get(reverse("clients:list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["results"])
+
+    def test_formats_and_time_zones(self):
+        """Formatters follow the DATE_FORMAT and DATETIME_FORMAT settings and
+        the current time zone, as the serializer fields.
+        """
+        formats = [
+            {},
+            {"DATE_FORMAT": "iso-8601", "DATETIME_FORMAT": "iso-8601"},
+            {"DATE_FORMAT": None, "DATETIME_FORMAT": None},
+        ]
+        for rest_framework in formats:
+            for zone in ["UTC", "America/New_York"]:
+                with self.subTest(settings=rest_framework, zone=zone):
+                    with override_settings(
+                        REST_FRAMEWORK={**settings.REST_FRAMEWORK, **rest_framework}
+                    ), timezone.override(zone):
+                        for model, serializer_class in [
+                            (Contract, ContractSerializer),
+                            (Event, EventSerializer),
+                        ]:
+                            serializer = serializer_class()
+                            reader = ValuesSerializer(serializer)
+                            queryset = model.objects.order_by("pk")
+                            self.assertEqual(
+                                reader.many(queryset.values(*reader.columns)),
+                                [serializer.to_representation(obj) for obj in queryset],
+                            )
+
+    def test_unsupported_serializer(self):
+        """Serializers with fields not read from a model column."""
+        serializer = ClientSerializer()
+        self.assertTrue(ValuesSerializer.supports(serializer))
+        serializer.fields["sales_contact"].source = "sales_contact.username"
+        self.assertFalse(ValuesSerializer.supports(serializer))
+
+    def test_compile_strftime(self):
+        """Same output as strftime, locale dependent directives are not compiled."""
+        value = timezone.now().replace(year=987, microsecond=1234)
+        directives = {**DATE_DIRECTIVES, **TIME_DIRECTIVES}
+        for output_format in ["%d-%m-%Y %H:%M", "%Y%m%dT%H%M%S.%f", "100%% {x}", ""]:
+            with self.subTest(output_format=output_format):
+                formatter = compile_strftime(output_format, directives)
+                self.assertEqual(formatter(value), value.strftime(output_format))
+        self.assertIsNone(compile_strftime("%d %b %Y", directives))
+        self.assertIsNone(compile_strftime("%d %H", DATE_DIRECTIVES))
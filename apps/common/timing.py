@@ -0,0 +1,260 @@
+import json
+import logging
+import random
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_recorder = ContextVar("server_timing_recorder", default=None)
+_inactive = nullcontext()
+
+
+class QueryObservers:
+    """connection.execute_wrapper calling each observer with the duration of
+    every query : one wrapper per connection, whatever the number of
+    observers (Server-Timing, metrics).
+    """
+
+    def __init__(self):
+        self.observers = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            for observer in self.observers:
+                observer(duration)
+
+
+@contextmanager
+def observing_queries(observer, databases=None):
+    """Call observer(duration) after each query run in the block on every
+    database connection, the connections of the current thread by default.
+    """
+    wrappers = []
+    for connection in databases or connections.all():
+        wrapper = getattr(connection, "query_observers", None)
+        if wrapper is None:
+            wrapper = connection.query_observers = QueryObservers()
+        if not wrapper.observers:
+            connection.execute_wrappers.append(wrapper)
+        wrapper.observers.append(observer)
+        wrappers.append((connection, wrapper))
+    try:
+        yield
+    finally:
+        for connection, wrapper in wrappers:
+            wrapper.observers.remove(observer)
+            if not wrapper.observers:
+                connection.execute_wrappers.remove(wrapper)
+
+
+class Recorder:
+    """Time spent and queries run per phase of a request.
+    Phases are exclusive : time and queries of a nested phase are not counted
+    in the enclosing one, so the phases add up to at most the total.
+    """
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.phases = {}
+        self.stack = []
+        self.queries = 0
+        self.db_time = 0
+
+    def enter(self, name):
+        now = perf_counter()
+        if self.stack:
+            self.add(self.stack[-1][0], now - self.stack[-1][1])
+        self.stack.append([name, now])
+
+    def exit(self):
+        now = perf_counter()
+        name, start = self.stack.pop()
+        self.add(name, now - start)
+        if self.stack:
+            self.stack[-1][1] = now
+
+    def add(self, name, duration=0, queries=0):
+        phase = self.phases.setdefault(name, [0, 0])
+        phase[0] += duration
+        phase[1] += queries
+
+    def count_query(self, duration):
+        """Query observer : count the query in the current phase."""
+        self.db_time += duration
+        self.queries += 1
+        if self.stack:
+            self.add(self.stack[-1][0], queries=1)
+
+    def summary(self):
+        """Phases, then db and total : name -> (milliseconds, queries)."""
+        summary = {
+            name: (round(duration * 1000, 3), queries)
+            for name, (duration, queries) in self.phases.items()
+        }
+        summary["db"] = (round(self.db_time * 1000, 3), self.queries)
+        summary["total"] = (
+            round((perf_counter() - self.start) * 1000, 3),
+            self.queries,
+        )
+        return summary
+
+
+@contextmanager
+def _measure(recorder, name):
+    recorder.enter(name)
+    try:
+        yield
+    finally:
+        recorder.exit()
+
+
+def measure(name):
+    """Context manager timing a phase of the current request, if it is sampled."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return _inactive
+    return _measure(recorder, name)
+
+
+def server_timing(summary):
+    """Server-Timing header value."""
+    metrics = []
+    for name, (duration, queries) in summary.items():
+        metric = f"{name};dur={duration}"
+        if queries:
+            metric += f';desc="{queries} quer{"y" if queries == 1 else "ies"}"'
+        metrics.append(metric)
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """Time the sampled requests (settings.SERVER_TIMING_SAMPLE_RATE, 0 to 1)
+    per phase, with the SQL queries counted on every database connection.
+    Results go to the Server-Timing header and to one JSON log line.
+    Requests not sampled only cost a random draw.
+    Runs in the sync or async request path.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        with self.recording() as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        # the async ORM runs in the request's sync thread, with its own connections
+        databases = await sync_to_async(connections.all)()
+        with self.recording(databases) as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder)
+
+    @staticmethod
+    def sampled():
+        rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0)
+        return rate and random.random() < rate
+
+    @staticmethod
+    @contextmanager
+    def recording(databases=None):
+        """Recorder of the request, counting queries on every connection,
+        the connections of the current thread by default.
+        """
+        recorder = Recorder()
+        token = _recorder.set(recorder)
+        try:
+            with observing_queries(recorder.count_query, databases):
+                yield recorder
+        finally:
+            _recorder.reset(token)
+
+    @staticmethod
+    def report(request, response, recorder):
+        summary = recorder.summary()
+        response["Server-Timing"] = server_timing(summary)
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "phases": {
+                        name: {"ms": duration, "queries": queries}
+                        for name, (duration, queries) in summary.items()
+                    },
+                }
+            )
+        )
+        return response
+
+
+class TimedViewMixin:
+    """DRF view phases : authentication, permissions, queryset, filters,
+    pagination and object lookup.
+    """
+
+    def perform_authentication(self, request):
+        with measure("auth"):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with measure("permissions"):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with measure("permissions"):
+            super().check_object_permissions(request, obj)
+
+    def get_queryset(self):
+        with measure("queryset"):
+            return super().get_queryset()
+
+    def filter_queryset(self, queryset):
+        with measure("filter"):
+            return super().filter_queryset(queryset)
+
+    def paginate_queryset(self, queryset):
+        with measure("paginate"):
+            return super().paginate_queryset(queryset)
+
+    def get_object(self):
+        with measure("object"):
+            return super().get_object()
+
+
+class TimedSerializerMixin:
+    """Serializer phase : time spent converting each object."""
+
+    def to_representation(self, instance):
+        with measure("serialize"):
+            return super().to_representation(instance)
+
+
+class TimedRendererMixin:
+    """Renderer phase."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure("render"):
+            return super().render(data, accepted_media_type, renderer_context)
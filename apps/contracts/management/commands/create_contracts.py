@@ -1,50 +1,56 @@
-from datetime import datetime
-from random import choice
+from datetime import date
 
-from django.core.management import BaseCommand
-from faker import Faker
+from django.core.management import call_command
 
 from apps.clients.models import Client
+from apps.common.seeding import SeedCommand
 from apps.contracts.models import Contract
 
 
-class Command(BaseCommand):
+class Command(SeedCommand):
     help = "Create sample contracts data."
+    model = Contract
+    label = "contract"
+    default_number = 20
 
-    def add_arguments(self, parser):
-        parser.add_argument(
-            "--number",
-            "-n",
-            dest="number",
-            default=20,
-            type=int,
-            help="Specify the number of contracts to create.",
-        )
-
-    def handle(self, *args, **options):
-        fake = Faker()
+    def get_number(self, options):
         number = options["number"]
-        clients = Client.objects.filter(status=True)
-        if clients.count() < number:
-            number = clients.count()
+        clients = Client.objects.filter(status=True).count()
+        if clients < number:
+            number = clients
             if options["verbosity"] != 0:
-                self.stdout.write(f"Maximum contracts possible: {clients.count()}")
-        if options["verbosity"] != 0:
-            self.stdout.write(f"Creating {number} contract(s)...")
-        self.create_contracts(fake, number, clients)
+                self.stdout.write(f"Maximum contracts possible: {clients}")
+        return number
+
+    def finish(self, options):
+        # rows inserted with bulk_create, without the dashboard signals
+        call_command("rebuild_dashboard", verbosity=0)
+
+    def get_context(self, number, seed, options):
+        return {
+            "clients": list(
+                Client.objects.filter(status=True)
+                .order_by("pk")
+                .values_list("pk", "sales_contact_id")
+            )
+        }
 
     @staticmethod
-    def create_contracts(fake, number, clients):
-        for _ in range(number):
-            client = choice(clients.values_list("pk", flat=True))
-            Contract.objects.create(
-                client_id=client,
-                sales_contact=Client.objects.get(id=client).sales_contact,
-                status=fake.boolean(chance_of_getting_true=70),
-                amount=fake.pyfloat(
-                    right_digits=2, positive=True, min_value=100, max_value=99999
-                ),
-                payment_due=fake.date_between_dates(
-                    date_start=datetime(2022, 1, 1), date_end=datetime(2023, 12, 31)
-                ).strftime("%Y-%m-%d"),
+    def generate(fake, start, count, context):
+        rows = []
+        for _ in range(count):
+            client, sales_contact = fake.random.choice(context["clients"])
+            rows.append(
+                {
+                    "client_id": client,
+                    "sales_contact_id": sales_contact,
+                    "status": fake.boolean(chance_of_getting_true=70),
+                    "amount": fake.pyfloat(
+                        right_digits=2, positive=True, min_value=100, max_value=99999
+                    ),
+                    "payment_due": fake.date_between_dates(
+                        date_start=date(2022, 1, 1), date_end=date(2023, 12, 31)
+                    ),
+                }
             )
+        return rows
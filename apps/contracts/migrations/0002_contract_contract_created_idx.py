@@ -0,0 +1,19 @@
+# Generated by Django 4.1 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contracts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(
+                fields=["date_created", "id"], name="contract_created_idx"
+            ),
+        ),
+    ]
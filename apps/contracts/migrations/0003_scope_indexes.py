@@ -0,0 +1,26 @@
+# Generated by Django 4.1 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contracts", "0002_contract_contract_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(
+                fields=["sales_contact", "date_created", "id"],
+                name="contract_sales_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(
+                fields=["status", "payment_due"], name="contract_status_due_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1 on 2026-10-18 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contracts", "0003_scope_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(
+                fields=["date_updated", "id"], name="contract_updated_idx"
+            ),
+        ),
+    ]
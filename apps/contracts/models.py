@@ -2,6 +2,26 @@ from django.conf import settings
 from django.db import models
 
 from apps.clients.models import Client
+from apps.common.scopes import CHANGE, VIEW, ScopedQuerySet
+from apps.users.models import MANAGEMENT, SALES, SUPPORT
+
+
+class ContractQuerySet(ScopedQuerySet):
+    def visible_to(self, user, action=VIEW):
+        """Managers : VIEW all contracts
+        Sales team : VIEW their own contracts, CHANGE them if not signed
+        Support team : VIEW contracts of their own events
+        """
+        if user.team.name == MANAGEMENT and action == VIEW:
+            return self.all()
+        elif user.team.name == SALES:
+            if action == VIEW:
+                return self.filter(sales_contact=user)
+            elif action == CHANGE:
+                return self.filter(sales_contact=user, status=False)
+        elif user.team.name == SUPPORT and action == VIEW:
+            return self.filter(event__support_contact=user)
+        return self.none()
 
 
 class Contract(models.Model):
@@ -24,6 +44,21 @@ class Contract(models.Model):
     amount = models.FloatField()
     payment_due = models.DateField()
 
+    objects = ContractQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date_created", "id"], name="contract_created_idx"),
+            models.Index(fields=["date_updated", "id"], name="contract_updated_idx"),
+            models.Index(
+                fields=["sales_contact", "date_created", "id"],
+                name="contract_sales_created_idx",
+            ),
+            models.Index(
+                fields=["status", "payment_due"], name="contract_status_due_idx"
+            ),
+        ]
+
     def __str__(self):
         name = f"{self.client.last_name}, {self.client.first_name}"
         if self.status is False:
@@ -1,8 +1,8 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 
+from apps.common.scopes import has_access
 from apps.users.models import SALES, SUPPORT
-from .models import Contract
 
 
 class ContractPermissions(permissions.BasePermission):
@@ -17,12 +17,6 @@ class ContractPermissions(permissions.BasePermission):
         return request.user.team.name == SALES
 
     def has_object_permission(self, request, view, obj):
-        if request.method in permissions.SAFE_METHODS:
-            if request.user.team.name == SUPPORT:
-                return obj in Contract.objects.filter(
-                    event__support_contact=request.user
-                )
-            return request.user == obj.sales_contact
-        elif request.method == "PUT" and obj.status is True:
+        if request.method == "PUT" and obj.status is True:
             raise PermissionDenied("Cannot update a signed contract.")
-        return request.user == obj.sales_contact and obj.status is False
+        return has_access(request, obj)
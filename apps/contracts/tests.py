@@ -1,10 +1,12 @@
 import datetime
+import json
 
 from django.core.management import call_command
 from rest_framework import status
 from rest_framework.reverse import reverse
 
 from apps.clients.models import Client
+from apps.common.scopes import CHANGE, VIEW
 from apps.common.tests.setup import CommandTestCase, CustomCRMTestCase
 from apps.users.models import User
 from .models import Contract
@@ -79,7 +81,7 @@ class ContractListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.contract_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), len(Contract.objects.all()))
+        self.assertEqual(len(response.data["results"]), len(Contract.objects.all()))
 
     def test_manager_create_contract(self):
         """Managers must create contracts via admin site."""
@@ -98,7 +100,7 @@ class ContractListTests(CustomCRMTestCase):
         response = test_client.get(self.contract_list_url, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data["results"]:
             self.assertEqual(item["sales_contact"], user.id)
 
     def test_sales_create_contract(self):
@@ -145,7 +147,7 @@ class ContractListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.contract_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data["results"]:
             contract = Contract.objects.get(id=item["id"])
             self.assertIn(
                 contract, Contract.objects.filter(event__support_contact=user.id)
@@ -244,9 +246,87 @@ class ContractDetailTests(CustomCRMTestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class ContractExportTests(CustomCRMTestCase):
+    def test_support_export_ndjson(self):
+        """Support export contracts of their own events only."""
+        user = User.objects.get(username="test_support")
+        test_client = self.get_token_auth_client(user)
+        response = test_client.get(f"{reverse('contracts:export')}?format=ndjson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(
+            [row["id"] for row in rows],
+            list(
+                Contract.objects.visible_to(user)
+                .order_by("pk")
+                .values_list("id", flat=True)
+            ),
+        )
+
+
+class ContractBatchTests(CustomCRMTestCase):
+    batch_url = reverse("contracts:batch")
+
+    def test_sales_batch_create(self):
+        """Created contracts are assigned to the user."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        data = [
+            {"client": 2, "amount": 100, "payment_due": "2022-10-09"},
+            {"client": 1, "amount": 200, "payment_due": "2022-10-10", "status": True},
+        ]
+        response = test_client.post(self.batch_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        for item in response.json():
+            self.assertEqual(item["status"], status.HTTP_201_CREATED)
+            self.assertEqual(item["data"]["sales_contact"], user.id)
+        self.assertEqual(Contract.objects.filter(sales_contact=user).count(), 6)
+
+    def test_sales_batch_update(self):
+        """Signed contracts cannot be updated, unknown clients are reported."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        data = [
+            {"id": 2, "client": 2, "amount": 10, "payment_due": "2022-10-09"},
+            {"id": 1, "client": 1, "amount": 10, "payment_due": "2022-10-09"},
+            {"id": 2, "client": 999, "amount": 10, "payment_due": "2022-10-09"},
+        ]
+        response = test_client.put(self.batch_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.json()
+        self.assertEqual([item["status"] for item in results], [202, 403, 400])
+        self.assertEqual(
+            results[1]["errors"], {"detail": "Cannot update a signed contract."}
+        )
+        self.assertIn("client", results[2]["errors"])
+        self.assertEqual(Contract.objects.get(pk=2).amount, 10)
+        self.assertEqual(Contract.objects.get(pk=1).amount, 1000)
+
+
 class ContractModelTests(CustomCRMTestCase):
     def test_str_contract(self):
         contract = Contract.objects.get(id=1)
         self.assertEqual(str(contract), "Contract #1 : Miller, James (SIGNED)")
         contract = Contract.objects.get(id=2)
         self.assertEqual(str(contract), "Contract #2 : Dupont, Jean (NOT SIGNED)")
+
+
+class ContractScopeTests(CustomCRMTestCase):
+    def test_sales_scope(self):
+        """Sales view their own contracts, change them if not signed."""
+        user = User.objects.get(username="test_sales")
+        for contract in Contract.objects.visible_to(user, VIEW):
+            self.assertEqual(contract.sales_contact, user)
+        for contract in Contract.objects.visible_to(user, CHANGE):
+            self.assertEqual(contract.sales_contact, user)
+            self.assertFalse(contract.status)
+
+    def test_support_scope(self):
+        """Support view contracts of their own events only."""
+        user = User.objects.get(username="test_support")
+        for contract in Contract.objects.visible_to(user, VIEW):
+            self.assertEqual(contract.event.support_contact, user)
+        self.assertFalse(Contract.objects.visible_to(user, CHANGE).exists())
@@ -5,5 +5,10 @@ from . import views
 app_name = "contracts"
 urlpatterns = [
     path("", views.ContractList.as_view(), name="list"),
+    path("export/", views.ContractExport.as_view(), name="export"),
+    path("changes/", views.ContractChanges.as_view(), name="changes"),
+    path("batch/", views.ContractBatch.as_view(), name="batch"),
     path("<int:pk>/", views.ContractDetail.as_view(), name="detail"),
+    path("async/", views.ContractAsyncList.as_view(), name="async_list"),
+    path("async/<int:pk>/", views.ContractAsyncDetail.as_view(), name="async_detail"),
 ]
@@ -1,20 +1,42 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.async_views import AsyncDetailView, AsyncListView
+from apps.common.batch import BatchView
+from apps.common.cache import CachedListMixin
+from apps.common.changes import ChangeFeedMixin
+from apps.common.conditional import ConditionalDetailMixin, ConditionalListMixin
+from apps.common.export import ExportMixin
 from apps.common.permissions import IsManager
-from apps.users.models import SALES, SUPPORT
+from apps.common.scopes import action_for
+from apps.common.search import PrefixSearchFilter
+from apps.common.sparse import SparseFieldsMixin
+from apps.common.timing import TimedViewMixin
+from apps.common.values import ValuesListMixin
+from apps.dashboard.summaries import deferred
 from .models import Contract
 from .permissions import ContractPermissions
 from .serializers import ContractSerializer
 
 
-class ContractList(generics.ListCreateAPIView):
+def apply_contract_rules(user, validated_data, contract=None):
+    """Contracts are assigned to the sales user creating or updating them."""
+    validated_data["sales_contact"] = user
+
+
+class ContractList(
+    TimedViewMixin,
+    SparseFieldsMixin,
+    CachedListMixin,
+    ValuesListMixin,
+    ConditionalListMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = ContractSerializer
     permission_classes = [IsAuthenticated, IsManager | ContractPermissions]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
+    filter_backends = [PrefixSearchFilter, DjangoFilterBackend]
     search_fields = [
         "^client__first_name",
         "^client__last_name",
@@ -29,29 +51,69 @@ class ContractList(generics.ListCreateAPIView):
     }
 
     def get_queryset(self):
-        if self.request.user.team.name == SUPPORT:
-            return Contract.objects.filter(event__support_contact=self.request.user)
-        elif self.request.user.team.name == SALES:
-            return Contract.objects.filter(sales_contact=self.request.user)
-        return Contract.objects.all()
+        return Contract.objects.visible_to(self.request.user)
 
     def post(self, request, *args, **kwargs):
         serializer = ContractSerializer(data=request.data)
         if serializer.is_valid(raise_exception=True):
-            serializer.validated_data["sales_contact"] = request.user
+            apply_contract_rules(request.user, serializer.validated_data)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ContractDetail(generics.RetrieveUpdateAPIView):
-    queryset = Contract.objects.all()
+class ContractExport(ExportMixin, ContractList):
+    export_name = "contracts"
+
+
+class ContractChanges(ChangeFeedMixin, ContractList):
+    pass
+
+
+class ContractBatch(TimedViewMixin, BatchView):
+    permission_classes = [IsAuthenticated, IsManager | ContractPermissions]
+    serializer_class = ContractSerializer
+
+    def get_queryset(self):
+        action = action_for(self.request.method)
+        return Contract.objects.with_access(self.request.user, action)
+
+    def signals_context(self):
+        # one update per dashboard summary row, not per item
+        return deferred()
+
+    def create_rules(self, validated_data):
+        apply_contract_rules(self.request.user, validated_data)
+
+    def update_rules(self, instance, validated_data):
+        apply_contract_rules(self.request.user, validated_data, instance)
+
+
+class ContractDetail(
+    TimedViewMixin,
+    SparseFieldsMixin,
+    ConditionalDetailMixin,
+    generics.RetrieveUpdateAPIView,
+):
     http_method_names = ["get", "put", "options"]
     permission_classes = [IsAuthenticated, IsManager | ContractPermissions]
     serializer_class = ContractSerializer
 
+    def get_queryset(self):
+        action = action_for(self.request.method)
+        return Contract.objects.with_access(self.request.user, action)
+
     def update(self, request, *args, **kwargs):
-        serializer = ContractSerializer(data=request.data, instance=self.get_object())
+        contract = self.get_object()
+        serializer = ContractSerializer(data=request.data, instance=contract)
         if serializer.is_valid(raise_exception=True):
-            serializer.validated_data["sales_contact"] = request.user
+            apply_contract_rules(request.user, serializer.validated_data, contract)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ContractAsyncList(AsyncListView):
+    view_class = ContractList
+
+
+class ContractAsyncDetail(AsyncDetailView):
+    view_class = ContractDetail
@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand, CommandError
+
+from apps.dashboard import summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard summaries from the contracts and events."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            dest="check",
+            action="store_true",
+            help="Only compare the summaries with the contracts and events.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            summaries.rebuild()
+            if options["verbosity"] != 0:
+                self.stdout.write("Dashboard summaries rebuilt.")
+            return
+        errors = summaries.check()
+        if errors:
+            raise CommandError("Dashboard summaries out of date:\n" + "\n".join(errors))
+        if options["verbosity"] != 0:
+            self.stdout.write("Dashboard summaries up to date.")
@@ -0,0 +1,103 @@
+# Generated by Django 4.1 on 2026-10-18 19:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContractSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("status", models.BooleanField(unique=True, verbose_name="Signed")),
+                ("contracts", models.IntegerField(default=0)),
+                ("amount", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MonthSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(unique=True)),
+                ("events", models.IntegerField(default=0)),
+                ("attendees", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SupportSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("upcoming_events", models.IntegerField(default=0)),
+                (
+                    "support_contact",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SalesSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("status", models.BooleanField(verbose_name="Signed")),
+                ("contracts", models.IntegerField(default=0)),
+                ("amount", models.FloatField(default=0)),
+                (
+                    "sales_contact",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="salessummary",
+            constraint=models.UniqueConstraint(
+                fields=("sales_contact", "status"), name="sales_summary_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_summaries(apps, schema_editor):
+    """Summaries of the existing contracts and events, as rebuild_dashboard."""
+    db_alias = schema_editor.connection.alias
+    contracts = apps.get_model("contracts", "Contract").objects.using(db_alias)
+    events = apps.get_model("events", "Event").objects.using(db_alias)
+    signed = {"contracts": Count("pk"), "amount": Sum("amount")}
+    rows = {
+        "ContractSummary": contracts.values("status").annotate(**signed),
+        "SalesSummary": contracts.filter(sales_contact__isnull=False)
+        .values("sales_contact_id", "status")
+        .annotate(**signed),
+        "SupportSummary": events.filter(
+            support_contact__isnull=False, event_status=False
+        )
+        .values("support_contact_id")
+        .annotate(upcoming_events=Count("pk")),
+        "MonthSummary": events.annotate(
+            month=TruncMonth("event_date", output_field=DateField())
+        )
+        .values("month")
+        .annotate(events=Count("pk"), attendees=Sum("attendees")),
+    }
+    for name, summary_rows in rows.items():
+        summary = apps.get_model("dashboard", name)
+        summary.objects.using(db_alias).bulk_create(
+            summary(**row) for row in summary_rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0001_initial"),
+        ("contracts", "0003_scope_indexes"),
+        ("events", "0004_scope_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
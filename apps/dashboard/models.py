@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import models
+
+
+class ContractSummary(models.Model):
+    """Number and amount of the contracts, signed or not."""
+
+    status = models.BooleanField(unique=True, verbose_name="Signed")
+    contracts = models.IntegerField(default=0)
+    amount = models.FloatField(default=0)
+
+
+class SalesSummary(models.Model):
+    """Number and amount of the contracts of a sales contact, signed or not."""
+
+    sales_contact = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    status = models.BooleanField(verbose_name="Signed")
+    contracts = models.IntegerField(default=0)
+    amount = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sales_contact", "status"], name="sales_summary_unique"
+            )
+        ]
+
+
+class SupportSummary(models.Model):
+    """Number of upcoming events of a support contact."""
+
+    support_contact = models.OneToOneField(
+        to=settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    upcoming_events = models.IntegerField(default=0)
+
+
+class MonthSummary(models.Model):
+    """Number of events and attendees per month of the event date."""
+
+    month = models.DateField(unique=True)
+    events = models.IntegerField(default=0)
+    attendees = models.IntegerField(default=0)
@@ -0,0 +1,94 @@
+import logging
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from . import summaries
+
+logger = logging.getLogger(__name__)
+
+# Instance attributes : values of the tracked fields as stored in the database,
+# and as they were before the save in progress.
+STATE = "_dashboard_state"
+OLD = "_dashboard_old"
+
+
+def loaded_state(sender, instance, **kwargs):
+    """Tracked values of an instance, when none of them is deferred."""
+    values = instance.__dict__
+    fields = summaries.TRACKED[sender]
+    if all(field in values for field in fields):
+        values[STATE] = tuple(values[field] for field in fields)
+
+
+def stored_state(sender, pk):
+    return (
+        sender._base_manager.filter(pk=pk)
+        .values_list(*summaries.TRACKED[sender])
+        .first()
+    )
+
+
+def before_save(sender, instance, raw, **kwargs):
+    """State of the row before the save : None when it is inserted, the loaded
+    values if known, otherwise read from the database (fixtures, deferred fields).
+    """
+    if instance.pk is None:
+        old = None
+    elif raw or instance._state.adding or STATE not in instance.__dict__:
+        old = stored_state(sender, instance.pk)
+    else:
+        old = instance.__dict__[STATE]
+    instance.__dict__[OLD] = old
+
+
+def after_save(sender, instance, created, update_fields, **kwargs):
+    values = instance.__dict__
+    if OLD in values:
+        old = values.pop(OLD)
+    elif created:
+        old = None
+    elif STATE in values:
+        # saved without pre_save, e.g. by BatchView's bulk_update
+        old = values[STATE]
+    else:
+        logger.warning(
+            "Dashboard not updated for %s %s, previous values unknown.",
+            sender._meta.label,
+            instance.pk,
+        )
+        return
+
+    new = []
+    for index, attname in enumerate(summaries.TRACKED[sender]):
+        field = sender._meta.get_field(attname)
+        if (
+            old is not None
+            and update_fields is not None
+            and field.name not in update_fields
+        ):
+            new.append(old[index])
+        else:
+            # values as stored, e.g. a date string assigned before the save
+            new.append(field.to_python(getattr(instance, attname)))
+    new = tuple(new)
+    summaries.record(sender, old, new)
+    values[STATE] = new
+
+
+def after_delete(sender, instance, **kwargs):
+    if STATE in instance.__dict__:
+        summaries.record(sender, instance.__dict__[STATE], None)
+    else:
+        logger.warning(
+            "Dashboard not updated for %s %s, deleted values unknown.",
+            sender._meta.label,
+            instance.pk,
+        )
+
+
+for model in summaries.TRACKED:
+    label = model._meta.label_lower
+    post_init.connect(loaded_state, sender=model, dispatch_uid=f"dashboard_{label}")
+    pre_save.connect(before_save, sender=model, dispatch_uid=f"dashboard_{label}")
+    post_save.connect(after_save, sender=model, dispatch_uid=f"dashboard_{label}")
+    post_delete.connect(after_delete, sender=model, dispatch_uid=f"dashboard_{label}")
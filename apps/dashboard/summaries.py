@@ -0,0 +1,173 @@
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from .models import ContractSummary, MonthSummary, SalesSummary, SupportSummary
+
+# Summary model : key fields, counter fields.
+SUMMARIES = {
+    ContractSummary: (["status"], ["contracts", "amount"]),
+    SalesSummary: (["sales_contact_id", "status"], ["contracts", "amount"]),
+    SupportSummary: (["support_contact_id"], ["upcoming_events"]),
+    MonthSummary: (["month"], ["events", "attendees"]),
+}
+
+# Base model : fields its summary rows depend on (attribute names).
+TRACKED = {
+    Contract: ("sales_contact_id", "status", "amount"),
+    Event: ("support_contact_id", "event_status", "event_date", "attendees"),
+}
+
+_pending = ContextVar("dashboard_pending", default=None)
+
+
+def month_of(value):
+    """First day of the month of a datetime in the current time zone, as TruncMonth."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+def contract_rows(sales_contact_id, status, amount):
+    values = {"contracts": 1, "amount": amount}
+    yield ContractSummary, {"status": status}, values
+    if sales_contact_id is not None:
+        seller = {"sales_contact_id": sales_contact_id, "status": status}
+        yield SalesSummary, seller, values
+
+
+def event_rows(support_contact_id, event_status, event_date, attendees):
+    month = {"month": month_of(event_date)}
+    yield MonthSummary, month, {"events": 1, "attendees": attendees}
+    if support_contact_id is not None and not event_status:
+        support = {"support_contact_id": support_contact_id}
+        yield SupportSummary, support, {"upcoming_events": 1}
+
+
+ROWS = {Contract: contract_rows, Event: event_rows}
+
+
+def record(model, old, new):
+    """Update the summaries for a row going from the old to the new state
+    (TRACKED values, None for a created or deleted row). Summary rows both
+    states count in are updated once, with the difference.
+    """
+    changes = {}
+    for sign, state in [(-1, old), (1, new)]:
+        if state is None:
+            continue
+        for summary, key, values in ROWS[model](*state):
+            deltas = changes.setdefault((summary, tuple(key.items())), {})
+            for field, value in values.items():
+                deltas[field] = deltas.get(field, 0) + sign * value
+
+    pending = _pending.get()
+    if pending is None:
+        write(changes)
+        return
+    for row, deltas in changes.items():
+        total = pending.setdefault(row, {})
+        for field, delta in deltas.items():
+            total[field] = total.get(field, 0) + delta
+
+
+@contextmanager
+def deferred():
+    """Changes recorded in the block are added up and written once, on exit :
+    a batch of saves updates each summary row with a single query.
+    """
+    if _pending.get() is not None:
+        yield
+        return
+    pending = {}
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    write(pending)
+
+
+def write(changes):
+    for (summary, key), deltas in changes.items():
+        add(summary, dict(key), {f: d for f, d in deltas.items() if d})
+
+
+def add(summary, key, deltas):
+    """Add the deltas to the counters of a summary row, created if missing.
+    Increments are done by the database (F expressions), concurrent writers
+    never overwrite each other's changes.
+    """
+    if not deltas:
+        return
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if summary.objects.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            summary.objects.create(**key, **deltas)
+    except IntegrityError:
+        # created in the meantime by another writer
+        summary.objects.filter(**key).update(**increments)
+
+
+def computed():
+    """Summary rows computed from the base tables, with GROUP BY queries."""
+    signed = {"contracts": Count("pk"), "amount": Sum("amount")}
+    return {
+        ContractSummary: Contract.objects.values("status").annotate(**signed),
+        SalesSummary: Contract.objects.filter(sales_contact__isnull=False)
+        .values("sales_contact_id", "status")
+        .annotate(**signed),
+        SupportSummary: Event.objects.filter(
+            support_contact__isnull=False, event_status=False
+        )
+        .values("support_contact_id")
+        .annotate(upcoming_events=Count("pk")),
+        MonthSummary: Event.objects.annotate(
+            month=TruncMonth("event_date", output_field=DateField())
+        )
+        .values("month")
+        .annotate(events=Count("pk"), attendees=Sum("attendees")),
+    }
+
+
+def rebuild():
+    """Replace the summaries with the rows computed from the base tables."""
+    with transaction.atomic():
+        for summary, rows in computed().items():
+            summary.objects.all().delete()
+            summary.objects.bulk_create(summary(**row) for row in rows)
+
+
+def check():
+    """Differences between the summaries and the base tables, as messages.
+    Summary rows counting nothing are the same as missing rows, amounts are
+    compared to the cent.
+    """
+    errors = []
+    for summary, rows in computed().items():
+        keys, fields = SUMMARIES[summary]
+        expected = {tuple(row[k] for k in keys): row for row in rows}
+        stored = {
+            tuple(row[k] for k in keys): row
+            for row in summary.objects.values(*keys, *fields)
+        }
+        for key in sorted(expected.keys() | stored.keys(), key=str):
+            found = [stored.get(key, {}).get(field, 0) for field in fields]
+            wanted = [expected.get(key, {}).get(field, 0) for field in fields]
+            if not all(
+                math.isclose(a, b, abs_tol=0.005) for a, b in zip(found, wanted)
+            ):
+                errors.append(
+                    f"{summary.__name__} {dict(zip(keys, key))}: "
+                    f"{dict(zip(fields, found))} instead of {dict(zip(fields, wanted))}"
+                )
+    return errors
@@ -0,0 +1,158 @@
+from datetime import date
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from apps.clients.models import Client
+from apps.common.tests.setup import CommandTestCase, CustomCRMTestCase
+from apps.contracts.models import Contract
+from apps.events.models import Event
+from apps.users.models import User
+from . import summaries
+from .models import ContractSummary, MonthSummary, SupportSummary
+
+DASHBOARD_URL = reverse("dashboard:dashboard")
+
+
+class DashboardTests(CustomCRMTestCase):
+    def assertSummariesUpToDate(self):
+        self.assertEqual(summaries.check(), [])
+
+    def test_manager_dashboard(self):
+        """Summaries of the fixtures, loaded with their signals."""
+        self.get_token_auth_client(User.objects.get(username="test_manager"))
+        response = self.client.get(DASHBOARD_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        signed = Contract.objects.filter(status=True)
+        self.assertEqual(
+            response.data["contracts"]["signed"],
+            {
+                "contracts": signed.count(),
+                "amount": round(sum(c.amount for c in signed), 2),
+            },
+        )
+        sales = {row["username"]: row for row in response.data["sales"]}
+        self.assertEqual(sales["test_sales"]["signed_contracts"], 3)
+        self.assertEqual(sales["test_sales"]["revenue"], 2123.95)
+        self.assertEqual(sales["test_sales"]["unsigned_amount"], 1234.56)
+        support = {row["username"]: row for row in response.data["support"]}
+        self.assertEqual(support["test_support"]["upcoming_events"], 1)
+        months = {row["month"]: row for row in response.data["months"]}
+        self.assertEqual(
+            months["2022-09"], {"month": "2022-09", "events": 1, "attendees": 60}
+        )
+        self.assertSummariesUpToDate()
+
+    def test_dashboard_forbidden(self):
+        """Managers only."""
+        for username in ["test_sales", "test_support"]:
+            with self.subTest(username=username):
+                self.get_token_auth_client(User.objects.get(username=username))
+                response = self.client.get(DASHBOARD_URL)
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_dashboard_queries(self):
+        """One query per section, whatever the number of contracts and events."""
+        self.get_token_auth_client(User.objects.get(username="test_manager"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(DASHBOARD_URL)
+        self.assertFalse([q["sql"] for q in queries if "GROUP BY" in q["sql"].upper()])
+
+    def test_summaries_follow_writes(self):
+        """Created, updated and deleted contracts and events."""
+        contract = Contract.objects.get(pk=2)
+        contract.status = True
+        contract.amount = 2000
+        contract.save()
+        self.assertSummariesUpToDate()
+
+        event = Event.objects.create(
+            contract=contract,
+            support_contact_id=6,
+            attendees=20,
+            event_date="2023-01-31T23:30:00Z",
+        )
+        self.assertSummariesUpToDate()
+        self.assertTrue(MonthSummary.objects.filter(month=date(2023, 2, 1)).exists())
+
+        event = Event.objects.get(pk=event.pk)
+        event.event_status = True
+        event.save(update_fields=["event_status"])
+        self.assertSummariesUpToDate()
+        self.assertEqual(
+            SupportSummary.objects.get(support_contact_id=6).upcoming_events, 1
+        )
+
+        contract.sales_contact_id = 5
+        contract.save(update_fields=["amount"])
+        self.assertSummariesUpToDate()
+
+        Client.objects.get(pk=2).delete()
+        self.assertSummariesUpToDate()
+        Event.objects.get(pk=1).delete()
+        self.assertSummariesUpToDate()
+
+    def test_deferred_fields(self):
+        """Instances loaded without the tracked fields."""
+        contract = Contract.objects.only("id").get(pk=2)
+        contract.amount = 99
+        contract.save()
+        self.assertSummariesUpToDate()
+        contract = Contract.objects.defer("amount").get(pk=2)
+        contract.status = True
+        contract.save()
+        self.assertSummariesUpToDate()
+
+    def test_api_writes(self):
+        """Single and batch endpoints, batches write each summary row once."""
+        self.get_token_auth_client(User.objects.get(username="test_sales"))
+        data = {"client": 1, "amount": 10, "payment_due": "2022-10-09", "status": True}
+        response = self.client.post(reverse("contracts:list"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertSummariesUpToDate()
+
+        for size in [1, 5]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    reverse("contracts:batch"), [data] * size, format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            summary_writes = [
+                q for q in queries if "dashboard_" in q["sql"] and "UPDATE" in q["sql"]
+            ]
+            self.assertEqual(len(summary_writes), 2)
+            self.assertSummariesUpToDate()
+        self.assertEqual(
+            ContractSummary.objects.get(status=True).contracts,
+            Contract.objects.filter(status=True).count(),
+        )
+
+    def test_rebuild_command(self):
+        """--check reports the differences, the rebuild fixes them."""
+        ContractSummary.objects.filter(status=True).update(amount=0)
+        MonthSummary.objects.all().delete()
+        with self.assertRaisesMessage(CommandError, "ContractSummary {'status': True}"):
+            call_command("rebuild_dashboard", "--check", verbosity=0)
+        self.assertEqual(
+            len(summaries.check()),
+            1 + Event.objects.dates("event_date", "month").count(),
+        )
+        call_command("rebuild_dashboard", verbosity=0)
+        call_command("rebuild_dashboard", "--check", verbosity=0)
+
+
+class DashboardCommandTests(CommandTestCase):
+    def test_seed_commands(self):
+        """Rows created by the seed commands (bulk_create) are summarized."""
+        call_command("create_users", "--verbosity=0")
+        call_command("create_clients", "--verbosity=0")
+        call_command("create_contracts", "--verbosity=0")
+        call_command("create_events", "--verbosity=0")
+        self.assertEqual(summaries.check(), [])
+        self.assertEqual(
+            self.call_command("rebuild_dashboard", "--check"),
+            "Dashboard summaries up to date.\n",
+        )
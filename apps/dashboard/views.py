@@ -0,0 +1,89 @@
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.common.permissions import IsManager
+from apps.common.timing import TimedViewMixin
+from .models import ContractSummary, MonthSummary, SalesSummary, SupportSummary
+
+
+class Dashboard(TimedViewMixin, APIView):
+    """Managers dashboard, read from the summary tables kept up to date by the
+    contracts and events signals : one small query per section, whatever the
+    number of contracts and events.
+    """
+
+    permission_classes = [IsAuthenticated, IsManager]
+
+    def get(self, request, *args, **kwargs):
+        contracts = {
+            status: {"contracts": 0, "amount": 0} for status in ["signed", "unsigned"]
+        }
+        for row in ContractSummary.objects.values("status", "contracts", "amount"):
+            contracts["signed" if row["status"] else "unsigned"] = {
+                "contracts": row["contracts"],
+                "amount": round(row["amount"], 2),
+            }
+
+        sales = {}
+        for row in SalesSummary.objects.order_by("sales_contact_id").values(
+            "sales_contact_id",
+            "sales_contact__username",
+            "status",
+            "contracts",
+            "amount",
+        ):
+            seller = sales.setdefault(
+                row["sales_contact_id"],
+                {
+                    "sales_contact": row["sales_contact_id"],
+                    "username": row["sales_contact__username"],
+                    "signed_contracts": 0,
+                    "revenue": 0,
+                    "unsigned_contracts": 0,
+                    "unsigned_amount": 0,
+                },
+            )
+            if row["status"]:
+                seller["signed_contracts"] = row["contracts"]
+                seller["revenue"] = round(row["amount"], 2)
+            else:
+                seller["unsigned_contracts"] = row["contracts"]
+                seller["unsigned_amount"] = round(row["amount"], 2)
+
+        support = [
+            {
+                "support_contact": row["support_contact_id"],
+                "username": row["support_contact__username"],
+                "upcoming_events": row["upcoming_events"],
+            }
+            for row in SupportSummary.objects.filter(upcoming_events__gt=0)
+            .order_by("support_contact_id")
+            .values(
+                "support_contact_id", "support_contact__username", "upcoming_events"
+            )
+        ]
+
+        months = [
+            {
+                "month": row["month"].strftime("%Y-%m"),
+                "events": row["events"],
+                "attendees": row["attendees"],
+            }
+            for row in MonthSummary.objects.filter(events__gt=0)
+            .order_by("month")
+            .values("month", "events", "attendees")
+        ]
+
+        return Response(
+            {
+                "contracts": contracts,
+                "sales": [
+                    seller
+                    for seller in sales.values()
+                    if seller["signed_contracts"] or seller["unsigned_contracts"]
+                ],
+                "support": support,
+                "months": months,
+            }
+        )
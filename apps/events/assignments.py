@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from apps.clients.models import Client
+from apps.contracts.models import Contract
+from .models import Event, SupportAssignment
+
+# Base model : fields the assignments depend on (attribute names).
+TRACKED = {
+    Event: ("support_contact_id", "contract_id"),
+    Contract: ("client_id",),
+}
+
+_pending = ContextVar("assignments_pending", default=None)
+
+
+def client_of(event, contract_id):
+    """Client id of the event contract, from the cached contract if it is this one."""
+    contract = Event._meta.get_field("contract").get_cached_value(event, None)
+    if contract is not None and contract.pk == contract_id:
+        return contract.client_id
+    return (
+        Contract._base_manager.filter(pk=contract_id)
+        .values_list("client_id", flat=True)
+        .first()
+    )
+
+
+def record(model, instance, old, new):
+    """Recount the assignments of the clients of a row going from the old to
+    the new state (TRACKED values, None for a created or deleted row). Nothing
+    is read nor written unless the support contact, the event contract or the
+    contract client changed.
+    """
+    if old == new:
+        return
+    clients = set()
+    if model is Event:
+        for state in [old, new]:
+            if state is not None and state[0] is not None:
+                clients.add(client_of(instance, state[1]))
+    elif old is not None and new is not None:
+        # a new contract has no event yet, a deleted one's event is deleted first
+        if Event._base_manager.filter(
+            contract_id=instance.pk, support_contact__isnull=False
+        ).exists():
+            clients.update([old[0], new[0]])
+    clients.discard(None)
+
+    pending = _pending.get()
+    if pending is None:
+        write(clients)
+        return
+    pending.update(clients)
+
+
+@contextmanager
+def deferred():
+    """Clients recorded in the block are recounted once, on exit."""
+    if _pending.get() is not None:
+        yield
+        return
+    pending = set()
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    write(pending)
+
+
+def write(clients):
+    """Set the assignments of the clients from their events. The client rows
+    are locked first : concurrent writers recount one after the other, each
+    reading the events the previous one committed, whatever the values their
+    instances were loaded with.
+    """
+    if not clients:
+        return
+    with transaction.atomic():
+        if connection.features.has_select_for_update:
+            rows = Client.objects.select_for_update().filter(pk__in=clients)
+            list(rows.order_by("pk").values_list("pk"))
+        expected = computed(contract__client_id__in=clients)
+        stored = SupportAssignment.objects.filter(client_id__in=clients).values_list(
+            "pk", "support_contact_id", "client_id", "events"
+        )
+        removed = []
+        for pk, support_contact_id, client_id, events in stored:
+            row = expected.pop((support_contact_id, client_id), None)
+            if row is None:
+                removed.append(pk)
+            elif row["events"] != events:
+                SupportAssignment.objects.filter(pk=pk).update(events=row["events"])
+        if removed:
+            SupportAssignment.objects.filter(pk__in=removed).delete()
+        if expected:
+            SupportAssignment.objects.bulk_create(
+                SupportAssignment(**row) for row in expected.values()
+            )
+
+
+def computed(**filters):
+    """Assignments computed from the events, with a GROUP BY query."""
+    rows = (
+        Event._base_manager.filter(support_contact__isnull=False, **filters)
+        .values("support_contact_id", client_id=F("contract__client_id"))
+        .annotate(events=Count("pk"))
+    )
+    return {(row["support_contact_id"], row["client_id"]): row for row in rows}
+
+
+def rebuild():
+    """Replace the assignments with the rows computed from the events."""
+    with transaction.atomic():
+        SupportAssignment.objects.all().delete()
+        SupportAssignment.objects.bulk_create(
+            SupportAssignment(**row) for row in computed().values()
+        )
+
+
+def check():
+    """Differences between the assignments and the events, as messages."""
+    expected = {pair: row["events"] for pair, row in computed().items()}
+    rows = SupportAssignment.objects.values_list(
+        "support_contact_id", "client_id", "events"
+    )
+    stored = {(support, client): events for support, client, events in rows}
+    errors = []
+    for pair in sorted(expected.keys() | stored.keys()):
+        found, wanted = stored.get(pair, 0), expected.get(pair, 0)
+        if found != wanted:
+            key = dict(zip(["support_contact_id", "client_id"], pair))
+            errors.append(
+                f"SupportAssignment {key}: {found} events instead of {wanted}"
+            )
+    return errors
@@ -1,52 +1,61 @@
+import random
 from datetime import datetime
-from random import choice, randint
 
 import pytz
-from django.core.management import BaseCommand
-from faker import Faker
+from django.core.management import call_command
 
+from apps.common.seeding import SeedCommand
 from apps.contracts.models import Contract
 from apps.events.models import Event
 from apps.users.models import User
 
 
-class Command(BaseCommand):
+class Command(SeedCommand):
     help = "Create sample events data."
+    model = Event
+    label = "event"
+    default_number = 10
 
-    def add_arguments(self, parser):
-        parser.add_argument(
-            "--number",
-            "-n",
-            dest="number",
-            default=10,
-            type=int,
-            help="Specify the number of events to create.",
-        )
+    @staticmethod
+    def free_contracts():
+        """Signed contracts without an event."""
+        return Contract.objects.filter(status=True, event__isnull=True)
 
-    def handle(self, *args, **options):
-        fake = Faker()
+    def get_number(self, options):
         number = options["number"]
-        contracts = Contract.objects.filter(status=True).values_list("pk", flat=True)
-
-        if contracts.count() < number:
-            number = contracts.count()
+        contracts = self.free_contracts().count()
+        if contracts < number:
+            number = contracts
             if options["verbosity"] != 0:
-                self.stdout.write(f"Maximum events possible: {contracts.count()}")
-        if options["verbosity"] != 0:
-            self.stdout.write(f"Creating {number} event(s)...")
-        self.create_events(fake, number, contracts)
+                self.stdout.write(f"Maximum events possible: {contracts}")
+        return number
 
-    @staticmethod
-    def create_events(fake, number, contracts):
-        support_contacts = User.objects.filter(team_id=3).values_list("pk", flat=True)
+    def finish(self, options):
+        # rows inserted with bulk_create, without the dashboard and assignment signals
+        call_command("rebuild_dashboard", verbosity=0)
+        call_command("rebuild_support_assignments", verbosity=0)
 
-        for _ in range(number):
-            contract = choice(contracts)
-            while Event.objects.filter(contract_id=contract).exists():
-                contract = choice(contracts)
+    def get_context(self, number, seed, options):
+        contracts = list(
+            self.free_contracts().order_by("pk").values_list("pk", flat=True)
+        )
+        return {
+            # each event gets its own contract, drawn once for all batches
+            "contracts": random.Random(seed).sample(contracts, number),
+            "support": list(
+                User.objects.filter(team_id=3)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            ),
+            "now": datetime.now(tz=pytz.UTC),
+        }
 
+    @staticmethod
+    def generate(fake, start, count, context):
+        rows = []
+        for i in range(start, start + count):
             name = ""
-            for j in range(randint(2, 5)):
+            for j in range(fake.random.randint(2, 5)):
                 name = f"{name} {fake.word().title()}"
 
             date = fake.date_time_between_dates(
@@ -54,20 +63,23 @@ class Command(BaseCommand):
                 datetime_end=datetime(2023, 12, 31, 23, 59, 59, tzinfo=pytz.UTC),
                 tzinfo=pytz.UTC,
             )
-            status = True if date < datetime.now(tz=pytz.UTC) else False
+            status = True if date < context["now"] else False
             support = (
-                choice(support_contacts)
-                if choice([0, 1]) == 0 or status is True
+                fake.random.choice(context["support"])
+                if fake.random.choice([0, 1]) == 0 or status is True
                 else None
             )
 
-            Event.objects.create(
-                contract_id=contract,
-                name=name,
-                location=f"{fake.street_address()}, {fake.city()}",
-                support_contact_id=support,
-                event_status=status,
-                attendees=randint(5, 500),
-                event_date=date,
-                notes=fake.paragraph(nb_sentences=randint(2, 6)),
+            rows.append(
+                {
+                    "contract_id": context["contracts"][i],
+                    "name": name,
+                    "location": f"{fake.street_address()}, {fake.city()}",
+                    "support_contact_id": support,
+                    "event_status": status,
+                    "attendees": fake.random.randint(5, 500),
+                    "event_date": date,
+                    "notes": fake.paragraph(nb_sentences=fake.random.randint(2, 6)),
+                }
             )
+        return rows
@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand, CommandError
+
+from apps.events import assignments
+
+
+class Command(BaseCommand):
+    help = "Rebuild the support contacts' client assignments from the events."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            dest="check",
+            action="store_true",
+            help="Only compare the assignments with the events.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            assignments.rebuild()
+            if options["verbosity"] != 0:
+                self.stdout.write("Support assignments rebuilt.")
+            return
+        errors = assignments.check()
+        if errors:
+            raise CommandError("Support assignments out of date:\n" + "\n".join(errors))
+        if options["verbosity"] != 0:
+            self.stdout.write("Support assignments up to date.")
@@ -0,0 +1,17 @@
+# Generated by Django 4.1 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["date_created", "id"], name="event_created_idx"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1 on 2026-10-18 19:05
+
+from django.db import migrations
+
+from apps.common.search import AddPrefixSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_event_created_idx"),
+    ]
+
+    operations = [
+        AddPrefixSearchIndex(
+            model_name="event", field_name="name", name="event_name_prefix"
+        ),
+        AddPrefixSearchIndex(
+            model_name="event", field_name="location", name="event_location_prefix"
+        ),
+    ]
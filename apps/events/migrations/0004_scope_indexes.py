@@ -0,0 +1,26 @@
+# Generated by Django 4.1 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_prefix_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["support_contact", "date_created", "id"],
+                name="event_support_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["event_status", "event_date"], name="event_status_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1 on 2026-10-18 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_scope_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["date_updated", "id"], name="event_updated_idx"),
+        ),
+    ]
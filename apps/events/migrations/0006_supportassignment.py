@@ -0,0 +1,69 @@
+# Generated by Django 4.1 on 2026-10-18 20:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+import django.db.models.deletion
+
+
+def populate_assignments(apps, schema_editor):
+    """Assignments of the existing events, as rebuild_support_assignments."""
+    db_alias = schema_editor.connection.alias
+    events = apps.get_model("events", "Event").objects.using(db_alias)
+    assignment = apps.get_model("events", "SupportAssignment")
+    rows = (
+        events.filter(support_contact__isnull=False)
+        .values("support_contact_id", client_id=F("contract__client_id"))
+        .annotate(events=Count("pk"))
+    )
+    assignment.objects.using(db_alias).bulk_create(assignment(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0005_client_client_updated_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("events", "0005_event_event_updated_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SupportAssignment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("events", models.PositiveIntegerField(default=0)),
+                (
+                    "client",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="support_assignments",
+                        to="clients.client",
+                    ),
+                ),
+                (
+                    "support_contact",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="supportassignment",
+            constraint=models.UniqueConstraint(
+                fields=("support_contact", "client"), name="support_assignment_unique"
+            ),
+        ),
+        migrations.RunPython(populate_assignments, migrations.RunPython.noop),
+    ]
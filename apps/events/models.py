@@ -1,7 +1,25 @@
 from django.conf import settings
 from django.db import models
 
+from apps.clients.models import Client
+from apps.common.scopes import DELETE, VIEW, ScopedQuerySet
 from apps.contracts.models import Contract
+from apps.users.models import MANAGEMENT, SALES, SUPPORT
+
+
+class EventQuerySet(ScopedQuerySet):
+    def visible_to(self, user, action=VIEW):
+        """Managers : VIEW all events
+        Sales team : VIEW and CHANGE events of their own contracts
+        Support team : VIEW and CHANGE their own events
+        """
+        if user.team.name == MANAGEMENT and action == VIEW:
+            return self.all()
+        elif user.team.name == SALES and action != DELETE:
+            return self.filter(contract__sales_contact=user)
+        elif user.team.name == SUPPORT and action != DELETE:
+            return self.filter(support_contact=user)
+        return self.none()
 
 
 class Event(models.Model):
@@ -27,6 +45,21 @@ class Event(models.Model):
     event_date = models.DateTimeField()
     notes = models.TextField(null=True, blank=True)
 
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date_created", "id"], name="event_created_idx"),
+            models.Index(fields=["date_updated", "id"], name="event_updated_idx"),
+            models.Index(
+                fields=["support_contact", "date_created", "id"],
+                name="event_support_created_idx",
+            ),
+            models.Index(
+                fields=["event_status", "event_date"], name="event_status_date_idx"
+            ),
+        ]
+
     def __str__(self):
         name = f"{self.contract.client.last_name}, {self.contract.client.first_name}"
         date = self.event_date.strftime("%Y-%m-%d")
@@ -36,3 +69,24 @@ class Event(models.Model):
             stat = "COMPLETED"
 
         return f"Event #{self.id} : {name} | Date : {date} ({stat})"
+
+
+class SupportAssignment(models.Model):
+    """Clients of a support contact's events, with their number of events :
+    the support team's client scope, kept up to date by the event signals.
+    """
+
+    support_contact = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    client = models.ForeignKey(
+        to=Client, on_delete=models.CASCADE, related_name="support_assignments"
+    )
+    events = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["support_contact", "client"], name="support_assignment_unique"
+            )
+        ]
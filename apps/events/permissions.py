@@ -1,6 +1,7 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 
+from apps.common.scopes import has_access
 from apps.users.models import SALES, SUPPORT
 
 
@@ -18,14 +19,6 @@ class EventPermissions(permissions.BasePermission):
         return request.user.team.name == SALES
 
     def has_object_permission(self, request, view, obj):
-        if request.method in permissions.SAFE_METHODS:
-            return (
-                request.user == obj.support_contact
-                or request.user == obj.contract.sales_contact
-            )
-        else:
-            if obj.event_status is True:
-                raise PermissionDenied("Cannot update a finished event.")
-            if request.user.team.name == SUPPORT:
-                return request.user == obj.support_contact
-            return request.user == obj.contract.sales_contact
+        if request.method not in permissions.SAFE_METHODS and obj.event_status is True:
+            raise PermissionDenied("Cannot update a finished event.")
+        return has_access(request, obj)
@@ -1,9 +1,17 @@
 from rest_framework import serializers
 
+from apps.common.batch import BatchSerializerMixin
+from apps.common.sparse import SparseFieldsSerializerMixin
+from apps.common.timing import TimedSerializerMixin
 from .models import Event
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(
+    BatchSerializerMixin,
+    SparseFieldsSerializerMixin,
+    TimedSerializerMixin,
+    serializers.ModelSerializer,
+):
     class Meta:
         model = Event
         fields = "__all__"
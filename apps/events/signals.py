@@ -0,0 +1,99 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from . import assignments
+
+logger = logging.getLogger(__name__)
+
+# Instance attributes : values of the tracked fields as loaded or last saved,
+# and as stored before the save in progress.
+STATE = "_assignment_state"
+OLD = "_assignment_old"
+
+
+def loaded_state(sender, instance, **kwargs):
+    """Tracked values of an instance, when none of them is deferred."""
+    values = instance.__dict__
+    fields = assignments.TRACKED[sender]
+    if all(field in values for field in fields):
+        values[STATE] = tuple(values[field] for field in fields)
+
+
+def tracked(sender, update_fields):
+    """False for a save of other fields only."""
+    if update_fields is None:
+        return True
+    return any(
+        sender._meta.get_field(attname).name in update_fields
+        for attname in assignments.TRACKED[sender]
+    )
+
+
+def before_save(sender, instance, raw, using, update_fields, **kwargs):
+    """State of the row before the save : None when it is inserted, otherwise
+    read from the database rather than the loaded values, which a concurrent
+    save may have changed since. Inside a transaction, the row stays locked
+    until it ends : a concurrent save of the row reads the values of this one.
+    """
+    if not tracked(sender, update_fields):
+        return
+    if instance.pk is None:
+        old = None
+    else:
+        rows = sender._base_manager.using(using).filter(pk=instance.pk)
+        if transaction.get_connection(using).in_atomic_block:
+            rows = rows.select_for_update()
+        old = rows.values_list(*assignments.TRACKED[sender]).first()
+    instance.__dict__[OLD] = old
+
+
+def after_save(sender, instance, created, update_fields, **kwargs):
+    values = instance.__dict__
+    if not tracked(sender, update_fields):
+        return
+    if OLD in values:
+        old = values.pop(OLD)
+    elif created:
+        old = None
+    elif STATE in values:
+        # saved without pre_save, e.g. by BatchView's bulk_update
+        old = values[STATE]
+    else:
+        logger.warning(
+            "Support assignments not updated for %s %s, previous values unknown.",
+            sender._meta.label,
+            instance.pk,
+        )
+        return
+    new = []
+    for index, attname in enumerate(assignments.TRACKED[sender]):
+        name = sender._meta.get_field(attname).name
+        if old is not None and update_fields is not None and name not in update_fields:
+            new.append(old[index])
+        else:
+            new.append(getattr(instance, attname))
+    new = tuple(new)
+    assignments.record(sender, instance, old, new)
+    values[STATE] = new
+
+
+def after_delete(sender, instance, **kwargs):
+    if STATE in instance.__dict__:
+        assignments.record(sender, instance, instance.__dict__[STATE], None)
+    else:
+        logger.warning(
+            "Support assignments not updated for %s %s, deleted values unknown.",
+            sender._meta.label,
+            instance.pk,
+        )
+
+
+for model in assignments.TRACKED:
+    label = model._meta.label_lower
+    uid = f"assignments_{label}"
+    post_init.connect(loaded_state, sender=model, dispatch_uid=uid)
+    pre_save.connect(before_save, sender=model, dispatch_uid=uid)
+    post_save.connect(after_save, sender=model, dispatch_uid=uid)
+    post_delete.connect(after_delete, sender=model, dispatch_uid=uid)
@@ -1,13 +1,18 @@
 import datetime
 
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.reverse import reverse
 
+from apps.clients.models import Client
+from apps.common.scopes import CHANGE, DELETE, VIEW
 from apps.common.tests.setup import CommandTestCase, CustomCRMTestCase
 from apps.contracts.models import Contract
 from apps.users.models import User
-from .models import Event
+from . import assignments
+from .models import Event, SupportAssignment
 
 EVENT_COMMAND = "create_events"
 
@@ -64,6 +69,23 @@ class EventCommandTests(CommandTestCase):
         self.assertEqual(out, "Creating 1 event(s)...\n")
         self.assertEqual(Event.objects.all().count(), events_before + 1)
 
+    def test_create_events_unique_contracts(self):
+        """Every free signed contract gets one event, then none are left."""
+        self.create_sample_data()
+        self.call_command(EVENT_COMMAND, "-n 3")
+        contracts = Contract.objects.filter(status=True, event__isnull=True).count()
+        out = self.call_command(EVENT_COMMAND, "-n 1000", "--batch-size=2")
+        self.assertEqual(
+            out,
+            f"Maximum events possible: {contracts}\nCreating {contracts} event(s)...\n",
+        )
+        self.assertEqual(
+            Event.objects.count(), Contract.objects.filter(status=True).count()
+        )
+        out = self.call_command(EVENT_COMMAND, "-n 1")
+        self.assertEqual(out, "Maximum events possible: 0\nCreating 0 event(s)...\n")
+        self.assertEqual(assignments.check(), [])
+
 
 class EventListTests(CustomCRMTestCase):
     event_list_url = reverse("events:list")
@@ -80,7 +102,7 @@ class EventListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.event_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), len(Event.objects.all()))
+        self.assertEqual(len(response.data["results"]), len(Event.objects.all()))
 
     def test_manager_create_event(self):
         """Managers must create events via admin site."""
@@ -98,7 +120,7 @@ class EventListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.event_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data["results"]:
             self.assertEqual(
                 Event.objects.get(contract=item["contract"]).contract.sales_contact,
                 user,
@@ -143,7 +165,7 @@ class EventListTests(CustomCRMTestCase):
         test_client = self.get_token_auth_client(user)
         response = test_client.get(self.event_list_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        for item in response.data:
+        for item in response.data["results"]:
             self.assertEqual(user.id, item["support_contact"])
 
     def test_support_create_event(self):
@@ -273,6 +295,75 @@ class EventDetailTests(CustomCRMTestCase):
         )
 
 
+class EventExportTests(CustomCRMTestCase):
+    def test_sales_export_csv_search(self):
+        """Event export keeps the list search fields."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        response = test_client.get(
+            f"{reverse('events:export')}?format=csv&search=miller"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        expected = Event.objects.visible_to(user).filter(
+            contract__client__last_name__istartswith="miller"
+        )
+        self.assertEqual(len(lines) - 1, expected.count())
+
+
+class EventBatchTests(CustomCRMTestCase):
+    batch_url = reverse("events:batch")
+
+    def test_sales_batch_create_unique_contract(self):
+        """One event per contract, within the batch and against the database."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        contract = self.create_contract()
+        event = {"name": "Batch", "attendees": 10, "event_date": "2022-10-09"}
+        data = [
+            {**event, "contract": contract.id},
+            {**event, "contract": 1},
+            {**event, "contract": 2},
+        ]
+        response = test_client.post(self.batch_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.json()
+        self.assertEqual([item["status"] for item in results], [201, 400, 400])
+        self.assertEqual(
+            results[1]["errors"], {"contract": ["This field must be unique."]}
+        )
+        self.assertIn("contract", results[2]["errors"])
+        self.assertTrue(Event.objects.filter(contract=contract).exists())
+
+        data = [{**event, "contract": self.create_contract().id}] * 2
+        response = test_client.post(self.batch_url, data, format="json")
+        self.assertEqual([item["status"] for item in response.json()], [400, 400])
+
+    def test_support_batch_update(self):
+        """Support keeps the event assignment, contracts cannot be changed,
+        finished events cannot be updated.
+        """
+        user = User.objects.get(username="test_support")
+        test_client = self.get_token_auth_client(user)
+        event = {"name": "UPDATED", "attendees": 10, "event_date": "2022-10-09"}
+        data = [
+            {**event, "id": 1, "contract": 1, "support_contact": None},
+            {**event, "id": 1, "contract": 3},
+            {**event, "id": 3, "contract": 4},
+        ]
+        response = test_client.put(self.batch_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.json()
+        self.assertEqual([item["status"] for item in results], [202, 400, 403])
+        self.assertEqual(results[0]["data"]["support_contact"], user.id)
+        self.assertEqual(
+            results[1]["errors"], {"detail": "Cannot change the related contract."}
+        )
+        event = Event.objects.get(pk=1)
+        self.assertEqual(event.name, "UPDATED")
+        self.assertEqual(event.support_contact, user)
+
+
 class EventModelTests(CustomCRMTestCase):
     def test_str_event(self):
         event = Event.objects.get(id=1)
@@ -283,3 +374,114 @@ class EventModelTests(CustomCRMTestCase):
         self.assertEqual(
             str(event), "Event #3 : Dupont, Jean | Date : 2022-11-17 (COMPLETED)"
         )
+
+
+class EventScopeTests(CustomCRMTestCase):
+    def test_sales_scope(self):
+        """Sales view and change events of their own contracts."""
+        user = User.objects.get(username="test_sales")
+        for action in [VIEW, CHANGE]:
+            for event in Event.objects.visible_to(user, action):
+                self.assertEqual(event.contract.sales_contact, user)
+        self.assertFalse(Event.objects.visible_to(user, DELETE).exists())
+
+    def test_support_scope(self):
+        """Support view and change their own events."""
+        user = User.objects.get(username="test_support")
+        for action in [VIEW, CHANGE]:
+            for event in Event.objects.visible_to(user, action):
+                self.assertEqual(event.support_contact, user)
+
+
+class SupportAssignmentTests(CustomCRMTestCase):
+    def assertAssignments(self, expected):
+        self.assertEqual(assignments.check(), [])
+        self.assertEqual(
+            set(
+                SupportAssignment.objects.values_list(
+                    "support_contact_id", "client_id", "events"
+                )
+            ),
+            expected,
+        )
+
+    def test_assignments_follow_writes(self):
+        """Support contacts, event contracts and contract clients changes."""
+        self.assertAssignments({(3, 1, 1), (3, 2, 1), (6, 5, 1)})
+        event = Event.objects.get(pk=2)
+        event.support_contact_id = 3
+        event.save()
+        self.assertAssignments({(3, 1, 2), (3, 2, 1), (6, 5, 1)})
+
+        event = Event.objects.get(pk=1)
+        event.support_contact_id = 6
+        event.save()
+        event.support_contact_id = None
+        event.save(update_fields=["name"])
+        self.assertAssignments({(3, 1, 1), (6, 1, 1), (3, 2, 1), (6, 5, 1)})
+
+        contract = Contract.objects.get(pk=3)
+        contract.client_id = 2
+        contract.save()
+        self.assertAssignments({(6, 1, 1), (3, 2, 2), (6, 5, 1)})
+
+        Event.objects.get(pk=5).delete()
+        Client.objects.get(pk=2).delete()
+        self.assertAssignments({(6, 1, 1)})
+
+    def test_concurrent_saves(self):
+        """Saves starting from the same loaded values (concurrent PUTs), and
+        events updated without signals, are recounted from the events.
+        """
+        first, second = Event.objects.get(pk=1), Event.objects.get(pk=1)
+        first.support_contact_id = 6
+        first.save()
+        self.assertAssignments({(6, 1, 1), (3, 2, 1), (6, 5, 1)})
+        second.support_contact_id = None
+        second.save()
+        self.assertAssignments({(3, 2, 1), (6, 5, 1)})
+
+        Event.objects.filter(pk=2).update(support_contact_id=3)
+        first.save()
+        self.assertAssignments({(3, 1, 1), (6, 1, 1), (3, 2, 1), (6, 5, 1)})
+
+    def test_batch_writes(self):
+        """Each assignment row is written once per batch."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        event = {"name": "Batch", "attendees": 10, "event_date": "2022-10-09"}
+        data = [
+            {**event, "contract": self.create_contract().id, "support_contact": 6}
+            for i in range(3)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = test_client.post(reverse("events:batch"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        writes = [q for q in queries if "events_supportassignment" in q["sql"]]
+        self.assertEqual(len(writes), 2)
+        self.assertAssignments({(3, 1, 1), (6, 1, 3), (3, 2, 1), (6, 5, 1)})
+
+    def test_support_client_scope(self):
+        """Clients of the support contact's events, read without DISTINCT nor
+        join on the events.
+        """
+        user = User.objects.get(username="test_support")
+        with CaptureQueriesContext(connection) as queries:
+            clients = list(Client.objects.visible_to(user).values_list("id", flat=True))
+        self.assertEqual(sorted(clients), [1, 2])
+        self.assertNotIn("DISTINCT", queries[0]["sql"])
+        self.assertNotIn("events_event", queries[0]["sql"])
+
+    def test_rebuild_command(self):
+        """--check reports the differences, the rebuild fixes them."""
+        Event.objects.filter(pk=1).update(support_contact_id=6)
+        with self.assertRaisesMessage(
+            CommandError,
+            "SupportAssignment {'support_contact_id': 3, 'client_id': 1}: "
+            "1 events instead of 0",
+        ):
+            call_command("rebuild_support_assignments", "--check", verbosity=0)
+        self.assertEqual(len(assignments.check()), 2)
+        call_command("rebuild_support_assignments", verbosity=0)
+        call_command("rebuild_support_assignments", "--check", verbosity=0)
+        self.assertAssignments({(6, 1, 1), (3, 2, 1), (6, 5, 1)})
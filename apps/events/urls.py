@@ -5,5 +5,10 @@ from . import views
 app_name = "events"
 urlpatterns = [
     path("", views.EventList.as_view(), name="list"),
+    path("export/", views.EventExport.as_view(), name="export"),
+    path("changes/", views.EventChanges.as_view(), name="changes"),
+    path("batch/", views.EventBatch.as_view(), name="batch"),
     path("<int:pk>/", views.EventDetail.as_view(), name="detail"),
+    path("async/", views.EventAsyncList.as_view(), name="async_list"),
+    path("async/<int:pk>/", views.EventAsyncDetail.as_view(), name="async_detail"),
 ]
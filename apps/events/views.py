@@ -1,21 +1,49 @@
+from contextlib import contextmanager
+
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status
 from rest_framework.exceptions import ValidationError
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.async_views import AsyncDetailView, AsyncListView
+from apps.common.batch import BatchView
+from apps.common.cache import CachedListMixin
+from apps.common.changes import ChangeFeedMixin
+from apps.common.conditional import ConditionalDetailMixin, ConditionalListMixin
+from apps.common.export import ExportMixin
 from apps.common.permissions import IsManager
-from apps.users.models import SALES, SUPPORT
+from apps.common.scopes import action_for
+from apps.common.search import PrefixSearchFilter
+from apps.common.sparse import SparseFieldsMixin
+from apps.common.timing import TimedViewMixin
+from apps.common.values import ValuesListMixin
+from apps.dashboard.summaries import deferred
+from . import assignments
 from .models import Event
 from .permissions import EventPermissions
 from .serializers import EventSerializer
 
 
-class EventList(generics.ListCreateAPIView):
+def apply_event_rules(user, validated_data, event=None):
+    """The contract and support contact of an event cannot be changed by an update."""
+    if event is not None:
+        if validated_data["contract"].pk != event.contract_id:
+            raise ValidationError({"detail": "Cannot change the related contract."})
+        validated_data.pop("support_contact", None)
+
+
+class EventList(
+    TimedViewMixin,
+    SparseFieldsMixin,
+    CachedListMixin,
+    ValuesListMixin,
+    ConditionalListMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated, IsManager | EventPermissions]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
+    filter_backends = [PrefixSearchFilter, DjangoFilterBackend]
     search_fields = [
         "^contract__client__first_name",
         "^contract__client__last_name",
@@ -31,11 +59,7 @@ class EventList(generics.ListCreateAPIView):
     }
 
     def get_queryset(self):
-        if self.request.user.team.name == SUPPORT:
-            return Event.objects.filter(support_contact=self.request.user)
-        elif self.request.user.team.name == SALES:
-            return Event.objects.filter(contract__sales_contact=self.request.user)
-        return Event.objects.all()
+        return Event.objects.visible_to(self.request.user)
 
     def post(self, request, *args, **kwargs):
         serializer = EventSerializer(data=request.data)
@@ -44,18 +68,61 @@ class EventList(generics.ListCreateAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class EventDetail(generics.RetrieveUpdateAPIView):
-    queryset = Event.objects.all()
+class EventExport(ExportMixin, EventList):
+    export_name = "events"
+
+
+class EventChanges(ChangeFeedMixin, EventList):
+    pass
+
+
+class EventBatch(TimedViewMixin, BatchView):
+    permission_classes = [IsAuthenticated, IsManager | EventPermissions]
+    serializer_class = EventSerializer
+
+    def get_queryset(self):
+        action = action_for(self.request.method)
+        return Event.objects.with_access(self.request.user, action)
+
+    @contextmanager
+    def signals_context(self):
+        # one update per dashboard summary and support assignment row, not per item
+        with deferred(), assignments.deferred():
+            yield
+
+    def create_rules(self, validated_data):
+        apply_event_rules(self.request.user, validated_data)
+
+    def update_rules(self, instance, validated_data):
+        apply_event_rules(self.request.user, validated_data, instance)
+
+
+class EventDetail(
+    TimedViewMixin,
+    SparseFieldsMixin,
+    ConditionalDetailMixin,
+    generics.RetrieveUpdateAPIView,
+):
     http_method_names = ["get", "put", "options"]
     permission_classes = [IsAuthenticated, IsManager | EventPermissions]
     serializer_class = EventSerializer
 
+    def get_queryset(self):
+        action = action_for(self.request.method)
+        return Event.objects.with_access(self.request.user, action)
+
     def update(self, request, *args, **kwargs):
         event = self.get_object()
         serializer = EventSerializer(instance=event, data=request.data)
         if serializer.is_valid(raise_exception=True):
-            if serializer.validated_data["contract"] != event.contract:
-                raise ValidationError({"detail": "Cannot change the related contract."})
-            serializer.validated_data["support_contact"] = event.support_contact
+            apply_event_rules(request.user, serializer.validated_data, event)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class EventAsyncList(AsyncListView):
+    view_class = EventList
+
+
+class EventAsyncDetail(AsyncDetailView):
+    view_class = EventDetail
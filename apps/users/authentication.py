@@ -0,0 +1,55 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class TeamJWTAuthentication(JWTAuthentication):
+    """JWT authentication loading the user and their team in a single query.
+    Role checks on request.user.team never hit the database again.
+    Async views authenticate with aauthenticate, the token is checked
+    in the event loop and the user fetched with the async ORM.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user = self.user_model.objects.select_related("team").get(
+                **{api_settings.USER_ID_FIELD: self.get_user_id(validated_token)}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self.check_user(user)
+
+    async def aget_user(self, validated_token):
+        try:
+            user = await self.user_model.objects.select_related("team").aget(
+                **{api_settings.USER_ID_FIELD: self.get_user_id(validated_token)}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self.check_user(user)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    @staticmethod
+    def check_user(user):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
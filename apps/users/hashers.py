@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def hashing_pool():
+    """Threads computing the password hashes of the process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_THREADS,
+                thread_name_prefix="password-hash",
+            )
+    return _pool
+
+
+def hashing_slots():
+    """Logins of the process hashing a password or waiting for a thread."""
+    global _slots
+    with _pool_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(
+                settings.PASSWORD_HASH_THREADS + settings.PASSWORD_HASH_QUEUE
+            )
+    return _slots
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """Django's PBKDF2 hasher (same algorithm and hashes), computed by a pool of
+    settings.PASSWORD_HASH_THREADS threads per process. A burst of logins
+    waits for the pool instead of running one hash per worker thread at once :
+    it uses that many cores at most, the others keep serving the API.
+    The login view bounds the waiting logins (hashing_slots), every other
+    caller (admin, password changes) waits for its turn.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        pool = hashing_pool()
+        return pool.submit(super().encode, password, salt, iterations).result()
@@ -1,41 +1,57 @@
-from random import randint
-
-from django.core.management import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
 from faker import Faker
 
+from apps.common.seeding import SeedCommand
 from apps.users.models import User
 
 
-class Command(BaseCommand):
+class Command(SeedCommand):
     help = "Create sample users."
+    model = User
+    label = "user"
+    default_number = 15
 
     def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
-            "--number",
-            "-n",
-            dest="number",
-            default=15,
-            type=int,
-            help="Specify the number of users to create.",
+            "--password",
+            dest="password",
+            default=None,
+            help="Specify the password shared by the created users.",
         )
 
-    def handle(self, *args, **options):
-        fake = Faker()
-        number = options["number"]
-        if options["verbosity"] != 0:
-            self.stdout.write(f"Creating {number} user(s)...")
-        self.create_users(fake, number)
+    def get_context(self, number, seed, options):
+        password = options["password"]
+        if password is None:
+            fake = Faker()
+            fake.seed_instance(seed)
+            password = fake.password(length=8)
+        return {
+            # hashed once, bulk created users all share the same password
+            "password": make_password(password),
+            # numbered usernames, unique across runs
+            "offset": User.objects.aggregate(offset=Max("id"))["offset"] or 0,
+        }
 
     @staticmethod
-    def create_users(fake, number):
-        for _ in range(number):
-            User.objects.create_user(
-                first_name=fake.first_name(),
-                last_name=fake.last_name(),
-                username=f"{fake.user_name()}{randint(1, 99)}",
-                password=fake.password(length=8),
-                email=fake.ascii_safe_email(),
-                phone=fake.phone_number(),
-                mobile=fake.phone_number(),
-                team_id=randint(1, 3),
+    def generate(fake, start, count, context):
+        rows = []
+        for i in range(start, start + count):
+            team_id = fake.random.randint(1, 3)
+            rows.append(
+                {
+                    "first_name": fake.first_name(),
+                    "last_name": fake.last_name(),
+                    "username": f"{fake.user_name()}{context['offset'] + i + 1}",
+                    "password": context["password"],
+                    "email": fake.ascii_safe_email(),
+                    "phone": fake.phone_number(),
+                    "mobile": fake.phone_number(),
+                    "team_id": team_id,
+                    # User.save() is bypassed by bulk_create
+                    "is_superuser": team_id == 1,
+                    "is_staff": team_id == 1,
+                }
             )
+        return rows
@@ -1,8 +1,23 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    check_password,
+    get_hasher,
+    make_password,
+)
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied
+from rest_framework_simplejwt.tokens import AccessToken
 
 from apps.common.tests.setup import CommandTestCase, CustomCRMTestCase, TEST_PASSWORD
+from . import hashers
+from .hashers import PooledPBKDF2PasswordHasher
 from .models import Team, User
 
 USER_COMMAND = "create_users"
@@ -42,6 +57,16 @@ class UserCommandTests(CommandTestCase):
         self.assertEqual(out, "Creating 8 user(s)...\n")
         self.assertEqual(User.objects.all().count(), users_before + 8)
 
+    def test_create_users_password(self):
+        """Created users share one password hash, staff status follows the team."""
+        self.call_command(USER_COMMAND, "-n 30", "--password=sample_password")
+        users = User.objects.all().order_by("-id")[:30]
+        self.assertEqual(len({user.password for user in users}), 1)
+        self.assertTrue(users[0].check_password("sample_password"))
+        for user in users:
+            self.assertEqual(user.is_staff, user.team_id == 1)
+            self.assertEqual(user.is_superuser, user.team_id == 1)
+
 
 class LoginTests(CustomCRMTestCase):
     login_url = reverse("users:login")
@@ -85,6 +110,114 @@ class LoginTests(CustomCRMTestCase):
             {"detail": "No active account found with the given credentials"},
         )
 
+    def login(self, username="test_sales", password=TEST_PASSWORD, **extra):
+        data = {"username": username, "password": password}
+        return self.client.post(self.login_url, data, format="json", **extra)
+
+    def test_refresh_rotation(self):
+        """Refresh tokens give new tokens once, without the password."""
+        refresh = self.login().data["refresh"]
+        refresh_url = reverse("users:refresh")
+        response = self.client.post(refresh_url, {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data["refresh"], refresh)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(
+            self.client.get(reverse("clients:list")).status_code, status.HTTP_200_OK
+        )
+
+        self.client.credentials()
+        reused = self.client.post(refresh_url, {"refresh": refresh}, format="json")
+        self.assertEqual(reused.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(reused.json()["detail"], "Token is blacklisted")
+        rotated = {"refresh": response.data["refresh"]}
+        response = self.client.post(refresh_url, rotated, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_verify(self):
+        """Valid access tokens are accepted, invalid ones rejected."""
+        access = self.login().data["access"]
+        verify_url = reverse("users:verify")
+        response = self.client.post(verify_url, {"token": access}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(verify_url, {"token": "invalid"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_access_token_lifetime(self):
+        """Access tokens are short-lived, 15 minutes by default."""
+        token = AccessToken(self.login().data["access"])
+        self.assertEqual(token["exp"] - token["iat"], 15 * 60)
+
+    @override_settings(LOGIN_THROTTLE_RATE="2/min")
+    def test_login_throttle(self):
+        """Attempts per client address, failed ones included."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.assertEqual(self.login(password="random_password").status_code, 401)
+        self.assertEqual(self.login().status_code, 200)
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+
+    @override_settings(LOGIN_THROTTLE_RATE="2/min")
+    def test_login_throttle_forwarded_for(self):
+        """X-Forwarded-For is ignored unless NUM_PROXIES proxies set it."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        responses = [
+            self.login(HTTP_X_FORWARDED_FOR=f"203.0.113.{number}")
+            for number in range(3)
+        ]
+        self.assertEqual(responses[-1].status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        cache.clear()
+        behind_proxy = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        with override_settings(REST_FRAMEWORK=behind_proxy):
+            for number in range(3):
+                forwarded_for = f"198.51.100.7, 203.0.113.{number}"
+                response = self.login(HTTP_X_FORWARDED_FOR=forwarded_for)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.login(HTTP_X_FORWARDED_FOR="203.0.113.2")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.login(HTTP_X_FORWARDED_FOR="203.0.113.2")
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_login_hashing_busy(self):
+        """Logins beyond the hashing queue are rejected instead of waiting,
+        other password hashes wait for their turn.
+        """
+        hashers.hashing_slots()
+        with mock.patch.object(hashers, "_slots", threading.Semaphore(0)):
+            response = self.login()
+            self.assertTrue(check_password(TEST_PASSWORD, make_password(TEST_PASSWORD)))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(response.json()["detail"].startswith("Too many logins"))
+        self.assertIn("Retry-After", response)
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+
+class AuthenticationTests(CustomCRMTestCase):
+    def test_role_resolution_queries(self):
+        """Authenticated CRM calls resolve user and team in a single query."""
+        for username in ["test_manager", "test_sales", "test_support"]:
+            user = User.objects.get(username=username)
+            test_client = self.get_token_auth_client(user)
+            # user with team + client page
+            with self.assertNumQueries(2):
+                response = test_client.get(reverse("clients:list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # user with team + client with access annotation
+            with self.assertNumQueries(2):
+                test_client.get(reverse("clients:detail", kwargs={"pk": 1}))
+
+    def test_inactive_user(self):
+        """Tokens of deactivated users are rejected."""
+        user = User.objects.get(username="test_sales")
+        test_client = self.get_token_auth_client(user)
+        User.objects.filter(id=user.id).update(is_active=False)
+        response = test_client.get(reverse("clients:list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
 
 class UpdatePasswordTests(CustomCRMTestCase):
     update_password_url = reverse("users:update_password")
@@ -183,3 +316,27 @@ class UserModelTests(CustomCRMTestCase):
         support = User.objects.get(id=3)
         self.assertFalse(support.is_staff)
         self.assertFalse(support.is_superuser)
+
+
+class PasswordHasherTests(SimpleTestCase):
+    def test_pooled_hasher(self):
+        """Hashes are computed in the pool, compatible with Django's PBKDF2."""
+        self.assertIsInstance(get_hasher(), PooledPBKDF2PasswordHasher)
+        threads = []
+        encode = PBKDF2PasswordHasher.encode
+
+        def tracked_encode(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return encode(*args, **kwargs)
+
+        with mock.patch.object(PBKDF2PasswordHasher, "encode", tracked_encode):
+            encoded = make_password("pooled_password")
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("password-hash"))
+        self.assertTrue(check_password("pooled_password", encoded))
+
+        stock_hasher = PBKDF2PasswordHasher()
+        stock = stock_hasher.encode("pooled_password", stock_hasher.salt())
+        self.assertEqual(encoded.split("$")[0], stock.split("$")[0])
+        self.assertTrue(check_password("pooled_password", stock))
+        self.assertFalse(get_hasher().must_update(stock))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    """Login attempts per client address, at settings.LOGIN_THROTTLE_RATE
+    (e.g. "20/min", None to disable). Read on each request, unlike the
+    DEFAULT_THROTTLE_RATES of the DRF settings.
+    """
+
+    scope = "login"
+
+    def get_rate(self):
+        return settings.LOGIN_THROTTLE_RATE
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
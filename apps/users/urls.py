@@ -1,10 +1,12 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 
-from .views import UpdatePassword
+from .views import Login, UpdatePassword
 
 app_name = "users"
 urlpatterns = [
-    path("login/", TokenObtainPairView.as_view(), name="login"),
+    path("login/", Login.as_view(), name="login"),
+    path("login/refresh/", TokenRefreshView.as_view(), name="refresh"),
+    path("login/verify/", TokenVerifyView.as_view(), name="verify"),
     path("update-password/", UpdatePassword.as_view(), name="update_password"),
 ]
@@ -1,6 +1,30 @@
 from rest_framework import generics, permissions
+from rest_framework.exceptions import Throttled
+from rest_framework_simplejwt.views import TokenObtainPairView
 
+from .hashers import hashing_slots
 from .serializers import UpdatePasswordSerializer
+from .throttling import LoginRateThrottle
+
+
+class Login(TokenObtainPairView):
+    """Access and refresh tokens for valid credentials, throttled : each login
+    computes a password hash, the refresh endpoint renews tokens without one.
+    Beyond settings.PASSWORD_HASH_QUEUE logins waiting for a hashing thread,
+    logins are rejected (429 with Retry-After) rather than holding more
+    worker threads.
+    """
+
+    throttle_classes = [LoginRateThrottle]
+
+    def post(self, request, *args, **kwargs):
+        slots = hashing_slots()
+        if not slots.acquire(blocking=False):
+            raise Throttled(wait=1, detail="Too many logins in progress.")
+        try:
+            return super().post(request, *args, **kwargs)
+        finally:
+            slots.release()
 
 
 class UpdatePassword(generics.UpdateAPIView):